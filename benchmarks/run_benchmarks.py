@@ -0,0 +1,414 @@
+import argparse
+import json
+import platform
+import sys
+from copy import deepcopy
+from datetime import datetime
+from time import perf_counter
+
+import numpy as np
+
+from src import VERSION
+from src.fluid import Fluid
+from src.heat_pump import HeatPumpConstCOP
+from src.swhe import SWHE
+from src.system import System
+
+# system config used by the validation and design diagram scripts
+CONFIG = {
+    "hp": {
+        "cop": 3.0
+    },
+    "swhe": {
+        "pipe": {
+            "outer-dia": 0.02667,
+            "inner-dia": 0.0215392,
+            "length": 100,
+            "density": 950,
+            "conductivity": 0.4
+        },
+        "diameter": 1.2,
+        "horizontal-spacing": 0.05,
+        "vertical-spacing": 0.05,
+    },
+    "fluid": {
+        "fluid-name": "PG",
+        "concentration": 20
+    }
+}
+
+# metrics where larger values are better; all other compared metrics are better when smaller
+HIGHER_IS_BETTER = ("calls-per-second",)
+COMPARED_METRICS = ("calls-per-second", "iterations-per-solve", "property-calls-per-solve")
+
+
+class Counters(object):
+    def __init__(self, fluids: list, swhes: list):
+        """
+        Count the coil evaluations and fluid property calls of a workload
+        Each SWHE.calc_coil call adds the number of points it evaluates, so scalar and
+        batched solves report comparable iteration counts. Segmented solves add their iterations.
+        :param fluids: Fluid objects to count property calls of
+        :param swhes: SWHE objects to count coil evaluations of
+        """
+
+        self.fluids = fluids
+        self.property_calls = sum(f.property_calls for f in fluids)
+        self.iterations = 0 if swhes else None
+
+        for swhe in swhes:
+            calc_coil = swhe.calc_coil
+
+            def counted(m_dot, *args, _calc_coil=calc_coil):
+                self.iterations += np.size(m_dot)
+                return _calc_coil(m_dot, *args)
+
+            swhe.calc_coil = counted
+
+            simulate_segmented = swhe.simulate_segmented
+
+            def counted_segmented(*args, _swhe=swhe, _simulate_segmented=simulate_segmented, **kwargs):
+                result = _simulate_segmented(*args, **kwargs)
+                self.iterations += _swhe.last_solve["iterations"]
+                return result
+
+            swhe.simulate_segmented = counted_segmented
+
+    def get_property_calls(self):
+        return sum(f.property_calls for f in self.fluids) - self.property_calls
+
+
+def get_config(backend: str):
+    """
+    Get the benchmark system config
+    :param backend: fluid property backend name
+    :return: config dict
+    """
+
+    config = deepcopy(CONFIG)
+    config["fluid"]["backend"] = backend
+    return config
+
+
+def get_swhe_config(config: dict):
+    return {**config["swhe"], "fluid": config["fluid"]}
+
+
+def get_system_counters(system: System):
+    return Counters([system.hp.fluid, system.swhe.brine, system.swhe.water], [system.swhe])
+
+
+def get_profile(num_hours: int = 8760):
+    """
+    Synthetic hourly load profile with seasonal and daily swings in load and surface water temperature
+    :param num_hours: number of hours
+    :return: tuple of zone loads, [W], mass flow rates, [kg/s], and surface water temperatures, [C]
+    """
+
+    hours = np.arange(num_hours)
+    season = np.cos(2 * np.pi * hours / 8760)
+    q_zone = 2000 * season - 500 * np.sin(2 * np.pi * hours / 24)
+    m_dot = np.full(num_hours, 0.5)
+    temperature_sw = 14 - 6 * season
+    return q_zone, m_dot, temperature_sw
+
+
+def bench_fluid_state(config: dict, scale: float):
+    fluid = Fluid(config["fluid"])
+    counters = Counters([fluid], [])
+    temps = np.linspace(1, 39, max(int(2000 * scale), 2)).tolist()
+
+    def run():
+        for t in temps:
+            fluid.state(t)
+        return len(temps)
+
+    return run, counters
+
+
+def bench_heat_pump(config: dict, scale: float):
+    hp = HeatPumpConstCOP({**config["hp"], "fluid": config["fluid"]})
+    counters = Counters([hp.fluid], [])
+    loads = np.linspace(-3000, 3000, max(int(2000 * scale), 2)).tolist()
+
+    def run():
+        for q in loads:
+            hp.simulate(q, 0.5, 15.0)
+        return len(loads)
+
+    return run, counters
+
+
+def bench_swhe_single(config: dict, scale: float):
+    swhe = SWHE(get_swhe_config(config))
+    counters = Counters([swhe.brine, swhe.water], [swhe])
+    num = max(int(15 * scale ** 0.5), 2)
+    points = [(m, t) for m in np.linspace(0.1, 1.0, num) for t in np.linspace(1, 39, num)]
+
+    def run():
+        for m_dot, inlet_temperature in points:
+            swhe.simulate(m_dot, inlet_temperature, 20.0)
+        return len(points)
+
+    return run, counters
+
+
+def bench_swhe_segmented(config: dict, scale: float):
+    swhe = SWHE(get_swhe_config(config))
+    counters = Counters([swhe.brine, swhe.water], [swhe])
+    num = max(int(15 * scale ** 0.5), 2)
+    points = [(m, t) for m in np.linspace(0.1, 1.0, num) for t in np.linspace(1, 39, num)]
+
+    def run():
+        for m_dot, inlet_temperature in points:
+            swhe.simulate_segmented(m_dot, inlet_temperature, 20.0, 20)
+        return len(points)
+
+    return run, counters
+
+
+def bench_system_single(config: dict, scale: float):
+    system = System(config)
+    counters = get_system_counters(system)
+    loads = np.linspace(-3000, 3000, max(int(100 * scale), 2)).tolist()
+
+    def run():
+        for q in loads:
+            system.simulate(q, 0.5, 15.0)
+        return len(loads)
+
+    return run, counters
+
+
+def bench_profile_batch(config: dict, scale: float):
+    system = System(config)
+    counters = get_system_counters(system)
+    profile = get_profile(max(int(8760 * scale), 24))
+
+    def run():
+        system.simulate_batch(*profile)
+        return profile[0].size
+
+    return run, counters
+
+
+def bench_profile_scalar(config: dict, scale: float):
+    system = System(config)
+    system.warm_start = True
+    counters = get_system_counters(system)
+    profile = [p.tolist() for p in get_profile(max(int(8760 * scale), 24))]
+
+    def run():
+        for q_zone, m_dot, temperature_sw in zip(*profile):
+            system.simulate(q_zone, m_dot, temperature_sw)
+        return len(profile[0])
+
+    return run, counters
+
+
+def bench_validation_sweeps(config: dict, scale: float):
+    swhe = SWHE(get_swhe_config(config))
+    hp = HeatPumpConstCOP({**config["hp"], "fluid": config["fluid"]})
+    system = System(config)
+    counters = Counters([swhe.brine, swhe.water, hp.fluid, system.hp.fluid, system.swhe.brine, system.swhe.water],
+                        [swhe, system.swhe])
+
+    m_dots = np.array([[0.1], [0.25], [1.0]])
+
+    def run():
+        hp.simulate(np.arange(-3000, 3000, 100), m_dots, 15)
+        swhe.calc_inside_conv_resistance(np.arange(0.01, 0.5, 0.001), 20)
+        swhe.simulate_batch(np.arange(0.01, 1, 0.01), 25, 20)
+        swhe.simulate_batch(np.array([[0.10], [0.50], [1.00]]), np.arange(1, 40, 0.1), 20)
+        system.simulate_batch(np.arange(-3000, 3000, 200), m_dots, 15)
+        return 5
+
+    return run, counters
+
+
+def bench_sizing(config: dict, scale: float):
+    system = System(config)
+    counters = get_system_counters(system)
+    t_appr = np.arange(1.5, 6.5, 0.25)
+
+    def run():
+        for cop in (3.0, 4.0, 2.0):
+            system.hp.cop = cop
+            system.size_pipe_lengths(-3516.85, 0.5, 15, t_appr)
+        return 3 * t_appr.size
+
+    return run, counters
+
+
+# benchmark name, workload, and description of one call
+BENCHMARKS = {
+    "fluid-state": (bench_fluid_state, "uncached Fluid.state evaluation"),
+    "heat-pump": (bench_heat_pump, "scalar HeatPumpConstCOP.simulate"),
+    "swhe-single": (bench_swhe_single, "scalar SWHE.simulate"),
+    "swhe-segmented": (bench_swhe_segmented, "SWHE.simulate_segmented with 20 segments"),
+    "system-single": (bench_system_single, "scalar System.simulate"),
+    "profile-8760-batch": (bench_profile_batch, "hour of an annual profile with System.simulate_batch"),
+    "profile-8760-scalar": (bench_profile_scalar, "hour of an annual profile with warm-started System.simulate"),
+    "validation-sweeps": (bench_validation_sweeps, "batched sweep of a validation plot script"),
+    "sizing": (bench_sizing, "pipe length of the cop_cooling_diagram.py sizing loop"),
+}
+
+
+def run_benchmark(name: str, config: dict, scale: float = 1.0, repeat: int = 3):
+    """
+    Run one benchmark, keeping the fastest of several repeats
+    Each repeat builds new model objects, so caches and warm start states do not carry over.
+    :param name: benchmark name
+    :param config: system config
+    :param scale: workload size multiplier
+    :param repeat: number of repeats
+    :return: dict of benchmark metrics
+    """
+
+    workload = BENCHMARKS[name][0]
+    best = None
+    for _ in range(repeat):
+        run, counters = workload(config, scale)
+        start = perf_counter()
+        calls = run()
+        elapsed = perf_counter() - start
+        if best is None or elapsed < best["seconds"]:
+            best = {
+                "calls": calls,
+                "seconds": elapsed,
+                "calls-per-second": calls / elapsed if elapsed > 0 else 0.0,
+                "iterations-per-solve": None if counters.iterations is None else counters.iterations / calls,
+                "property-calls-per-solve": counters.get_property_calls() / calls,
+            }
+    return best
+
+
+def run_benchmarks(names: list = None, backend: str = "props-si", scale: float = 1.0, repeat: int = 3):
+    """
+    Run the benchmark suite
+    :param names: benchmark names, defaults to all
+    :param backend: fluid property backend name
+    :param scale: workload size multiplier
+    :param repeat: number of repeats per benchmark
+    :return: dict of run metadata and results
+    """
+
+    config = get_config(backend)
+    results = {}
+    for name in names or BENCHMARKS:
+        results[name] = run_benchmark(name, config, scale, repeat)
+
+    return {
+        "version": VERSION,
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "backend": backend,
+        "scale": scale,
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float = 0.1):
+    """
+    Compare benchmark results against a baseline
+    :param results: results of run_benchmarks
+    :param baseline: baseline results of run_benchmarks
+    :param threshold: allowed fractional change in the wrong direction before a metric is a regression
+    :return: list of (benchmark name, metric, baseline value, new value, fractional change) regressions
+    """
+
+    regressions = []
+    for name, metrics in results["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        for metric in COMPARED_METRICS:
+            old = base.get(metric)
+            new = metrics.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = -change if metric in HIGHER_IS_BETTER else change
+            if worse > threshold:
+                regressions.append((name, metric, old, new, change))
+    return regressions
+
+
+def format_results(results: dict, baseline: dict = None):
+    """
+    Format benchmark results as a table
+    :param results: results of run_benchmarks
+    :param baseline: optional baseline results, adding the change in calls per second
+    :return: table string
+    """
+
+    header = f"{'benchmark':<22}{'calls':>8}{'seconds':>10}{'calls/s':>12}{'iter/solve':>12}{'props/solve':>13}"
+    if baseline is not None:
+        header += f"{'vs base':>10}"
+    lines = [header]
+    for name, r in results["results"].items():
+        iterations = "-" if r["iterations-per-solve"] is None else f"{r['iterations-per-solve']:.2f}"
+        line = (f"{name:<22}{r['calls']:>8}{r['seconds']:>10.3f}{r['calls-per-second']:>12.1f}{iterations:>12}"
+                f"{r['property-calls-per-solve']:>13.2f}")
+        if baseline is not None:
+            base = baseline["results"].get(name)
+            if base and base["calls-per-second"]:
+                line += f"{r['calls-per-second'] / base['calls-per-second'] - 1:>+10.1%}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Fluid, SWHE, HeatPumpConstCOP and System hot paths")
+    parser.add_argument("names", nargs="*", metavar="name", help="benchmarks to run, defaults to all")
+    parser.add_argument("--list", action="store_true", help="list the benchmarks and what one call of each is")
+    parser.add_argument("--backend", default="props-si", help="fluid property backend")
+    parser.add_argument("--scale", type=float, default=1.0, help="workload size multiplier")
+    parser.add_argument("--quick", action="store_true", help="shortcut for --scale 0.1 --repeat 1")
+    parser.add_argument("--repeat", type=int, default=3, help="repeats per benchmark; the fastest is kept")
+    parser.add_argument("--output", help="path to write the results JSON file")
+    parser.add_argument("--baseline", help="path to a baseline results JSON file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="fractional change in the wrong direction that fails the comparison")
+    args = parser.parse_args(args)
+
+    if args.list:
+        for name, (_, description) in BENCHMARKS.items():
+            print(f"{name:<22}{description}")
+        return 0
+
+    unknown = [n for n in args.names if n not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+    if args.quick:
+        args.scale = 0.1
+        args.repeat = 1
+
+    results = run_benchmarks(args.names, args.backend, args.scale, args.repeat)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    print(format_results(results, baseline))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold)
+        for name, metric, old, new, change in regressions:
+            print(f"REGRESSION {name} {metric}: {old:.4g} -> {new:.4g} ({change:+.1%})")
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,7 @@
 import matplotlib.pyplot as plt
 import numpy as np
-from scipy.optimize import minimize
 
+from src.result_cache import ResultCache
 from src.system import System
 
 data = {
@@ -26,48 +26,22 @@ data = {
     }
 }
 
-system = System(data)
 
-
-def obj_f(pipe_length, q_zone, m_dot, t_sw, t_appr_target):
-    system.swhe.pipe.update_pipe(pipe_length)
-    t_appr = system.simulate(q_zone, m_dot, t_sw)
-    return (t_appr - t_appr_target) ** 2
+def size_pipe_lengths(cache, cop, q_cooling, t_appr):
+    config = {**data, "hp": {"cop": cop}}
+    inputs = {"q_zone": q_cooling, "m_dot": 0.5, "temperature_sw": 15, "t_appr": t_appr}
+    key = cache.make_key("system.size_pipe_lengths", config, inputs)
+    return cache.get_or_compute(key, lambda: System(config).size_pipe_lengths(q_cooling, 0.5, 15, t_appr))
 
 
 def create_diagram():
     q_cooling = -3516.85
     t_appr = np.arange(1.5, 6.5, 0.25)
+    cache = ResultCache()
 
-    pipe_length_init = 200
-    pipe_length = [pipe_length_init]
-
-    for t in t_appr:
-        res = minimize(obj_f, x0=np.array([pipe_length[-1]]), args=(q_cooling, 0.5, 15, t))
-        pipe_length.append(res.x[0])
-
-    pipe_length.pop(0)
-    pipe_length_norm_a = np.array(pipe_length) / abs(q_cooling) * 1000
-
-    system.hp.cop = 4.0
-    pipe_length = [pipe_length_init]
-
-    for t in t_appr:
-        res = minimize(obj_f, x0=np.array([pipe_length[-1]]), args=(q_cooling, 0.5, 15, t))
-        pipe_length.append(res.x[0])
-
-    pipe_length.pop(0)
-    pipe_length_norm_b = np.array(pipe_length) / abs(q_cooling) * 1000
-
-    system.hp.cop = 2.0
-    pipe_length = [pipe_length_init]
-
-    for t in t_appr:
-        res = minimize(obj_f, x0=np.array([pipe_length[-1]]), args=(q_cooling, 0.5, 15, t))
-        pipe_length.append(res.x[0])
-
-    pipe_length.pop(0)
-    pipe_length_norm_c = np.array(pipe_length) / abs(q_cooling) * 1000
+    pipe_length_norm_a = size_pipe_lengths(cache, 3.0, q_cooling, t_appr) / abs(q_cooling) * 1000
+    pipe_length_norm_b = size_pipe_lengths(cache, 4.0, q_cooling, t_appr) / abs(q_cooling) * 1000
+    pipe_length_norm_c = size_pipe_lengths(cache, 2.0, q_cooling, t_appr) / abs(q_cooling) * 1000
 
     fig, ax = plt.subplots()
     ax.plot(t_appr, pipe_length_norm_a, label="COP = 3.0")
@@ -0,0 +1,214 @@
+from typing import NamedTuple, Union
+
+import numpy as np
+
+from src.pipe import PipeArray
+from src.system import System
+
+# default number of bins of zone load, mass flow rate and surface water temperature
+DEFAULT_BINS = (40, 10, 20)
+
+
+class ProfileBins(NamedTuple):
+    """
+    Occupied bins of a load profile
+    Each bin is represented by the mean inputs of its timesteps. Heating and cooling timesteps never share a bin.
+    """
+
+    q_zone: np.ndarray  # mean zone load of each bin, [W]
+    m_dot: np.ndarray  # mean mass flow rate of each bin, [kg/s]
+    temperature_sw: np.ndarray  # mean surface water temperature of each bin, [C]
+    weights: np.ndarray  # number of timesteps in each bin
+    index: np.ndarray  # bin of each timestep
+    edges: list  # bin edges of the zone load, mass flow rate and surface water temperature
+
+
+class BinnedResult(NamedTuple):
+    """
+    Result of a binned profile simulation
+    With pipes, the results have a trailing dimension of one entry per pipe.
+    """
+
+    t_appr: np.ndarray  # approach temperature of each timestep, from its bin, [C]
+    bin_t_appr: np.ndarray  # approach temperature of each bin, [C]
+    bins: ProfileBins
+    totals: dict  # see calc_totals
+
+
+def calc_edges(values: np.ndarray, bins: Union[int, list, np.ndarray]):
+    """
+    Bin edges of one input
+    :param values: input values
+    :param bins: number of equal width bins over the range of the values, or bin edges
+    :return: bin edges
+    """
+
+    if np.ndim(bins) > 0:
+        edges = np.asarray(bins, dtype=float)
+        if edges.size < 2 or np.any(np.diff(edges) <= 0):
+            raise ValueError("Bin edges must be strictly increasing, with at least two edges")
+        return edges
+
+    if bins < 1:
+        raise ValueError(f"Number of bins must be at least 1: {bins}")
+    return np.linspace(values.min(), values.max(), int(bins) + 1)
+
+
+def bin_profile(q_zone: np.ndarray, m_dot: Union[float, np.ndarray], temperature_sw: Union[float, np.ndarray],
+                bins: tuple = DEFAULT_BINS):
+    """
+    Histogram a load profile into multidimensional bins
+    Values outside explicit bin edges fall into the first or last bin.
+    :param q_zone: zone loads, [W]
+    :param m_dot: mass flow rates through swhe, [kg/s]
+    :param temperature_sw: surface water temperatures, [C]
+    :param bins: bins of the zone load, mass flow rate and surface water temperature, each either a number of
+                 equal width bins over the range of the profile, or a sequence of bin edges
+    :return: ProfileBins of the occupied bins
+    """
+
+    inputs = np.broadcast_arrays(np.ravel(np.asarray(q_zone, dtype=float)), np.asarray(m_dot, dtype=float),
+                                 np.asarray(temperature_sw, dtype=float))
+    if len(bins) != len(inputs):
+        raise ValueError(f"Expected bins for {len(inputs)} inputs, got {len(bins)}")
+
+    edges = []
+    codes = (inputs[0] > 0).astype(np.intp)
+    for values, b in zip(inputs, bins):
+        e = calc_edges(values, b)
+        num_bins = e.size - 1
+        idx = np.clip(np.searchsorted(e, values, side="right") - 1, 0, num_bins - 1)
+        codes = codes * num_bins + idx
+        edges.append(e)
+
+    _, index, weights = np.unique(codes, return_inverse=True, return_counts=True)
+    index = index.ravel()
+    centers = [np.bincount(index, weights=values) / weights for values in inputs]
+    return ProfileBins(centers[0], centers[1], centers[2], weights, index, edges)
+
+
+def calc_totals(system: System, q_zone: np.ndarray, m_dot: np.ndarray, temperature_sw: np.ndarray,
+                t_appr: np.ndarray, weights: np.ndarray = None, timestep: float = 3600.0):
+    """
+    Annual totals of a profile
+    Sums run over the first dimension, so results with a trailing pipe dimension give one total per pipe.
+    :param system: simulated system, for the heat pump COP
+    :param q_zone: zone loads, [W]
+    :param m_dot: mass flow rates through swhe, [kg/s]
+    :param temperature_sw: surface water temperatures, [C]
+    :param t_appr: approach temperatures, [C]
+    :param weights: number of timesteps represented by each entry, defaults to 1
+    :param timestep: timestep length, [s]
+    :return: dict of zone heating, cooling and heat pump electric energy, [J], and mean, min and max approach
+             temperature, [C]
+    """
+
+    t_appr = np.asarray(t_appr, dtype=float)
+    shape = (-1,) + (1,) * (t_appr.ndim - 1)
+    q_zone, m_dot, temperature_sw = [np.reshape(np.broadcast_to(x, t_appr.shape[:1]), shape)
+                                     for x in (q_zone, m_dot, temperature_sw)]
+    weights = np.ones(t_appr.shape[:1]) if weights is None else np.asarray(weights, dtype=float)
+    weights = np.reshape(weights, shape)
+
+    cop = system.hp.calc_cop(q_zone, m_dot, temperature_sw + t_appr)
+    electric = np.abs(q_zone) / cop
+
+    return {
+        "heating": float(np.sum(weights * np.maximum(q_zone, 0.0))) * timestep,
+        "cooling": float(np.sum(weights * np.maximum(-q_zone, 0.0))) * timestep,
+        "electric": np.sum(weights * electric, axis=0) * timestep,
+        "t-appr-mean": np.sum(weights * t_appr, axis=0) / np.sum(weights),
+        "t-appr-min": np.min(t_appr, axis=0),
+        "t-appr-max": np.max(t_appr, axis=0),
+    }
+
+
+def simulate_binned(system: System, q_zone: np.ndarray, m_dot: Union[float, np.ndarray],
+                    temperature_sw: Union[float, np.ndarray], bins: tuple = DEFAULT_BINS, timestep: float = 3600.0,
+                    pipes: PipeArray = None):
+    """
+    Simulate a load profile by simulating each occupied bin once
+    :param system: system to simulate
+    :param q_zone: zone loads, [W]
+    :param m_dot: mass flow rates through swhe, [kg/s]
+    :param temperature_sw: surface water temperatures, [C]
+    :param bins: bins of the zone load, mass flow rate and surface water temperature, see bin_profile
+    :param timestep: timestep length, [s]
+    :param pipes: swhe pipe geometries to evaluate, optional, see System.simulate_batch
+    :return: BinnedResult
+    """
+
+    profile_bins = bin_profile(q_zone, m_dot, temperature_sw, bins)
+
+    q_bins, m_bins, t_bins = profile_bins.q_zone, profile_bins.m_dot, profile_bins.temperature_sw
+    if pipes is not None:
+        q_bins, m_bins, t_bins = q_bins[:, None], m_bins[:, None], t_bins[:, None]
+    bin_t_appr = system.simulate_batch(q_bins, m_bins, t_bins, pipes=pipes)
+
+    totals = calc_totals(system, profile_bins.q_zone, profile_bins.m_dot, profile_bins.temperature_sw, bin_t_appr,
+                         profile_bins.weights, timestep)
+    return BinnedResult(bin_t_appr[profile_bins.index], bin_t_appr, profile_bins, totals)
+
+
+def binning_error(system: System, q_zone: np.ndarray, m_dot: Union[float, np.ndarray],
+                  temperature_sw: Union[float, np.ndarray], result: BinnedResult, sample_size: int = None,
+                  seed: int = 0, timestep: float = 3600.0):
+    """
+    Report the binning error of a binned simulation against a full simulation of the profile
+    The full simulation uses the SWHE pipe of the system, so results with pipes are not supported.
+    :param system: system the binned result was simulated with
+    :param q_zone: zone loads, [W]
+    :param m_dot: mass flow rates through swhe, [kg/s]
+    :param temperature_sw: surface water temperatures, [C]
+    :param result: result of simulate_binned for the same profile
+    :param sample_size: number of randomly sampled timesteps to simulate, defaults to all timesteps
+    :param seed: random seed of the sample
+    :param timestep: timestep length, [s]
+    :return: dict with the number of timesteps, bins and sampled timesteps, the compression ratio, the largest
+             input range within a bin, the max and RMS approach temperature errors, [C], the relative error of the
+             electric energy, [-], and the error of the mean approach temperature, [C], over the sampled timesteps
+    """
+
+    if result.t_appr.ndim != 1:
+        raise ValueError("Binning errors are only available for results without pipes")
+
+    q_zone, m_dot, temperature_sw = np.broadcast_arrays(np.ravel(np.asarray(q_zone, dtype=float)),
+                                                        np.asarray(m_dot, dtype=float),
+                                                        np.asarray(temperature_sw, dtype=float))
+    num_steps = q_zone.size
+    num_bins = result.bins.weights.size
+
+    # largest spread of each input within a bin
+    spread = {}
+    for name, values in (("q-zone", q_zone), ("m-dot", m_dot), ("temperature-sw", temperature_sw)):
+        low = np.full(num_bins, np.inf)
+        high = np.full(num_bins, -np.inf)
+        np.minimum.at(low, result.bins.index, values)
+        np.maximum.at(high, result.bins.index, values)
+        spread[name] = float(np.max(high - low))
+
+    if sample_size is None or sample_size >= num_steps:
+        sample = np.arange(num_steps)
+    else:
+        sample = np.sort(np.random.RandomState(seed).choice(num_steps, sample_size, replace=False))
+
+    inputs = (q_zone[sample], m_dot[sample], temperature_sw[sample])
+    t_appr_exact = system.simulate_batch(*inputs)
+    t_appr_binned = result.t_appr[sample]
+    error = t_appr_binned - t_appr_exact
+
+    totals_exact = calc_totals(system, *inputs, t_appr_exact, timestep=timestep)
+    totals_binned = calc_totals(system, *inputs, t_appr_binned, timestep=timestep)
+    report = {
+        "timesteps": num_steps,
+        "bins": num_bins,
+        "compression": num_steps / num_bins,
+        "sampled": int(sample.size),
+        "input-spread": spread,
+        "t-appr-max-error": float(np.max(np.abs(error))),
+        "t-appr-rms-error": float(np.sqrt(np.mean(error ** 2))),
+    }
+    electric = float(totals_exact["electric"])
+    report["electric-error"] = abs(float(totals_binned["electric"]) - electric) / electric if electric else 0.0
+    report["t-appr-mean-error"] = abs(float(totals_binned["t-appr-mean"]) - float(totals_exact["t-appr-mean"]))
+    return report
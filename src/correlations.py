@@ -0,0 +1,344 @@
+"""
+Polynomial property correlations for water and aqueous glycol/alcohol mixtures
+
+Fitted to CoolProp (HEOS water, and the INCOMP MPG/MEG/MEA mixtures) at 101325 Pa over
+0-60% mass fraction. Properties are polynomials in the scaled temperature tau = T / 40 and
+scaled mass fraction xi = x / 0.6; viscosity is fitted as ln(viscosity).
+
+Valid temperature ranges:
+
+    WATER   0.01 to 99.9 C
+    PG, EG  freezing point (at least -50 C) to 100 C
+    EA      freezing point (at least -50 C) to 40 C
+
+Maximum relative error against CoolProp over the valid range:
+
+    fluid   conductivity  density  specific heat  viscosity  prandtl  beta
+    WATER   4.5e-7        6.9e-8   1.9e-6         1.6e-6     3.9e-6   1.2e-5 (of max value)
+    PG      1e-13         1e-13    1e-13          2e-13      2e-13    -
+    EG      1e-13         1e-13    1e-13          2e-13      2e-13    -
+    EA      1e-13         1e-13    1e-13          2e-13      2e-13    -
+
+The CoolProp mixture data are themselves polynomials, so the mixture fits are exact to
+round-off. As in CoolProp, the expansion coefficient is only available for water.
+"""
+
+from math import exp
+from typing import Union
+
+import numpy as np
+
+# temperature scale of tau, [C]
+TAU_SCALE = 40.0
+
+# valid ranges, [C], and maximum mass fraction
+WATER_RANGE = (0.01, 99.9)
+MIXTURE_T_MIN = -50.0
+MIXTURE_T_MAX = {"MPG": 100.0, "MEG": 100.0, "MEA": 40.0}
+X_MAX = 0.6
+
+# coefficients of tau ** i
+WATER_COEFFICIENTS = {
+    "conductivity": (
+        0.5556499180050656,
+        0.10246638924621732,
+        -0.04569345610458168,
+        0.027385322020208602,
+        -0.01770479010694971,
+        0.009075164255892871,
+        -0.0034740270811268238,
+        0.0009167784653002455,
+        -0.00014603665414300422,
+        1.0448604089187127e-05,
+    ),
+    "density": (
+        999.8431552262972,
+        2.7065418541516917,
+        -14.52172989257611,
+        6.608703186665735,
+        -3.749849891478778,
+        1.9141407464446412,
+        -0.7617247024992619,
+        0.20888066031319558,
+        -0.03426426572886189,
+        0.0025036059005161117,
+    ),
+    "specific_heat": (
+        4219.436809873834,
+        -137.96832521422343,
+        205.22820123012556,
+        -202.1228017726574,
+        161.87193839558537,
+        -102.17602220896572,
+        47.18515853411356,
+        -14.388413130763825,
+        2.5440816434353457,
+        -0.1961187383275449,
+    ),
+    "viscosity": (
+        -6.324560637212771,
+        -1.393672848455958,
+        0.5812826603091196,
+        -0.30588374289362946,
+        0.16132175377443217,
+        -0.07332957625363619,
+        0.026143906549636102,
+        -0.006600488414687219,
+        0.0010216404433022015,
+        -7.170656360650173e-05,
+    ),
+    "beta": (
+        -6.775009338349363e-05,
+        0.0007279723255837463,
+        -0.000509320543741984,
+        0.00042087988507687543,
+        -0.0003103586760205743,
+        0.00018471254443369354,
+        -8.01915474092822e-05,
+        2.316869741592193e-05,
+        -3.925873851082081e-06,
+        2.930436553462743e-07,
+    ),
+}
+
+# freezing point coefficients of xi ** j, [C]
+MIXTURE_FREEZE = {
+    "MPG": (-0.025071276065442835, -10.631700465408425, -48.35955890013056,
+            70.9495508486575, -73.32770689199967, 11.391840000000112),
+    "MEG": (0.0002850815544184992, -18.36855812754368, -4.257236234893387,
+            -40.22095931554684, 10.759089513600179, 0.8864639999998372),
+    "MEA": (-0.04732831151361599, -23.589224045112406, 13.832446190786317,
+            -217.92434997039098, 312.6774117600001, -129.85920000000007),
+}
+
+# coefficients of tau ** i * xi ** j, indexed [i][j]
+MIXTURE_COEFFICIENTS = {
+    "MPG": {
+        "conductivity": (
+            (0.5610542564355947, -0.2755354504852544, 0.0068754973691921685,
+             0.040641317674652316, -0.03429257348918398, 0.016360704000101207),
+            (0.08322972891101825, -0.16149222386635148, 0.13136233687688134,
+             -0.02048389446091398, -0.01868831999885261, -3.3530794404557196e-13),
+            (-0.014135727569205178, 0.057870954186813796, -0.06689003693444609,
+             0.022612608001306597, -9.682061160508842e-13, 3.1412835681021585e-13),
+            (-7.80969862424705e-05, -0.0017603986998575806, 0.00228026880036353,
+             -5.081324864770576e-13, 2.9828163773441715e-13, -6.413534495906766e-14),
+            (2.595998551992781e-15, 4.0285318451845466e-15, -4.7318965725298196e-14,
+             7.583153192134916e-14, -2.466838030481344e-14, -1.0243502538068863e-14),
+        ),
+        "density": (
+            (1000.2416049807822, 48.23415112344642, 37.84045466884668,
+             3.2943235008061915, -51.83846640533919, 18.21139200031835),
+            (1.477754387583965, -13.305336498703374, -52.604918619041904,
+             52.06487767434789, -11.513663997150623, -8.693416074706699e-10),
+            (-10.523191697700266, 8.95795217795381, -0.41578810712771885,
+             -2.4796799967256686, -2.4512654461749818e-09, 7.507334540571838e-10),
+            (1.3296585721777556, -1.3117721520389658, 0.7778304009018926,
+             -1.2910596080303134e-09, 8.016811268148715e-10, -1.8172765345550221e-10),
+            (1.1585341735542728e-12, 2.623832973717562e-11, -1.279895477606327e-10,
+             1.874019472662872e-10, -7.967558936263034e-11, -5.840049820065087e-12),
+        ),
+        "specific_heat": (
+            (4213.540975335911, -1147.4657767292892, 1798.3068202184957,
+             -3166.085381703283, 1937.0755821558735, -385.6118399987702),
+            (-75.80795332209767, 802.1283460549112, -1367.241862152005,
+             1191.8408636008198, -369.87839998734546, -3.8505562901070705e-09),
+            (47.1074320240161, -195.95417303935488, 251.2565344993738,
+             -101.95199998536606, -1.0963000351103114e-08, 3.374846761506638e-09),
+            (-6.589353678471026, 17.327930648569065, -11.220479995930088,
+             -5.871720581040486e-09, 3.6944977513364783e-09, -8.580004375369065e-10),
+            (7.634411507109266e-12, 1.1444823604027606e-10, -5.854427286079587e-10,
+             8.786540421519041e-10, -3.992270404157979e-10, -1.3400111632801815e-11),
+        ),
+        "viscosity": (
+            (-6.316194424585374, 2.5684080946568435, -1.1839374743894373,
+             6.1120098451547795, -7.4861652329344395, 2.7713663999498848, 1.4874272300706988e-11),
+            (-1.343492527683232, -0.6027786213565219, -2.2952051257929624,
+             1.3339160215601615, 0.23198399974558662, 1.7571454730176815e-10, -4.7949492366703244e-11),
+            (0.37734075576210485, 0.22776279558207943, 0.7765226179545902,
+             -0.5491584002910604, 3.622511577122211e-10, -2.2624527680196226e-10, 5.621111744656976e-11),
+            (-0.05568083312848988, -0.06089553855289634, -0.010287360093443084,
+             2.0356574836397297e-10, -2.2477421757026898e-10, 1.219069327710763e-10, -2.5691153577779904e-11),
+            (5.861241931815844e-13, -7.553987852141844e-12, 3.298623692856285e-11,
+             -6.515540346142505e-11, 6.224289215762861e-11, -2.67430999684189e-11, 3.617275339269955e-12),
+            (-8.845369770788396e-14, 1.0630261416276762e-12, -4.349972564546657e-12,
+             7.777177158695192e-12, -6.154561689739372e-12, 1.5786548854837175e-12, 1.7790847496236523e-13),
+        ),
+    },
+    "MEG": {
+        "conductivity": (
+            (0.5612071282163436, -0.2179554171380105, -0.07935193764697496,
+             0.1436291969877779, -0.08116791727723933, 0.020824128000101857),
+            (0.08318044341358509, -0.13851932123559224, 0.13084871764994518,
+             -0.07002944536459539, 0.013245120001124436, -3.028428542105335e-13),
+            (-0.014752916957209402, 0.044907196102694905, -0.043443968855932096,
+             0.01383782400123061, -9.249018077115066e-13, 3.5477638467621326e-13),
+            (0.0001909699384590654, -0.0009987936998922876, 0.0005448960003373652,
+             -4.968855742430275e-13, 2.9178660789900527e-13, -5.92113382659876e-14),
+            (6.128259995809714e-15, -1.20843390381349e-14, -3.0031282810110245e-14,
+             8.528588672772318e-14, -2.7303367229175144e-14, -2.3166650301350155e-14),
+        ),
+        "density": (
+            (999.2662728921289, 82.73652892980914, 17.079453600688492,
+             31.322720644166957, -80.5831044054624, 38.03241600016255),
+            (0.07668799797741037, -7.5596483007779645, -68.27905601717035,
+             93.81247725099186, -37.38182399827767, -4.752638350850274e-10),
+            (-8.107525128076672, 6.473326183603814, 1.1131970098600186,
+             -3.9847679981228517, -1.4005032822968415e-09, 5.157532509617419e-10),
+            (0.5724168132369739, -1.1153339014036339, 1.1478528005121618,
+             -7.37628031958766e-10, 4.244870030587396e-10, -8.225597189063414e-11),
+            (7.269233939164923e-12, -1.1835349049878484e-11, -4.9068349065884304e-11,
+             1.206166353885907e-10, -3.5341438625288644e-11, -3.2448458660495535e-11),
+        ),
+        "specific_heat": (
+            (4210.578939376314, -1140.48010635466, 1106.0346879879646,
+             -3560.0157027889986, 3608.9706764145835, -1258.156799999844),
+            (-68.30499211601204, 527.0409403905464, -501.3764358076684,
+             535.2204155846982, -221.46047999556254, -1.0380588235897744e-09),
+            (41.8068345071405, -157.01836945060893, 156.1381971801275,
+             -56.78207999503535, -3.759055886813215e-09, 1.665304428806938e-09),
+            (-5.600288669977357, 17.61908548598931, -16.445951998596502,
+             -2.161221374128905e-09, 1.2705958340791615e-09, -2.6335026730722166e-10),
+            (4.231343610038132e-11, -1.1595595793224355e-10, -8.232743257331343e-11,
+             4.254656894360432e-10, -1.2789940657981414e-10, -1.4643313233347492e-10),
+        ),
+        "viscosity": (
+            (-6.332729365080657, 1.4537154214894144, 1.8309160682520091,
+             -4.076346455666455, 4.0528695798942795, -1.450224000016345, 4.733994315749077e-12),
+            (-1.302500571539809, -0.5387965957652227, 0.23077949157858796,
+             -0.39067427237061725, 0.09491903991184325, 6.025282654862598e-11, -1.6155565493203207e-11),
+            (0.3639811178638746, -0.065617493958157, 0.19896887132202798,
+             0.1404172799105843, 1.0670626923164598e-10, -6.387615617132403e-11, 1.524661115303281e-11),
+            (-0.05625354286460089, 0.09064638336642401, -0.14918400002765525,
+             5.612567774720144e-11, -5.6626593356534994e-11, 2.739679545807417e-11, -5.0515053966147976e-12),
+            (2.5066383255421316e-13, -2.3777799724612696e-12, 9.213374131075515e-12,
+             -1.6440691961526165e-11, 1.3439163825273208e-11, -4.200261877908567e-12, 9.198139670277114e-14),
+            (-3.795767940712558e-14, 3.320154059878892e-13, -1.1635503426201283e-12,
+             1.826310208670018e-12, -1.1352068925459102e-12, 3.0977519095251505e-14, 1.523777002127294e-13),
+        ),
+    },
+    "MEA": {
+        "conductivity": (
+            (0.5613146066396788, -0.36069241154420884, 0.04738441139068855,
+             0.041290573808897384, -0.0005398046714201602, -0.0128537279999245),
+            (0.077696063720105, -0.18616812005216923, 0.24903024775531998,
+             -0.1969221086219819, 0.060497280000986864, -3.126018701327364e-13),
+            (-0.008284572817582353, 0.05426733569307229, -0.09515141705201566,
+             0.04938624000157514, -1.028416199176661e-12, 2.5353392458682205e-13),
+            (-0.0005874566253114773, -0.0031636552093101717, 0.0035758080007364506,
+             -6.038711329785952e-13, 1.0506844654469604e-13, 5.579268583466735e-14),
+            (-2.2779322105453693e-14, 1.138341752706704e-13, -1.4507091197385937e-13,
+             -2.69119109448193e-14, 1.4967732085189953e-13, -6.633438535144413e-14),
+        ),
+        "density": (
+            (1000.0830087291922, -130.8334497796477, 326.5601149653156,
+             -565.4711243922089, 341.7083391022984, -64.68076799996435),
+            (1.4910237456417317, 12.862342747333443, -212.59639393364068,
+             248.44837788212018, -82.42559999936509, -2.0152213352994577e-10),
+            (-12.071295754888947, -2.5077816083654394, 47.46851867763013,
+             -33.20179199842946, -1.144506751308732e-09, 3.2031423046313116e-10),
+            (2.9388537656315936, -4.425842854242815, 0.9345024009868882,
+             -1.2810104153909365e-09, 7.843800547528737e-10, -1.8165145541902657e-10),
+            (-1.9829618088578006e-11, 1.3920709645115726e-10, -3.3045543907967354e-10,
+             3.5083288295796703e-10, -1.618028897733123e-10, 2.4522522222839473e-11),
+        ),
+        "specific_heat": (
+            (4217.122792446976, 1625.460065209257, -2092.8722717368373,
+             -8297.688246820991, 14324.009435134138, -6446.303999999343),
+            (-83.01633709508735, -1764.8365226740045, 7826.045874163827,
+             -8241.863000843114, 2774.9952000091344, -2.8563965982766928e-09),
+            (-124.75742219678087, 519.2551129705436, -1178.456152563055,
+             656.9856000178685, -1.1998166938529841e-08, 3.086577865778765e-09),
+            (191.18481434876287, -386.0202563371184, 171.90144000985663,
+             -9.651772267573934e-09, 3.608531513264379e-09, -1.582263729039461e-10),
+            (-2.84747429637844e-10, 1.571001299443889e-09, -2.6492441354394155e-09,
+             1.2716276829584477e-09, 5.62745869480694e-10, -4.556437398395218e-10),
+        ),
+        "viscosity": (
+            (-6.322277219680769, 3.8397542219628544, 0.4282182930500079,
+             -9.827142680998328, 9.906103982337186, -3.2114880000025443, 5.030155322706717e-13),
+            (-1.5468310802270735, -3.0113314347784783, 3.6645518268392987,
+             -0.2756880468716538, -0.49149504002054856, 1.4388368348485156e-11, -3.9972141158139146e-12),
+            (0.9697010856610632, 0.15215084155209055, -1.310508771262588,
+             0.656294400003466, -1.268985977779491e-11, 1.3236712128484964e-11, -4.660009858921011e-12),
+            (-0.43212728291165586, 0.7106104988147237, -0.4531967999878014,
+             -4.034472841918279e-11, 6.262985109275252e-11, -4.656865627389679e-11, 1.33713316752981e-11),
+            (-7.216570783363457e-14, 2.0692100062098507e-12, -1.0920399548710074e-11,
+             2.3678299981652533e-11, -2.4585728271868374e-11, 1.1740068650410217e-11, -1.916654238549162e-12),
+            (4.995944856458154e-14, -6.467064580696514e-13, 1.117455362819831e-12,
+             3.912821392073829e-12, -1.3474427559899268e-11, 1.3818017986207327e-11, -4.759358919382541e-12),
+        ),
+    },
+}
+
+
+def horner(coefficients: tuple, x: Union[float, np.ndarray]):
+    """
+    Evaluate a polynomial with Horner's method
+    :param coefficients: polynomial coefficients, lowest order first
+    :param x: independent variable
+    :return: polynomial value
+    """
+
+    value = coefficients[-1]
+    for c in coefficients[-2::-1]:
+        value = value * x + c
+    return value
+
+
+def get_coefficients(fluid_name: str, concentration: float = None):
+    """
+    Get the temperature polynomial coefficients of each property of a fluid
+    :param fluid_name: "WATER", "MPG", "MEG", or "MEA"
+    :param concentration: mass fraction, 0-0.6, for mixtures
+    :return: dict of property name to coefficients of tau ** i, and "range" to the valid temperature range, [C]
+    """
+
+    if fluid_name == "WATER":
+        return {**WATER_COEFFICIENTS, "range": WATER_RANGE}
+
+    if fluid_name not in MIXTURE_COEFFICIENTS:
+        raise ValueError(f"No property correlations for fluid: {fluid_name}")
+    if concentration is None or not 0 <= concentration <= X_MAX:
+        raise ValueError(f"Mixture concentration must be between 0 and {X_MAX}: {concentration}")
+
+    xi = concentration / X_MAX
+    coefficients = {name: tuple(horner(row, xi) for row in rows)
+                    for name, rows in MIXTURE_COEFFICIENTS[fluid_name].items()}
+    coefficients["range"] = (max(horner(MIXTURE_FREEZE[fluid_name], xi), MIXTURE_T_MIN), MIXTURE_T_MAX[fluid_name])
+    return coefficients
+
+
+def eval_correlation(coefficients: dict, name: str, temperature: Union[int, float, np.ndarray]):
+    """
+    Evaluate a property correlation
+    Scalar temperatures outside of the valid range raise a ValueError;
+    array temperatures outside of the valid range are returned as inf.
+    :param coefficients: dict of property coefficients, from get_coefficients
+    :param name: property name: "conductivity", "density", "specific_heat", "viscosity", "prandtl", or "beta"
+    :param temperature: temperature, [C]
+    :return: property value
+    """
+
+    if name == "prandtl":
+        mu = eval_correlation(coefficients, "viscosity", temperature)
+        cp = eval_correlation(coefficients, "specific_heat", temperature)
+        return mu * cp / eval_correlation(coefficients, "conductivity", temperature)
+
+    if name not in coefficients:
+        raise ValueError(f"No correlation for property: {name}")
+
+    t_min, t_max = coefficients["range"]
+    if isinstance(temperature, np.ndarray) and temperature.ndim > 0:
+        value = horner(coefficients[name], temperature / TAU_SCALE)
+        if name == "viscosity":
+            value = np.exp(value)
+        return np.where((temperature < t_min) | (temperature > t_max), np.inf, value)
+
+    if not t_min <= temperature <= t_max:
+        raise ValueError(f"Temperature outside of the correlation range {t_min:0.2f}-{t_max:0.2f} C: {temperature}")
+
+    value = horner(coefficients[name], temperature / TAU_SCALE)
+    if name == "viscosity":
+        return exp(value)
+    return value
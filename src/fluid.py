@@ -1,10 +1,40 @@
-from typing import Union
+from typing import NamedTuple, Union
 
-from CoolProp.CoolProp import PropsSI
+import numpy as np
+
+from src.property_backends import get_backend
+from src.property_cache import PropertyCache
+
+# CoolProp output keys of the FluidState fields
+STATE_KEYS = ("CONDUCTIVITY", "D", "C", "VISCOSITY", "PRANDTL", "ISOBARIC_EXPANSION_COEFFICIENT")
+
+
+class FluidState(NamedTuple):
+    """
+    Fluid properties at one temperature, or arrays of properties at many temperatures
+    beta is None for fluids that do not support it (incompressible mixtures)
+    """
+
+    conductivity: Union[float, np.ndarray]
+    density: Union[float, np.ndarray]
+    specific_heat: Union[float, np.ndarray]
+    viscosity: Union[float, np.ndarray]
+    prandtl: Union[float, np.ndarray]
+    beta: Union[float, np.ndarray, None]
+
+    @property
+    def viscosity_kinematic(self):
+        return self.viscosity / self.density
+
+    @property
+    def alpha(self):
+        return self.conductivity / (self.density * self.specific_heat)
 
 
 class Fluid(object):
-    def __init__(self, data: dict):
+    def __init__(self, data: dict, cache: PropertyCache = None):
+        self.cache = cache
+        self.property_calls = 0
         self.concentration = None
         self.fluid_str = None
         if "concentration" in data:
@@ -12,6 +42,16 @@ class Fluid(object):
         else:
             self.init_fluid(fluid_name=data["fluid-name"])
 
+        # property engine, see src.property_backends
+        self.backend = data.get("backend", "props-si").lower()
+        self.engine = get_backend(self.backend, self.fluid_str)
+
+        # CoolProp does not provide the expansion coefficient of incompressible mixtures
+        if self.fluid_str.startswith("INCOMP::"):
+            self.state_keys = STATE_KEYS[:-1]
+        else:
+            self.state_keys = STATE_KEYS
+
     @staticmethod
     def get_valid_fluid_str(fluid_name: str, concentration: Union[int, float] = None):
         """
@@ -54,7 +94,7 @@ class Fluid(object):
             self.fluid_str = self.get_valid_fluid_str(fluid_name)
 
     @staticmethod
-    def c_to_k(temp_in_c: Union[int, float]):
+    def c_to_k(temp_in_c: Union[int, float, np.ndarray]):
         """
         Convert Celsius to Kelvin
         :param temp_in_c: temperature, [C]
@@ -62,39 +102,102 @@ class Fluid(object):
         """
         return temp_in_c + 273.15
 
-    def conductivity(self, temperature: Union[int, float]):
+    def calc_property(self, key: str, temperature: Union[int, float, np.ndarray]):
+        """
+        Evaluate a fluid property with the selected backend
+
+        Array temperatures are evaluated with a single batched backend call and bypass the cache.
+        Invalid states in an array (e.g. below the freezing point) are returned as inf.
+
+        :param key: CoolProp output key
+        :param temperature: temperature, [C]
+        :return: property value
+        """
+
+        if not isinstance(temperature, (int, float)) and np.ndim(temperature) > 0:
+            return self.eval_property(key, np.asarray(temperature, dtype=float))
+        if self.cache is not None:
+            return self.cache.get(key, temperature, self.fluid_str, lambda t: self.eval_property(key, t),
+                                  self.backend)
+        return self.eval_property(key, temperature)
+
+    def eval_property(self, key: str, temperature: Union[int, float, np.ndarray]):
+        """
+        Evaluate a fluid property with the selected backend, bypassing the cache
+        :param key: CoolProp output key
+        :param temperature: temperature, [C]
+        :return: property value
+        """
+
+        self.property_calls += 1
+        if isinstance(temperature, np.ndarray) and temperature.ndim > 1:
+            return np.reshape(self.engine.eval_property(key, temperature.ravel()), temperature.shape)
+        return self.engine.eval_property(key, temperature)
+
+    def state(self, temperature: Union[int, float, np.ndarray]):
+        """
+        Evaluate all fluid properties at a temperature with a single backend call
+        :param temperature: temperature, [C]
+        :return: FluidState
+        """
+
+        if not isinstance(temperature, (int, float)) and np.ndim(temperature) > 0:
+            return self.eval_state(np.asarray(temperature, dtype=float))
+        if self.cache is not None:
+            return self.cache.get("STATE", temperature, self.fluid_str, self.eval_state, self.backend)
+        return self.eval_state(temperature)
+
+    def eval_state(self, temperature: Union[int, float, np.ndarray]):
+        """
+        Evaluate all fluid properties with the selected backend, bypassing the cache
+        :param temperature: temperature, [C]
+        :return: FluidState
+        """
+
+        self.property_calls += 1
+        if isinstance(temperature, np.ndarray) and temperature.ndim > 1:
+            values = [np.reshape(v, temperature.shape)
+                      for v in self.engine.eval_state(self.state_keys, temperature.ravel())]
+        else:
+            values = list(self.engine.eval_state(self.state_keys, temperature))
+
+        if len(values) < len(STATE_KEYS):
+            values.append(None)
+        return FluidState(*values)
+
+    def conductivity(self, temperature: Union[int, float, np.ndarray]):
         """
         Calculate the fluid conductivity
         :param temperature: temperature, [C]
         :return: conductivity, [W/m-K]
         """
-        return PropsSI("CONDUCTIVITY", "T", self.c_to_k(temperature), "P", 101325, self.fluid_str)
+        return self.calc_property("CONDUCTIVITY", temperature)
 
-    def density(self, temperature: Union[int, float]):
+    def density(self, temperature: Union[int, float, np.ndarray]):
         """
         Calculate the fluid density
         :param temperature: temperature, [C]
         :return: density, [kg/m^3]
         """
-        return PropsSI("D", "T", self.c_to_k(temperature), "P", 101325, self.fluid_str)
+        return self.calc_property("D", temperature)
 
-    def specific_heat(self, temperature: Union[int, float]):
+    def specific_heat(self, temperature: Union[int, float, np.ndarray]):
         """
         Calculates the fluid specific heat
         :param temperature: temperature, [C]
         :return: specific heat, [J/kg-K]
         """
-        return PropsSI("C", "T", self.c_to_k(temperature), "P", 101325, self.fluid_str)
+        return self.calc_property("C", temperature)
 
-    def viscosity(self, temperature: Union[int, float]):
+    def viscosity(self, temperature: Union[int, float, np.ndarray]):
         """
         Calculate the dynamic viscosity of the fluid
         :param temperature: temperature, [C]
         :return: dynamic viscosity, [Pa-s]
         """
-        return PropsSI("VISCOSITY", "T", self.c_to_k(temperature), "P", 101325, self.fluid_str)
+        return self.calc_property("VISCOSITY", temperature)
 
-    def viscosity_kinematic(self, temperature: Union[int, float]):
+    def viscosity_kinematic(self, temperature: Union[int, float, np.ndarray]):
         """
         Calculate the kinematic viscosity of the fluid
         :param temperature: temperature, [C]
@@ -103,23 +206,23 @@ class Fluid(object):
 
         return self.viscosity(temperature) / self.density(temperature)
 
-    def prandtl(self, temperature: Union[int, float]):
+    def prandtl(self, temperature: Union[int, float, np.ndarray]):
         """
         Calculate the Prandtl number of the fluid
         :param temperature: temperature, [C]
         :return: Prandtl no, [-]
         """
-        return PropsSI("PRANDTL", "T", self.c_to_k(temperature), "P", 101325, self.fluid_str)
+        return self.calc_property("PRANDTL", temperature)
 
-    def beta(self, temperature: Union[int, float]):
+    def beta(self, temperature: Union[int, float, np.ndarray]):
         """
         Calculate the coefficient of volume expansion
         :param temperature: temperature, [C]
         :return: coefficient of volume expansion, [-]
         """
-        return PropsSI("ISOBARIC_EXPANSION_COEFFICIENT", "T", self.c_to_k(temperature), "P", 101325, self.fluid_str)
+        return self.calc_property("ISOBARIC_EXPANSION_COEFFICIENT", temperature)
 
-    def alpha(self, temperature: Union[int, float]):
+    def alpha(self, temperature: Union[int, float, np.ndarray]):
         """
         Calculate the thermal diffusivity
         :param temperature: temperature, [C]
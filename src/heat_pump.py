@@ -1,16 +1,26 @@
+import csv
+from pathlib import Path
 from typing import Union
 
+import numpy as np
+
 from src.fluid import Fluid
+from src.property_cache import PropertyCache
+from src.utilities import GridInterpolator
+
+# performance map axis keys, in the order of the COP table dimensions
+PERFORMANCE_MAP_AXES = ("entering-temperature", "load", "flow")
 
 
 class HeatPumpConstCOP(object):
 
-    def __init__(self, data: dict):
+    def __init__(self, data: dict, cache: PropertyCache = None):
         super().__init__()
         self.cop = data["cop"]
-        self.fluid = Fluid(data["fluid"])
+        self.fluid = Fluid(data["fluid"], cache)
 
-    def calc_cop(self):
+    def calc_cop(self, q_zone: Union[int, float, np.ndarray] = None, m_dot_src: Union[int, float, np.ndarray] = None,
+                 inlet_temp_src: Union[int, float, np.ndarray] = None):
         return self.cop
 
     def simulate_heating(self, q_zone: Union[int, float], m_dot_src: Union[int, float], inlet_temp: Union[int, float]):
@@ -23,8 +33,152 @@ class HeatPumpConstCOP(object):
         cp_f = self.fluid.specific_heat(inlet_temp)
         return inlet_temp - q_src / (m_dot_src * cp_f)
 
-    def simulate(self, q_zone: Union[int, float], m_dot_src: Union[int, float], inlet_temp_src: Union[int, float]):
-        if q_zone > 0:
+    def simulate(self, q_zone: Union[int, float, np.ndarray], m_dot_src: Union[int, float, np.ndarray],
+                 inlet_temp_src: Union[int, float, np.ndarray]):
+        if np.ndim(q_zone) > 0 or np.ndim(m_dot_src) > 0 or np.ndim(inlet_temp_src) > 0:
+            q_zone = np.asarray(q_zone, dtype=float)
+            q_src = q_zone * (1 + np.where(q_zone > 0, -1.0, 1.0) / self.cop)
+            inlet_temp_src = np.broadcast_to(inlet_temp_src, np.broadcast(q_zone, m_dot_src, inlet_temp_src).shape)
+            cp_f = self.fluid.specific_heat(inlet_temp_src)
+            return inlet_temp_src - q_src / (m_dot_src * cp_f)
+        elif q_zone > 0:
             return self.simulate_heating(q_zone, m_dot_src, inlet_temp_src)
         else:
             return self.simulate_cooling(q_zone, m_dot_src, inlet_temp_src)
+
+
+def read_performance_map(path: Union[str, Path]) -> dict:
+    """
+    Read a heat pump performance map from a CSV file of manufacturer table rows
+    :param path: path to CSV file with a header row of "entering-temperature", [C], "load", [W],
+                 optionally "flow", [kg/s], and "heating-cop" and "cooling-cop" columns, [-].
+                 Every combination of the axis values must appear exactly once.
+    :return: performance map dict, see HeatPumpPerfMap
+    """
+
+    with open(path, newline="") as f:
+        reader = csv.DictReader(f)
+        fieldnames = reader.fieldnames or []
+        missing = [c for c in ("entering-temperature", "load", "heating-cop", "cooling-cop") if c not in fieldnames]
+        if missing:
+            raise ValueError(f"Performance map file is missing columns: {', '.join(missing)}")
+        axes = [k for k in PERFORMANCE_MAP_AXES if k in fieldnames]
+        columns = axes + ["heating-cop", "cooling-cop"]
+        rows = np.array([[float(row[c]) for c in columns] for row in reader])
+
+    if rows.size == 0:
+        raise ValueError("Performance map file has no rows")
+
+    grid = [np.unique(rows[:, i]) for i in range(len(axes))]
+    shape = tuple(a.size for a in grid)
+    if rows.shape[0] != int(np.prod(shape)):
+        raise ValueError("Performance map rows do not form a complete grid")
+
+    index = tuple(np.searchsorted(a, rows[:, i]) for i, a in enumerate(grid))
+    filled = np.zeros(shape, dtype=bool)
+    filled[index] = True
+    if not np.all(filled):
+        raise ValueError("Performance map rows do not form a complete grid")
+
+    data = {k: a.tolist() for k, a in zip(axes, grid)}
+    for i, key in enumerate(("heating-cop", "cooling-cop")):
+        table = np.empty(shape)
+        table[index] = rows[:, len(axes) + i]
+        data[key] = table.tolist()
+    return data
+
+
+class HeatPumpPerfMap(object):
+
+    def __init__(self, data: dict, cache: PropertyCache = None):
+        """
+        Heat pump with the COP interpolated from manufacturer performance tables
+
+        The COP is a multilinear interpolation over entering source temperature, zone load magnitude
+        and, optionally, source mass flow rate, held constant beyond the table edges. Heating uses the
+        heating COP table (q_zone > 0), cooling the cooling COP table.
+
+        :param data: dict with "performance-map" and "fluid". The performance map is either a CSV file path,
+                     see read_performance_map, or a dict with "entering-temperature", [C], "load", [W],
+                     optionally "flow", [kg/s], and "heating-cop" and "cooling-cop" tables, [-],
+                     nested in the order entering temperature, load, flow.
+        :param cache: shared fluid property cache, optional
+        """
+
+        perf_map = data["performance-map"]
+        if isinstance(perf_map, (str, Path)):
+            perf_map = read_performance_map(perf_map)
+
+        axes = [perf_map[k] for k in PERFORMANCE_MAP_AXES if k in perf_map]
+        self.has_flow = "flow" in perf_map
+        self.heating_cop = GridInterpolator(axes, perf_map["heating-cop"])
+        self.cooling_cop = GridInterpolator(axes, perf_map["cooling-cop"])
+
+        if np.any(self.heating_cop.values <= 0) or np.any(self.cooling_cop.values <= 0):
+            raise ValueError("Performance map COP values must be positive")
+
+        self.fluid = Fluid(data["fluid"], cache)
+
+    def calc_cop(self, q_zone: Union[int, float, np.ndarray], m_dot_src: Union[int, float, np.ndarray],
+                 inlet_temp_src: Union[int, float, np.ndarray]):
+        """
+        Interpolate the COP
+        :param q_zone: zone load, positive for heating, [W]
+        :param m_dot_src: source side mass flow rate, [kg/s]
+        :param inlet_temp_src: source side entering temperature, [C]
+        :return: COP, [-]
+        """
+
+        if np.ndim(q_zone) > 0 or np.ndim(m_dot_src) > 0 or np.ndim(inlet_temp_src) > 0:
+            q_zone, m_dot_src, inlet_temp_src = np.broadcast_arrays(np.asarray(q_zone, dtype=float),
+                                                                    np.asarray(m_dot_src, dtype=float),
+                                                                    np.asarray(inlet_temp_src, dtype=float))
+            cop = np.empty(q_zone.shape)
+            for table, mask in ((self.heating_cop, q_zone > 0), (self.cooling_cop, q_zone <= 0)):
+                if np.any(mask):
+                    coords = [inlet_temp_src[mask], np.abs(q_zone[mask])]
+                    if self.has_flow:
+                        coords.append(m_dot_src[mask])
+                    cop[mask] = table(*coords)
+            return cop
+
+        table = self.heating_cop if q_zone > 0 else self.cooling_cop
+        if self.has_flow:
+            return table(inlet_temp_src, abs(q_zone), m_dot_src)
+        return table(inlet_temp_src, abs(q_zone))
+
+    def simulate(self, q_zone: Union[int, float, np.ndarray], m_dot_src: Union[int, float, np.ndarray],
+                 inlet_temp_src: Union[int, float, np.ndarray]):
+        """
+        Simulate the source side outlet temperature
+        :param q_zone: zone load, positive for heating, [W]
+        :param m_dot_src: source side mass flow rate, [kg/s]
+        :param inlet_temp_src: source side entering temperature, [C]
+        :return: source side outlet temperature, [C]
+        """
+
+        cop = self.calc_cop(q_zone, m_dot_src, inlet_temp_src)
+        if np.ndim(cop) > 0:
+            q_zone = np.asarray(q_zone, dtype=float)
+            q_src = q_zone * (1 + np.where(q_zone > 0, -1.0, 1.0) / cop)
+            inlet_temp_src = np.broadcast_to(inlet_temp_src, cop.shape)
+        elif q_zone > 0:
+            q_src = q_zone * (1 - 1 / cop)
+        else:
+            q_src = q_zone * (1 + 1 / cop)
+
+        cp_f = self.fluid.specific_heat(inlet_temp_src)
+        return inlet_temp_src - q_src / (m_dot_src * cp_f)
+
+
+def get_heat_pump(data: dict, cache: PropertyCache = None):
+    """
+    Build the heat pump model named by its config
+    :param data: heat pump config, with "performance-map" for HeatPumpPerfMap, or "cop" for HeatPumpConstCOP
+    :param cache: shared fluid property cache, optional
+    :return: heat pump
+    """
+
+    if "performance-map" in data:
+        return HeatPumpPerfMap(data, cache)
+    return HeatPumpConstCOP(data, cache)
@@ -0,0 +1,168 @@
+import json
+from collections import Counter
+from functools import wraps
+from time import perf_counter
+
+from src.fluid import Fluid
+from src.heat_pump import HeatPumpConstCOP, HeatPumpPerfMap
+from src.pipe import Pipe
+from src.swhe import SWHE
+from src.system import System
+
+
+def iterations_from_last_solve(obj, result):
+    return obj.last_solve.get("iterations")
+
+
+def iterations_from_result(obj, result):
+    return result[3]
+
+
+# instrumented methods: class, method name, index of the positional argument that names the
+# property (or None), and function of (object, result) returning the solver iterations (or None)
+TARGETS = (
+    (Fluid, "conductivity", None, None),
+    (Fluid, "density", None, None),
+    (Fluid, "specific_heat", None, None),
+    (Fluid, "viscosity", None, None),
+    (Fluid, "viscosity_kinematic", None, None),
+    (Fluid, "prandtl", None, None),
+    (Fluid, "beta", None, None),
+    (Fluid, "alpha", None, None),
+    (Fluid, "state", None, None),
+    (Fluid, "eval_property", 0, None),
+    (Fluid, "eval_state", None, None),
+    (Pipe, "calc_cond_resistance", None, None),
+    (SWHE, "calc_inside_conv_resistance", None, None),
+    (SWHE, "calc_outside_conv_resistance", None, None),
+    (SWHE, "calc_inside_fouling_resistance", None, None),
+    (SWHE, "calc_outside_fouling_resistance", None, None),
+    (SWHE, "compile", None, None),
+    (SWHE, "calc_coil", None, None),
+    (SWHE, "solve_fixed_point", None, iterations_from_result),
+    (SWHE, "solve_secant", None, iterations_from_result),
+    (SWHE, "simulate", None, iterations_from_last_solve),
+    (SWHE, "simulate_batch", None, None),
+    (SWHE, "simulate_segmented", None, iterations_from_last_solve),
+    (HeatPumpConstCOP, "simulate", None, None),
+    (HeatPumpPerfMap, "simulate", None, None),
+    (System, "simulate", None, iterations_from_last_solve),
+    (System, "simulate_batch", None, None),
+)
+
+# the active instrumentation, if any
+_ACTIVE = None
+
+
+class Instrumentation(object):
+    def __init__(self, targets: tuple = TARGETS):
+        """
+        Opt-in call counters, timers and solver iteration histograms for the model hot paths
+
+        Use as a context manager. The target methods are wrapped on their classes on entry and
+        restored on exit, so the model code runs unmodified when no instrumentation is active.
+        Times are inclusive of nested instrumented calls, e.g. SWHE.simulate includes its
+        Fluid property calls.
+
+        with Instrumentation() as inst:
+            system.simulate(1000, 0.5, 15)
+        inst.to_dict()
+
+        :param targets: methods to instrument, in the form of TARGETS
+        """
+
+        self.targets = targets
+        self.calls = {}
+        self.iterations = {}
+        self._originals = []
+
+    def __enter__(self):
+        global _ACTIVE
+        if _ACTIVE is not None:
+            raise RuntimeError("Instrumentation is already active")
+        _ACTIVE = self
+
+        for cls, name, key_arg, get_iterations in self.targets:
+            original = cls.__dict__[name]
+            self._originals.append((cls, name, original))
+            setattr(cls, name, self.wrap(original, f"{cls.__name__}.{name}", key_arg, get_iterations))
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        global _ACTIVE
+        for cls, name, original in reversed(self._originals):
+            setattr(cls, name, original)
+        self._originals = []
+        _ACTIVE = None
+        return False
+
+    def wrap(self, func, label: str, key_arg: int = None, get_iterations=None):
+        """
+        Wrap a method to count its calls, accumulate its run time and record its solver iterations
+        :param func: method to wrap
+        :param label: record name
+        :param key_arg: index of the positional argument appended to the label, e.g. the property key
+        :param get_iterations: function of (object, result) returning the solver iterations
+        :return: wrapped method
+        """
+
+        calls = self.calls
+        histograms = self.iterations
+
+        @wraps(func)
+        def wrapper(obj, *args, **kwargs):
+            start = perf_counter()
+            result = func(obj, *args, **kwargs)
+            elapsed = perf_counter() - start
+
+            name = label if key_arg is None else f"{label}[{args[key_arg]}]"
+            record = calls.get(name)
+            if record is None:
+                record = calls[name] = [0, 0.0]
+            record[0] += 1
+            record[1] += elapsed
+
+            if get_iterations is not None:
+                iterations = get_iterations(obj, result)
+                if iterations is not None:
+                    histograms.setdefault(name, Counter())[iterations] += 1
+
+            return result
+
+        return wrapper
+
+    def reset(self):
+        """
+        Clear the recorded counts, times and histograms
+        :return: None
+        """
+
+        self.calls.clear()
+        self.iterations.clear()
+
+    def to_dict(self):
+        """
+        Export the records
+        :return: dict with "calls", mapping each name to its count, total time, [s], and mean time, [s],
+                 and "iterations", mapping each solver name to a histogram of iterations per solve
+        """
+
+        return {
+            "calls": {name: {"count": count, "seconds": seconds, "mean-seconds": seconds / count}
+                      for name, (count, seconds) in sorted(self.calls.items())},
+            "iterations": {name: {str(k): v for k, v in sorted(hist.items())}
+                           for name, hist in sorted(self.iterations.items())},
+        }
+
+    def to_json(self, path: str = None):
+        """
+        Export the records as JSON
+        :param path: optional file path to write to
+        :return: JSON string
+        """
+
+        text = json.dumps(self.to_dict(), indent=2)
+        if path is not None:
+            with open(path, "w") as f:
+                f.write(text)
+        return text
@@ -1,5 +1,7 @@
 from math import log, pi
 
+import numpy as np
+
 
 class Pipe(object):
     def __init__(self, data):
@@ -21,6 +23,9 @@ class Pipe(object):
         self.area_surf_inner = None
         self.area_surf_outer = None
         self.resist_cond = None
+
+        # incremented on every geometry update, so dependent calculations can tell when to recompute
+        self.revision = 0
         self.update_pipe()
 
     def update_pipe(self, pipe_length=None):
@@ -31,6 +36,7 @@ class Pipe(object):
         """
         if pipe_length is not None:
             self.length = pipe_length
+        self.revision += 1
         self.area_cr_inner = self.calc_inner_cross_sectional_area()
         self.area_cr_outer = self.calc_outer_cross_sectional_area()
         self.area_surf_inner = self.calc_inner_surface_area()
@@ -71,3 +77,124 @@ class Pipe(object):
         :return: resistance, [K/W]
         """
         return log(self.outer_dia / self.inner_dia) / (2 * pi * self.conductivity * self.length)
+
+
+class PipeArray(object):
+    def __init__(self, data: dict):
+        """
+        Struct-of-arrays collection of pipe geometries, e.g. a pipe catalog
+        Each property may be a scalar or a sequence; all are broadcast to a common 1-D length.
+        :param data: dict with the same keys as Pipe: "outer-dia", "inner-dia", "length", "density", "conductivity"
+        """
+
+        values = np.broadcast_arrays(*[np.atleast_1d(np.asarray(data[k], dtype=float))
+                                       for k in ("outer-dia", "inner-dia", "length", "density", "conductivity")])
+        if values[0].ndim != 1:
+            raise ValueError("PipeArray properties must be scalars or 1-D sequences")
+
+        self.outer_dia, self.inner_dia, self.length, self.density, self.conductivity = [v.copy() for v in values]
+        self.thickness = (self.outer_dia - self.inner_dia) / 2.0
+
+        if np.any(self.thickness < 0.0):
+            bad = int(np.flatnonzero(self.thickness < 0.0)[0])
+            msg = f"Inner and outer pipe diameters result in negative pipe thickness at index {bad}\n" \
+                  f"Outer dia: {self.outer_dia[bad]:0.4f}; Inner dia: {self.inner_dia[bad]:0.4f}"
+            raise ValueError(msg)
+
+        self.area_cr_inner = None
+        self.area_cr_outer = None
+        self.area_surf_inner = None
+        self.area_surf_outer = None
+        self.resist_cond = None
+
+        # incremented on every geometry update, so dependent calculations can tell when to recompute
+        self.revision = 0
+        self.update_pipe()
+
+    @classmethod
+    def from_pipes(cls, pipes: list):
+        """
+        Collect Pipe objects into a PipeArray
+        :param pipes: list of Pipe
+        :return: PipeArray
+        """
+
+        return cls({
+            "outer-dia": [p.outer_dia for p in pipes],
+            "inner-dia": [p.inner_dia for p in pipes],
+            "length": [p.length for p in pipes],
+            "density": [p.density for p in pipes],
+            "conductivity": [p.conductivity for p in pipes],
+        })
+
+    def __len__(self):
+        return self.outer_dia.size
+
+    @property
+    def size(self):
+        return self.outer_dia.size
+
+    def take(self, indices: np.ndarray):
+        """
+        Select pipes by index
+        :param indices: integer indices or boolean mask
+        :return: new PipeArray
+        """
+
+        return PipeArray({
+            "outer-dia": self.outer_dia[indices],
+            "inner-dia": self.inner_dia[indices],
+            "length": self.length[indices],
+            "density": self.density[indices],
+            "conductivity": self.conductivity[indices],
+        })
+
+    def update_pipe(self, pipe_length: np.ndarray = None):
+        """
+        Update pipe geometry
+        :param pipe_length: pipe lengths (optional), scalar or one per pipe, [m]
+        :return: none
+        """
+        if pipe_length is not None:
+            self.length = np.broadcast_to(np.asarray(pipe_length, dtype=float), self.outer_dia.shape).copy()
+        self.revision += 1
+        self.area_cr_inner = self.calc_inner_cross_sectional_area()
+        self.area_cr_outer = self.calc_outer_cross_sectional_area()
+        self.area_surf_inner = self.calc_inner_surface_area()
+        self.area_surf_outer = self.calc_outer_surface_area()
+        self.resist_cond = self.calc_cond_resistance()
+
+    def calc_inner_cross_sectional_area(self):
+        """
+        Calculate the pipe inner cross-sectional areas
+        :return: inner cross-sectional areas, [m^2]
+        """
+        return (pi / 4.0) * self.inner_dia ** 2
+
+    def calc_outer_cross_sectional_area(self):
+        """
+        Calculate the pipe outer cross-sectional areas
+        :return: outer cross-sectional areas, [m^2]
+        """
+        return (pi / 4.0) * self.outer_dia ** 2
+
+    def calc_inner_surface_area(self):
+        """
+        Calculate the pipe inner surface areas
+        :return: inner surface areas, [m^2]
+        """
+        return pi * self.inner_dia * self.length
+
+    def calc_outer_surface_area(self):
+        """
+        Calculate the pipe outer surface areas
+        :return: outer surface areas, [m^2]
+        """
+        return pi * self.outer_dia * self.length
+
+    def calc_cond_resistance(self):
+        """
+        Calculate pipe conduction thermal resistances
+        :return: resistances, [K/W]
+        """
+        return np.log(self.outer_dia / self.inner_dia) / (2 * pi * self.conductivity * self.length)
@@ -0,0 +1,232 @@
+from typing import Union
+
+import numpy as np
+
+from src.correlations import eval_correlation, get_coefficients
+from src.property_table import PropertyTable
+
+# property tables shared across all tabulated backends, keyed on (fluid string, property key)
+_TABLES = {}
+
+# correlation property names of the CoolProp output keys
+CORRELATION_NAMES = {
+    "CONDUCTIVITY": "conductivity",
+    "D": "density",
+    "C": "specific_heat",
+    "VISCOSITY": "viscosity",
+    "PRANDTL": "prandtl",
+    "ISOBARIC_EXPANSION_COEFFICIENT": "beta",
+}
+
+
+def c_to_k(temp_in_c: Union[int, float, np.ndarray]):
+    """
+    Convert Celsius to Kelvin
+    :param temp_in_c: temperature, [C]
+    :return: temperature, [K]
+    """
+    return temp_in_c + 273.15
+
+
+def split_fluid_str(fluid_str: str):
+    """
+    Split a fluid string into its parts
+    :param fluid_str: valid fluid string, e.g. "WATER" or "INCOMP::MPG[0.200]"
+    :return: tuple of CoolProp backend name, fluid name, and mass fraction (None if not given)
+    """
+
+    if fluid_str.startswith("INCOMP::"):
+        name = fluid_str[len("INCOMP::"):]
+        concentration = None
+        if name.endswith("]"):
+            name, concentration = name[:-1].split("[")
+            concentration = float(concentration)
+        return "INCOMP", name, concentration
+
+    return "HEOS", fluid_str, None
+
+
+class PropertyBackend(object):
+    def __init__(self, fluid_str: str):
+        """
+        Base class of fluid property engines
+
+        Subclasses implement eval_property, and may override eval_state when several properties
+        can be evaluated together more cheaply than one at a time. Temperatures are either scalars
+        or 1-D arrays; Fluid handles caching and other array shapes. Invalid scalar states raise
+        a ValueError, and invalid states in an array are returned as inf.
+
+        :param fluid_str: valid fluid string, e.g. "WATER" or "INCOMP::MPG[0.200]"
+        """
+
+        self.fluid_str = fluid_str
+
+    def eval_property(self, key: str, temperature: Union[int, float, np.ndarray]):
+        """
+        Evaluate a fluid property
+        :param key: CoolProp output key
+        :param temperature: temperature, [C]
+        :return: property value, scalar or array matching temperature
+        """
+        raise NotImplementedError
+
+    def eval_state(self, keys: tuple, temperature: Union[int, float, np.ndarray]):
+        """
+        Evaluate several fluid properties at once
+        :param keys: CoolProp output keys
+        :param temperature: temperature, [C]
+        :return: list of property values, scalars or arrays matching temperature
+        """
+        return [self.eval_property(k, temperature) for k in keys]
+
+
+class PropsSIBackend(PropertyBackend):
+    """
+    CoolProp high-level interface
+    """
+
+    def __init__(self, fluid_str: str):
+        from CoolProp.CoolProp import PropsSI
+
+        super().__init__(fluid_str)
+        self.props_si = PropsSI
+
+    def eval_property(self, key: str, temperature: Union[int, float, np.ndarray]):
+        if isinstance(temperature, np.ndarray) and temperature.ndim > 0:
+            try:
+                return self.props_si(key, "T", c_to_k(temperature), "P", 101325, self.fluid_str)
+            except ValueError:
+                # PropsSI raises when no state of the array is valid
+                return np.full(temperature.size, np.inf)
+        return self.props_si(key, "T", c_to_k(temperature), "P", 101325, self.fluid_str)
+
+    def eval_state(self, keys: tuple, temperature: Union[int, float, np.ndarray]):
+        if isinstance(temperature, np.ndarray) and temperature.ndim > 0:
+            try:
+                values = self.props_si(list(keys), "T", c_to_k(temperature), "P", 101325, self.fluid_str)
+            except ValueError:
+                # PropsSI raises when no state of the array is valid
+                return list(np.full((len(keys), temperature.size), np.inf))
+            return list(np.reshape(values, (-1, len(keys))).T)
+
+        values = self.props_si(list(keys), "T", c_to_k(temperature), "P", 101325, self.fluid_str)
+        return [float(v) for v in values]
+
+
+class AbstractStateBackend(PropertyBackend):
+    """
+    CoolProp low-level interface
+    The state is updated once per temperature, and all outputs are read from it.
+    """
+
+    def __init__(self, fluid_str: str):
+        from CoolProp.CoolProp import AbstractState, PT_INPUTS, get_parameter_index
+
+        super().__init__(fluid_str)
+        backend, name, concentration = split_fluid_str(fluid_str)
+        self.state = AbstractState(backend, name)
+        if concentration is not None:
+            self.state.set_mass_fractions([concentration])
+        self.state_temp = None
+        self.pt_inputs = PT_INPUTS
+        self.get_parameter_index = get_parameter_index
+
+    def eval_property(self, key: str, temperature: Union[int, float, np.ndarray]):
+        return self.eval_state((key,), temperature)[0]
+
+    def eval_state(self, keys: tuple, temperature: Union[int, float, np.ndarray]):
+        state = self.state
+        indices = [self.get_parameter_index(k) for k in keys]
+
+        if isinstance(temperature, np.ndarray) and temperature.ndim > 0:
+            values = np.full((len(keys), temperature.size), np.inf)
+            for idx, t in enumerate(temperature):
+                try:
+                    state.update(self.pt_inputs, 101325, c_to_k(float(t)))
+                except ValueError:
+                    continue
+                for k, i in enumerate(indices):
+                    values[k, idx] = state.keyed_output(i)
+            self.state_temp = None
+            return list(values)
+
+        if temperature != self.state_temp:
+            self.state_temp = None
+            state.update(self.pt_inputs, 101325, c_to_k(temperature))
+            self.state_temp = temperature
+        return [state.keyed_output(i) for i in indices]
+
+
+class TabulatedBackend(PropertyBackend):
+    """
+    Interpolation tables of the CoolProp high-level interface, built on first use of each property
+    """
+
+    def get_table(self, key: str):
+        """
+        Get the shared property table for the fluid, building it on first use
+        :param key: CoolProp output key
+        :return: property table
+        """
+
+        table = _TABLES.get((self.fluid_str, key))
+        if table is None:
+            from CoolProp.CoolProp import PropsSI
+
+            fluid_str = self.fluid_str
+            table = PropertyTable(lambda t: PropsSI(key, "T", c_to_k(t), "P", 101325, fluid_str))
+            _TABLES[(fluid_str, key)] = table
+        return table
+
+    def eval_property(self, key: str, temperature: Union[int, float, np.ndarray]):
+        return self.get_table(key)(temperature)
+
+
+class CorrelationBackend(PropertyBackend):
+    """
+    Pure-Python polynomial correlations, see src.correlations
+    """
+
+    def __init__(self, fluid_str: str):
+        super().__init__(fluid_str)
+        _, name, concentration = split_fluid_str(fluid_str)
+        self.coefficients = get_coefficients(name, concentration)
+
+    def eval_property(self, key: str, temperature: Union[int, float, np.ndarray]):
+        return eval_correlation(self.coefficients, CORRELATION_NAMES[key], temperature)
+
+
+# registered backends, keyed on the names used in the "backend" config value
+BACKENDS = {
+    "props-si": PropsSIBackend,
+    "abstract-state": AbstractStateBackend,
+    "tabulated": TabulatedBackend,
+    "correlation": CorrelationBackend,
+}
+
+
+def register_backend(name: str, backend: type):
+    """
+    Register a fluid property backend, making it available to Fluid through the "backend" config value
+    :param name: backend name, case-insensitive
+    :param backend: PropertyBackend subclass, constructed with the fluid string
+    :return: None
+    """
+
+    if not (isinstance(backend, type) and issubclass(backend, PropertyBackend)):
+        raise TypeError("Fluid property backends must be PropertyBackend subclasses")
+    BACKENDS[name.lower()] = backend
+
+
+def get_backend(name: str, fluid_str: str):
+    """
+    Build a registered fluid property backend
+    :param name: backend name, case-insensitive
+    :param fluid_str: valid fluid string
+    :return: PropertyBackend
+    """
+
+    backend = BACKENDS.get(name.lower())
+    if backend is None:
+        raise ValueError(f"Unsupported fluid property backend: {name}")
+    return backend(fluid_str)
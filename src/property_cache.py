@@ -0,0 +1,78 @@
+from collections import OrderedDict
+from typing import Callable, Union
+
+
+class PropertyCache(object):
+    def __init__(self, max_size: int = 10000, resolution: float = 1e-4):
+        """
+        Bounded least-recently-used cache of fluid property values
+
+        Temperatures are quantized to the resolution, and properties are evaluated at the
+        quantized temperature, so cached values do not depend on the order of the queries.
+        A single cache can be shared by any number of Fluid instances.
+
+        :param max_size: maximum number of cached values
+        :param resolution: temperature quantization step, [C]
+        """
+
+        if max_size < 1:
+            raise ValueError(f"Cache size must be at least 1: {max_size}")
+
+        self.max_size = max_size
+        self.resolution = resolution
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+
+    def get(self, key: str, temperature: Union[int, float], fluid_str: str, func: Callable, backend: str = ""):
+        """
+        Get a cached property value, evaluating and storing it on a miss
+        :param key: property key
+        :param temperature: temperature, [C]
+        :param fluid_str: valid fluid string
+        :param func: property function, called with the quantized temperature, [C]
+        :param backend: name of the property backend, so fluids on different backends are cached separately
+        :return: property value
+        """
+
+        step = round(temperature / self.resolution)
+        cache_key = (key, step, fluid_str, backend)
+        data = self._data
+        if cache_key in data:
+            self.hits += 1
+            data.move_to_end(cache_key)
+            return data[cache_key]
+
+        self.misses += 1
+        value = func(step * self.resolution)
+        data[cache_key] = value
+        if len(data) > self.max_size:
+            data.popitem(last=False)
+            self.evictions += 1
+        return value
+
+    def stats(self):
+        """
+        Cache statistics
+        :return: dict of hits, misses, evictions, and current and maximum size
+        """
+
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._data),
+            "max-size": self.max_size,
+        }
+
+    def clear(self):
+        """
+        Remove all cached values and reset the statistics
+        :return: None
+        """
+
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
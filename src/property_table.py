@@ -0,0 +1,140 @@
+from math import floor, inf, isfinite
+from typing import Callable, Union
+
+import numpy as np
+
+
+class PropertyTable(object):
+    def __init__(self, func: Callable, t_min: float = -20.0, t_max: float = 60.0,
+                 tolerance: float = 1e-5, spacing: float = 1.0, min_spacing: float = 1e-3):
+        """
+        Linear interpolation table of a fluid property over a uniform temperature grid
+
+        The grid spacing is halved until the relative interpolation error, checked at every interval
+        midpoint where the linear interpolation error peaks, is within the tolerance. The error is taken
+        relative to the larger of the local value and 1% of the largest value in the table.
+
+        :param func: exact property function, accepting an array of temperatures, [C]
+                     invalid states (e.g. below the freezing point) must be returned as non-finite values
+        :param t_min: minimum table temperature, [C]
+        :param t_max: maximum table temperature, [C]
+        :param tolerance: maximum relative interpolation error, [-]
+        :param spacing: initial grid spacing, [C]
+        :param min_spacing: minimum grid spacing, [C]
+        """
+
+        self.func = func
+        self.tolerance = tolerance
+        self.t_min = None
+        self.t_max = None
+        self.spacing = None
+        self.max_error = None
+        self.temperatures = None
+        self.values = None
+        self._values = None
+        self.build(t_min, t_max, spacing, min_spacing)
+
+    def build(self, t_min: float, t_max: float, spacing: float, min_spacing: float):
+        """
+        Build the table
+        :param t_min: minimum table temperature, [C]
+        :param t_max: maximum table temperature, [C]
+        :param spacing: initial grid spacing, [C]
+        :param min_spacing: minimum grid spacing, [C]
+        :return: None
+        """
+
+        num_intervals = max(int(np.ceil((t_max - t_min) / spacing)), 1)
+        temps = np.linspace(t_min, t_max, num_intervals + 1)
+        values = np.asarray(self.func(temps), dtype=float)
+
+        while True:
+            mid_temps = 0.5 * (temps[:-1] + temps[1:])
+            mid_values = np.asarray(self.func(mid_temps), dtype=float)
+            interp = 0.5 * (values[:-1] + values[1:])
+            valid = np.isfinite(values[:-1]) & np.isfinite(values[1:]) & np.isfinite(mid_values)
+            err = np.zeros_like(mid_values)
+            if np.any(valid):
+                # floor the reference magnitude so properties crossing zero (e.g. water beta near 4 C) converge
+                scale = np.maximum(np.abs(mid_values[valid]), 0.01 * np.max(np.abs(mid_values[valid])))
+                err[valid] = np.abs(interp[valid] - mid_values[valid]) / scale
+            max_error = float(np.max(err)) if np.any(valid) else 0.0
+
+            if max_error <= self.tolerance or (temps[1] - temps[0]) / 2 < min_spacing:
+                break
+
+            # interleave the midpoints to halve the grid spacing
+            refined_temps = np.empty(2 * temps.size - 1)
+            refined_temps[0::2] = temps
+            refined_temps[1::2] = mid_temps
+            refined_values = np.empty(2 * values.size - 1)
+            refined_values[0::2] = values
+            refined_values[1::2] = mid_values
+            temps = refined_temps
+            values = refined_values
+
+        # keep the largest contiguous span of valid states
+        finite = np.isfinite(values)
+        if not np.any(finite):
+            raise ValueError("No valid fluid states in the table temperature range")
+
+        best_start, best_len, start = 0, 0, None
+        for idx, ok in enumerate(np.append(finite, False)):
+            if ok and start is None:
+                start = idx
+            elif not ok and start is not None:
+                if idx - start > best_len:
+                    best_start, best_len = start, idx - start
+                start = None
+
+        if best_len < 2:
+            raise ValueError("Too few valid fluid states to build a property table")
+
+        self.temperatures = temps[best_start:best_start + best_len]
+        self.values = values[best_start:best_start + best_len]
+        self._values = self.values.tolist()
+        self.t_min = float(self.temperatures[0])
+        self.t_max = float(self.temperatures[-1])
+        self.spacing = float(temps[1] - temps[0])
+        self.max_error = max_error
+
+    def __call__(self, temperature: Union[int, float, np.ndarray]):
+        """
+        Interpolate the property, falling back to the exact function outside of the table range
+        :param temperature: temperature, [C]
+        :return: property value
+        """
+
+        if isinstance(temperature, (int, float)) or np.ndim(temperature) == 0:
+            if not self.t_min <= temperature <= self.t_max:
+                value = float(self.func(np.array([temperature], dtype=float))[0])
+                if not isfinite(value):
+                    raise ValueError(f"Invalid fluid state at temperature: {temperature:0.3f} C")
+                return value
+            x = (temperature - self.t_min) / self.spacing
+            idx = min(int(floor(x)), len(self._values) - 2)
+            frac = x - idx
+            return self._values[idx] * (1 - frac) + self._values[idx + 1] * frac
+
+        temperature = np.asarray(temperature, dtype=float)
+        result = np.interp(temperature, self.temperatures, self.values)
+        outside = (temperature < self.t_min) | (temperature > self.t_max)
+        if np.any(outside):
+            try:
+                result[outside] = self.func(temperature[outside])
+            except ValueError:
+                # the exact function may raise when no state is valid; invalid states are inf
+                result[outside] = [self._eval_or_inf(t) for t in temperature[outside]]
+        return result
+
+    def _eval_or_inf(self, temperature: float):
+        """
+        Evaluate the exact function at a single temperature
+        :param temperature: temperature, [C]
+        :return: property value, or inf for an invalid state
+        """
+
+        try:
+            return float(self.func(np.array([temperature], dtype=float))[0])
+        except ValueError:
+            return inf
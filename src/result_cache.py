@@ -0,0 +1,224 @@
+import hashlib
+import json
+import os
+import tempfile
+import zipfile
+from pathlib import Path
+from typing import Callable, Union
+
+import numpy as np
+
+from src import VERSION
+
+# default cache location, used when no path is given
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "swhe"
+
+# config keys whose string values are file paths, e.g. a heat pump performance map CSV
+FILE_KEYS = ("performance-map",)
+
+
+def _json_default(obj):
+    """
+    Serialize the non-JSON values that appear in configs
+    :param obj: value json cannot serialize
+    :return: JSON serializable value
+    """
+
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Config value is not serializable: {obj!r}")
+
+
+def _resolve_files(obj, is_file: bool = False):
+    """
+    Replace the file paths in a config with the sha256 digests of the file contents
+    Path values, and string values of FILE_KEYS, or of dot-separated config paths ending in one, are files.
+    :param obj: config value
+    :param is_file: string values are file paths
+    :return: config value with the files replaced
+    """
+
+    if isinstance(obj, Path) or (is_file and isinstance(obj, str)):
+        with open(obj, "rb") as f:
+            return {"file-sha256": hashlib.sha256(f.read()).hexdigest()}
+    if isinstance(obj, dict):
+        return {k: _resolve_files(v, str(k).split(".")[-1] in FILE_KEYS) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_resolve_files(v, is_file) for v in obj]
+    return obj
+
+
+def dump_config(config: dict):
+    """
+    Serialize a config deterministically, with the contents of referenced files
+    Editing a referenced file, e.g. a performance map CSV, changes the result.
+    :param config: config dict; numpy arrays and paths are allowed
+    :return: JSON string
+    """
+
+    return json.dumps(_resolve_files(config), sort_keys=True, default=_json_default)
+
+
+class ResultCache(object):
+    def __init__(self, path: Union[str, Path] = None, max_size: int = 256 * 1024 ** 2):
+        """
+        Persistent content-addressed cache of simulation results
+
+        Results are stored as compressed .npz files named by a sha256 hash of the package VERSION,
+        a result name, the full config, and the input arrays, so any change to these gives a new key.
+        Changes to the model code without a VERSION change are not detected; clear the cache then.
+        When the total size exceeds max_size, the least recently used files are removed.
+
+        :param path: cache directory, defaults to DEFAULT_CACHE_DIR
+        :param max_size: maximum total size of the cached files, [bytes]
+        """
+
+        if max_size < 1:
+            raise ValueError(f"Cache size must be at least 1: {max_size}")
+
+        self.path = Path(DEFAULT_CACHE_DIR if path is None else path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(name: str, config: dict, inputs: dict = None):
+        """
+        Hash a result name, config and inputs
+        :param name: result name, e.g. the model and method
+        :param config: config dict; numpy arrays and paths are allowed, and files are hashed by content
+        :param inputs: dict of input name to scalar or array, hashed with their shapes and values
+        :return: hex digest
+        """
+
+        h = hashlib.sha256()
+        for part in (VERSION, name, dump_config(config)):
+            h.update(part.encode())
+            h.update(b"\0")
+
+        for input_name in sorted(inputs or {}):
+            value = np.ascontiguousarray(inputs[input_name], dtype=float)
+            h.update(f"{input_name}{value.shape}".encode())
+            h.update(value.tobytes())
+            h.update(b"\0")
+
+        return h.hexdigest()
+
+    def get(self, key: str):
+        """
+        Load a cached result
+        :param key: result key, from make_key
+        :return: result array, or None on a miss
+        """
+
+        file = self.path / f"{key}.npz"
+        try:
+            with np.load(str(file)) as data:
+                value = data["value"]
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+            # missing, or a partial or corrupt file
+            self.misses += 1
+            return None
+
+        # the modification time tracks recent use for eviction
+        os.utime(str(file))
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value: Union[int, float, np.ndarray]):
+        """
+        Store a result, evicting the least recently used results if over the size limit
+        :param key: result key, from make_key
+        :param value: result array
+        :return: None
+        """
+
+        fd, tmp_name = tempfile.mkstemp(dir=str(self.path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez_compressed(f, value=np.asarray(value))
+            os.replace(tmp_name, str(self.path / f"{key}.npz"))
+        except BaseException:
+            os.remove(tmp_name)
+            raise
+
+        self.evict()
+
+    def get_or_compute(self, key: str, func: Callable):
+        """
+        Load a cached result, computing and storing it on a miss
+        :param key: result key, from make_key
+        :param func: function of no arguments returning the result array
+        :return: result array
+        """
+
+        value = self.get(key)
+        if value is None:
+            value = np.asarray(func())
+            self.put(key, value)
+        return value
+
+    def files(self):
+        """
+        Cached result files, least recently used first
+        :return: list of tuples of path, size, [bytes], and modification time
+        """
+
+        files = []
+        for file in self.path.glob("*.npz"):
+            try:
+                stat = file.stat()
+            except OSError:
+                continue
+            files.append((file, stat.st_size, stat.st_mtime))
+        return sorted(files, key=lambda x: x[2])
+
+    def evict(self):
+        """
+        Remove the least recently used results until the total size is within max_size
+        :return: None
+        """
+
+        files = self.files()
+        size = sum(f[1] for f in files)
+        for file, file_size, _ in files:
+            if size <= self.max_size:
+                break
+            try:
+                file.unlink()
+            except OSError:
+                continue
+            size -= file_size
+            self.evictions += 1
+
+    def stats(self):
+        """
+        Cache statistics
+        :return: dict of hits, misses, evictions, number of files, and current and maximum size, [bytes]
+        """
+
+        files = self.files()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "files": len(files),
+            "size": sum(f[1] for f in files),
+            "max-size": self.max_size,
+        }
+
+    def clear(self):
+        """
+        Remove all cached results and reset the statistics
+        :return: None
+        """
+
+        for file, _, _ in self.files():
+            file.unlink()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
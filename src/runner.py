@@ -0,0 +1,113 @@
+import csv
+from itertools import islice
+from pathlib import Path
+from time import perf_counter
+from typing import Iterable, Iterator, Union
+
+import numpy as np
+
+from src.system import System
+
+# default profile column names, in the order System.simulate takes them
+PROFILE_COLUMNS = ("q-zone", "m-dot", "temperature-sw")
+
+
+def read_profile(path: Union[str, Path], columns: tuple = PROFILE_COLUMNS) -> Iterator[dict]:
+    """
+    Stream rows of a load profile CSV file
+    Rows are read one at a time, so files of any length are read in constant memory.
+    :param path: path to CSV file with a header row
+    :param columns: names of the zone load, [W], mass flow rate, [kg/s], and surface water temperature, [C], columns
+    :return: generator of dicts; the profile columns are converted to float, other columns are passed through
+    """
+
+    with open(path, newline="") as f:
+        reader = csv.DictReader(f)
+        missing = [c for c in columns if c not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError(f"Profile file is missing columns: {', '.join(missing)}")
+
+        for row in reader:
+            for c in columns:
+                row[c] = float(row[c])
+            yield row
+
+
+def simulate_profile(system: System, rows: Iterable[dict], columns: tuple = PROFILE_COLUMNS,
+                     batch_size: int = 1024) -> Iterator[dict]:
+    """
+    Simulate a stream of profile rows
+    :param system: system to simulate
+    :param rows: iterable of profile rows, e.g. from read_profile
+    :param columns: names of the zone load, mass flow rate, and surface water temperature columns
+    :param batch_size: number of rows simulated together with System.simulate_batch.
+                       With a batch size of 1, each row is simulated with System.simulate,
+                       which uses the warm start state when enabled on the system.
+    :return: generator of the input rows with the approach temperature added as "t-appr", [C]
+    """
+
+    q_col, m_col, t_col = columns
+    rows = iter(rows)
+
+    if batch_size <= 1:
+        for row in rows:
+            row["t-appr"] = system.simulate(row[q_col], row[m_col], row[t_col])
+            yield row
+        return
+
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return
+
+        t_appr = system.simulate_batch(np.array([r[q_col] for r in batch]),
+                                       np.array([r[m_col] for r in batch]),
+                                       np.array([r[t_col] for r in batch]))
+        for row, val in zip(batch, t_appr):
+            row["t-appr"] = float(val)
+            yield row
+
+
+def write_results(path: Union[str, Path], rows: Iterable[dict]) -> int:
+    """
+    Write result rows to a CSV file as they arrive
+    :param path: output CSV file path
+    :param rows: iterable of result rows; the header is taken from the first row
+    :return: number of rows written
+    """
+
+    num_rows = 0
+    with open(path, "w", newline="") as f:
+        writer = None
+        for row in rows:
+            if writer is None:
+                writer = csv.DictWriter(f, fieldnames=list(row.keys()))
+                writer.writeheader()
+            writer.writerow(row)
+            num_rows += 1
+
+    return num_rows
+
+
+def run_profile(system: System, input_path: Union[str, Path], output_path: Union[str, Path],
+                columns: tuple = PROFILE_COLUMNS, batch_size: int = 1024) -> dict:
+    """
+    Simulate a load profile file, streaming the results to an output file
+    :param system: system to simulate
+    :param input_path: path to profile CSV file
+    :param output_path: path to output CSV file
+    :param columns: names of the zone load, mass flow rate, and surface water temperature columns
+    :param batch_size: number of rows simulated together, see simulate_profile
+    :return: dict with the number of rows, elapsed time, [s], and throughput, [rows/s]
+    """
+
+    start = perf_counter()
+    rows = read_profile(input_path, columns)
+    num_rows = write_results(output_path, simulate_profile(system, rows, columns, batch_size))
+    elapsed = perf_counter() - start
+
+    return {
+        "rows": num_rows,
+        "seconds": elapsed,
+        "rows-per-second": num_rows / elapsed if elapsed > 0 else 0.0,
+    }
@@ -0,0 +1,185 @@
+import os
+from copy import deepcopy
+from itertools import product
+from math import ceil
+from multiprocessing import Pool
+
+import numpy as np
+
+from src.result_cache import ResultCache, dump_config
+from src.swhe import SWHE
+from src.system import System
+
+# models available to sweep, and the input argument names of their simulate_batch methods
+MODELS = {
+    "system": (System, ("q_zone", "m_dot", "temperature_sw")),
+    "swhe": (SWHE, ("m_dot", "inlet_temperature", "water_temp")),
+}
+
+# objects built in the current process, keyed on their serialized config
+_MODEL_CACHE = {}
+
+# smallest number of input points per task, and target number of tasks per worker process
+MIN_CHUNK_SIZE = 16
+TASKS_PER_PROCESS = 4
+
+
+def set_config_value(config: dict, path: str, value):
+    """
+    Set a nested config value
+    :param config: config dict, modified in place
+    :param path: dot-separated key path, e.g. "swhe.pipe.length"
+    :param value: value to set
+    :return: None
+    """
+
+    keys = path.split(".")
+    for key in keys[:-1]:
+        config = config[key]
+    if keys[-1] not in config:
+        raise KeyError(f"Config path not found: {path}")
+    config[keys[-1]] = value
+
+
+def calc_chunk_size(num_points: int, num_configs: int, processes: int = None, chunk_size: int = 1024):
+    """
+    Number of input points per task, so the tasks are spread over the worker processes
+    :param num_points: number of input points per config
+    :param num_configs: number of configs
+    :param processes: number of worker processes, None for all cores
+    :param chunk_size: maximum number of input points per task
+    :return: number of input points per task
+    """
+
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if processes == 1:
+        return chunk_size
+
+    # split each config into chunks until there are enough tasks for every process
+    chunks_per_config = ceil(TASKS_PER_PROCESS * processes / max(num_configs, 1))
+    size = max(ceil(num_points / chunks_per_config), MIN_CHUNK_SIZE)
+    return min(size, chunk_size)
+
+
+def get_model(model: str, config: dict):
+    """
+    Get a model object for a config, building it only if this process has not built it already
+    :param model: model name, "system" or "swhe"
+    :param config: model config dict
+    :return: model object
+    """
+
+    key = (model, dump_config(config))
+    obj = _MODEL_CACHE.get(key)
+    if obj is None:
+        # tasks for the same config are contiguous, so only the latest object is kept
+        _MODEL_CACHE.clear()
+        obj = MODELS[model][0](config)
+        _MODEL_CACHE[key] = obj
+    return obj
+
+
+def run_task(task: tuple):
+    """
+    Simulate one config for a chunk of input points
+    :param task: tuple of model name, config dict, and dict of input arrays
+    :return: array of results
+    """
+
+    model, config, inputs = task
+    return get_model(model, config).simulate_batch(**inputs)
+
+
+def simulate(config: dict, inputs: dict, model: str = "system", cache: ResultCache = None):
+    """
+    Simulate one config with the model's simulate_batch method
+    :param config: config dict, in the shape System or SWHE accept
+    :param inputs: dict of simulate_batch argument name to scalar or array
+    :param model: model name, "system" or "swhe"
+    :param cache: persistent result cache, optional. On a hit the model is not built or simulated.
+    :return: array of results, broadcast shape of the inputs
+    """
+
+    if model not in MODELS:
+        raise ValueError(f"Unsupported model: {model}")
+
+    if cache is None:
+        return get_model(model, config).simulate_batch(**inputs)
+
+    key = cache.make_key(f"{model}.simulate_batch", config, inputs)
+    return cache.get_or_compute(key, lambda: get_model(model, config).simulate_batch(**inputs))
+
+
+def sweep(config: dict, axes: dict, inputs: dict = None, model: str = "system",
+          processes: int = None, chunk_size: int = 1024, cache: ResultCache = None):
+    """
+    Simulate the cartesian product of config and input values across a process pool
+
+    Axis names are either input argument names of the model's simulate_batch method
+    (q_zone, m_dot, temperature_sw for "system"; m_dot, inlet_temperature, water_temp for "swhe")
+    or dot-separated config paths, e.g. "swhe.pipe.length" or "hp.cop". Each config is built once
+    per worker process, and all input points for a config are simulated with batched calls.
+
+    :param config: base config dict, in the shape System or SWHE accept
+    :param axes: dict of axis name to sequence of values, in output axis order
+    :param inputs: fixed input values for input arguments that are not swept
+    :param model: model name, "system" or "swhe"
+    :param processes: number of worker processes. 1 runs in the current process; None uses all cores
+    :param chunk_size: maximum number of input points per task. Smaller chunks are used when needed to give
+                       each process several tasks, see calc_chunk_size.
+    :param cache: persistent result cache, optional. On a hit nothing is simulated.
+    :return: array of results with one dimension per axis, in the order of the axes
+    """
+
+    if model not in MODELS:
+        raise ValueError(f"Unsupported sweep model: {model}")
+
+    if cache is not None:
+        # the axes are keyed in order, as the output dimensions follow their order
+        ordered_axes = [{name: axis_values} for name, axis_values in axes.items()]
+        key = cache.make_key(f"{model}.sweep", {"config": config, "axes": ordered_axes, "inputs": inputs or {}})
+        return cache.get_or_compute(key, lambda: sweep(config, axes, inputs, model, processes, chunk_size))
+
+    input_names = MODELS[model][1]
+    inputs = dict(inputs or {})
+    names = list(axes.keys())
+    values = [list(axes[n]) for n in names]
+    config_axes = [i for i, n in enumerate(names) if n not in input_names]
+    input_axes = [i for i, n in enumerate(names) if n in input_names]
+
+    missing = [n for n in input_names if n not in inputs and n not in names]
+    if missing:
+        raise ValueError(f"Missing sweep inputs: {', '.join(missing)}")
+
+    # build the configs, varying the first config axis slowest
+    configs = []
+    for combo in product(*[values[i] for i in config_axes]):
+        c = deepcopy(config)
+        for i, val in zip(config_axes, combo):
+            set_config_value(c, names[i], val)
+        configs.append(c)
+
+    # build the flattened input points
+    grids = np.meshgrid(*[np.asarray(values[i], dtype=float) for i in input_axes], indexing="ij")
+    point_inputs = {n: np.ravel(g) for n, g in zip([names[i] for i in input_axes], grids)}
+    num_points = int(np.prod([len(values[i]) for i in input_axes]))
+    for n in input_names:
+        if n not in point_inputs:
+            point_inputs[n] = np.full(num_points, inputs[n], dtype=float)
+
+    tasks = []
+    size = calc_chunk_size(num_points, len(configs), processes, chunk_size)
+    for c in configs:
+        for start in range(0, num_points, size):
+            tasks.append((model, c, {n: v[start:start + size] for n, v in point_inputs.items()}))
+
+    if processes == 1:
+        results = [run_task(t) for t in tasks]
+    else:
+        with Pool(processes) as pool:
+            results = pool.map(run_task, tasks, chunksize=1)
+
+    shape = [len(values[i]) for i in config_axes] + [len(values[i]) for i in input_axes]
+    out = np.concatenate(results).reshape(shape)
+    return np.transpose(out, np.argsort(config_axes + input_axes))
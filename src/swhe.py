@@ -1,18 +1,59 @@
-from math import exp
-from typing import Union
-
-from src.fluid import Fluid
-from src.pipe import Pipe
-from src.utilities import smoothing_function
+from math import inf
+from time import perf_counter
+from typing import NamedTuple, Union
+
+import numpy as np
+
+from src.fluid import Fluid, FluidState
+from src.pipe import Pipe, PipeArray
+from src.property_cache import PropertyCache
+from src.swhe_context import SWHEContext
+from src.swhe_surrogate import SWHESurrogate
+from src.utilities import find_monotonic_roots, smoothing_function
+
+
+class SWHEResult(NamedTuple):
+    """
+    Result of a SWHE solve
+    UA, NTU, effectiveness and the resistances are evaluated at the final mean brine temperature and heat rate.
+    """
+
+    value: float  # outlet temperature, [C]
+    iterations: int
+    residual: float  # change in outlet temperature over the last iteration, [C]
+    converged: bool
+    mean_temperature: float  # [C]
+    q_coil: float  # [W]
+    ua: float  # [W/K]
+    ntu: float  # [-]
+    effectiveness: float  # [-]
+    resistances: dict  # [K/W]
+
+
+class SegmentedResult(NamedTuple):
+    """
+    Result of a segmented SWHE solve
+    Leading dimensions follow the broadcast shape of the inputs; the last dimension runs along the coil.
+    """
+
+    value: np.ndarray  # outlet temperature, [C]
+    iterations: int
+    residual: float  # largest change in outlet temperature over the last iteration, [C]
+    converged: bool
+    temperatures: np.ndarray  # brine temperature at the inlet and at the end of each segment, [C]
+    mean_temperatures: np.ndarray  # mean brine temperature of each segment, [C]
+    q_segments: np.ndarray  # heat transfer rate of each segment, [W]
+    ua: np.ndarray  # UA of each segment, [W/K]
+    q_coil: np.ndarray  # coil heat transfer rate, [W]
 
 
 class SWHE(object):
-    def __init__(self, data):
+    def __init__(self, data, cache: PropertyCache = None):
 
         # input data
         self.pipe = Pipe(data["pipe"])
-        self.brine = Fluid(data["fluid"])
-        self.water = Fluid({"fluid-name": "water"})
+        self.brine = Fluid(data["fluid"], cache)
+        self.water = Fluid({"fluid-name": "water", "backend": self.brine.backend}, cache)
         self.coil_dia = data["diameter"]
         self.dx = data["horizontal-spacing"]
         self.dy = data["vertical-spacing"]
@@ -21,6 +62,45 @@ class SWHE(object):
         self.include_inside_fouling = False
         self.include_outside_fouling = False
 
+        # solver settings: "fixed-point" (successive substitution) or "secant"
+        self.solver = "fixed-point"
+        self.tol = 0.01
+        self.max_iter = 100
+        self.last_solve = {}
+
+        # fixed-point under-relaxation factor, 0-1, and wall time budget per solve, [s]
+        self.damping = 1.0
+        self.max_time = None
+
+        # carry the last converged state forward as the initial guess for the next call
+        self.warm_start = False
+        self.warm_state = None
+
+        # precomputed constants of the heat transfer calculations
+        self.context = SWHEContext(self)
+
+    def compile(self):
+        """
+        Rebuild the precomputed constants of the heat transfer calculations
+        Only needed after changing the diameters or spacings without calling Pipe.update_pipe;
+        pipe length and fouling flag changes are picked up automatically.
+        :return: SWHEContext
+        """
+
+        self.context = SWHEContext(self, self.context)
+        return self.context
+
+    def get_context(self):
+        """
+        Get the precomputed constants, recompiling the length-dependent terms if the pipe or fouling flags changed
+        :return: SWHEContext
+        """
+
+        context = self.context
+        if not context.is_valid(self):
+            context = self.compile()
+        return context
+
     def calc_v_dot(self, m_dot: Union[int, float], temperature: Union[int, float]):
         """
         Calculate volume flow rate
@@ -51,162 +131,629 @@ class SWHE(object):
 
         return 4.0
 
-    def calc_turbulent_nusselt_inside(self, reynolds, temperature):
+    def calc_turbulent_nusselt_inside(self, reynolds, temperature, state: FluidState = None,
+                                      context: SWHEContext = None):
         """
         Compute turbulent Nusselt number using Rogers and Mayhew 1964.
         :param reynolds: Reynolds no., [-]
         :param temperature: temperature, [C]
+        :param state: brine properties at temperature, optional
+        :param context: compiled geometry, defaults to the SWHE context
         :return: turbulent Nusselt no. [-]
         """
 
-        prandtl = self.brine.prandtl(temperature)
-        return 0.023 * (reynolds ** 0.85) * (prandtl ** 0.4) * (self.pipe.inner_dia / self.coil_dia) ** 0.1
+        if context is None:
+            context = self.get_context()
+        if state is None:
+            prandtl = self.brine.prandtl(temperature)
+        else:
+            prandtl = state.prandtl
+        return context.turbulent_nusselt_factor * (reynolds ** 0.85) * (prandtl ** 0.4)
 
-    def calc_reynolds_no(self, m_dot: Union[int, float], temperature: Union[int, float]):
+    def calc_reynolds_no(self, m_dot: Union[int, float], temperature: Union[int, float],
+                         state: FluidState = None, context: SWHEContext = None):
         """
         Compute Reynolds number
         :param m_dot: mass flow rate, [kg/s]
         :param temperature: temperature, [C]
+        :param state: brine properties at temperature, optional
+        :param context: compiled geometry, defaults to the SWHE context
         :return: Reynolds no. [-]
         """
 
-        density = self.brine.density(temperature)
-        dyn_visc = self.brine.viscosity(temperature)
-        velocity = self.calc_fluid_velocity(m_dot, temperature)
-        return velocity * self.pipe.inner_dia * density / dyn_visc
+        if context is None:
+            context = self.get_context()
+        if state is None:
+            density = self.brine.density(temperature)
+            dyn_visc = self.brine.viscosity(temperature)
+        else:
+            density = state.density
+            dyn_visc = state.viscosity
+        velocity = m_dot / density / context.area_cr_inner
+        return velocity * context.inner_dia * density / dyn_visc
 
-    def calc_inside_conv_resistance(self, m_dot: Union[int, float], temperature: Union[int, float]):
+    def calc_inside_conv_resistance(self, m_dot: Union[int, float], temperature: Union[int, float],
+                                    state: FluidState = None, context: SWHEContext = None):
         """
         Compute inside convection resistance
         :param m_dot: mass flow rate, [kg/s]
         :param temperature: temperature of fluid, [C]
+        :param state: brine properties at temperature, optional
+        :param context: compiled geometry, defaults to the SWHE context
         :return: inside convection resistance, [K/W]
         """
 
+        if context is None:
+            context = self.get_context()
+        if state is None:
+            state = self.brine.state(temperature)
+
         # compute reynolds no
-        reynolds = self.calc_reynolds_no(m_dot, temperature)
+        reynolds = self.calc_reynolds_no(m_dot, temperature, state, context)
 
         # compute nusselt number
         reynolds_low_cutoff = 500
         reynolds_high_cutoff = 5000
-        if reynolds < reynolds_low_cutoff:
+        if np.ndim(reynolds) > 0:
+            # the smoothing function returns exactly 0 and 1 below and above the cutoffs
+            x = smoothing_function(reynolds, reynolds_low_cutoff, reynolds_high_cutoff, 0, 1)
+            nusselt_lam = self.calc_laminar_nusselt_inside()
+            nusselt_turb = self.calc_turbulent_nusselt_inside(reynolds, temperature, state, context)
+            nusselt = nusselt_lam * (1 - x) + nusselt_turb * x
+        elif reynolds < reynolds_low_cutoff:
             nusselt = self.calc_laminar_nusselt_inside()
         elif reynolds_low_cutoff <= reynolds < reynolds_high_cutoff:
             x = smoothing_function(reynolds, reynolds_low_cutoff, reynolds_high_cutoff, 0, 1)
             nusselt_lam = self.calc_laminar_nusselt_inside()
-            nusselt_turb = self.calc_turbulent_nusselt_inside(reynolds, temperature)
+            nusselt_turb = self.calc_turbulent_nusselt_inside(reynolds, temperature, state, context)
             nusselt = nusselt_lam * (1 - x) + nusselt_turb * x
         else:
-            nusselt = self.calc_turbulent_nusselt_inside(reynolds, temperature)
+            nusselt = self.calc_turbulent_nusselt_inside(reynolds, temperature, state, context)
 
         # compute resistance
-        cond = self.brine.conductivity(temperature)
-        h_in = nusselt * cond / self.pipe.inner_dia
-        return 1 / (h_in * self.pipe.area_surf_inner)
+        cond = state.conductivity
+        h_in = nusselt * cond / context.inner_dia
+        return 1 / (h_in * context.area_surf_inner)
 
     def calc_outside_conv_resistance(self, q_coil: Union[int, float],
                                      temperature: Union[int, float],
-                                     temperature_sw: Union[int, float]):
+                                     temperature_sw: Union[int, float],
+                                     state: FluidState = None,
+                                     context: SWHEContext = None):
         """
         Computer outside tube resistance
         :param q_coil: coil heat transfer rate, [W]
         :param temperature: brine temperature, [C]
         :param temperature_sw: surface water temperature, [C]
+        :param state: water properties at temperature, optional
+        :param context: compiled geometry, defaults to the SWHE context
         :return: outside convection resistance, [K/W]
         """
 
-        gravity = 9.81
+        if state is None:
+            state = self.water.state(temperature)
+        if context is None:
+            context = self.get_context()
 
         # coil heat flux
-        q_flux = q_coil / self.pipe.area_surf_outer
+        q_flux = q_coil / context.area_surf_outer
 
         # modified rayleigh number
-        beta = self.water.beta(temperature)
-        cond = self.water.conductivity(temperature)
-        kin_visc = self.water.viscosity_kinematic(temperature)
-        alpha = self.water.alpha(temperature)
-        ra_star = gravity * abs(beta * q_flux) * (self.pipe.outer_dia ** 4) / (cond * kin_visc * alpha)
-
-        # calculate convection coefficient
-        if temperature > temperature_sw:
-            a = 5.0
-            b = 0.0317
-            c = 0.333
-            d = 0.344
-            e = 0.301
+        beta = state.beta
+        cond = state.conductivity
+        kin_visc = state.viscosity_kinematic
+        alpha = state.alpha
+        ra_star = context.rayleigh_factor * np.abs(beta * q_flux) / (cond * kin_visc * alpha)
+
+        # calculate convection coefficient, with the spacing terms folded into b
+        if np.ndim(temperature) > 0 or np.ndim(temperature_sw) > 0:
+            heating = np.asarray(temperature) > np.asarray(temperature_sw)
+            coefficients = zip(context.outside_nusselt_heating, context.outside_nusselt_cooling)
+            a, b, c = [np.where(heating, h, c) for h, c in coefficients]
+        elif temperature > temperature_sw:
+            a, b, c = context.outside_nusselt_heating
         else:
-            a = 5.75
-            b = 0.00971
-            c = 0.333
-            d = 0.929
-            e = 0.0
+            a, b, c = context.outside_nusselt_cooling
 
-        nusselt = a + b * ra_star ** c * (self.dy / self.pipe.outer_dia) ** d * (self.dx / self.pipe.outer_dia) ** e
-        h_o = nusselt * cond / self.pipe.outer_dia
+        nusselt = a + b * ra_star ** c
+        h_o = nusselt * cond / context.outer_dia
 
-        return 1 / (h_o * cond * self.pipe.area_surf_outer)
+        return 1 / (h_o * cond * context.area_surf_outer)
 
-    def calc_inside_fouling_resistance(self, include_fouling=False):
+    def calc_inside_fouling_resistance(self, include_fouling=False, pipe: Union[Pipe, PipeArray] = None):
         """
         Compute inside fouling resistance
         :param include_fouling: include fouling flag
+        :param pipe: pipe or pipes to evaluate, defaults to the SWHE pipe
         :return: inside fouling resistance, [K/W]
         """
 
+        if pipe is None:
+            pipe = self.pipe
         if include_fouling:
-            return 0.000175 / self.pipe.area_surf_inner
+            return 0.000175 / pipe.area_surf_inner
         else:
             return 0.0
 
-    def calc_outside_fouling_resistance(self, include_fouling=False):
+    def calc_outside_fouling_resistance(self, include_fouling=False, pipe: Union[Pipe, PipeArray] = None):
         """
         Compute outside fouling resistance
         :param include_fouling: include fouling flag
+        :param pipe: pipe or pipes to evaluate, defaults to the SWHE pipe
         :return: outside fouling resistance, [K/W]
         """
 
+        if pipe is None:
+            pipe = self.pipe
         if include_fouling:
-            return 0.00053 / self.pipe.area_surf_outer
+            return 0.00053 / pipe.area_surf_outer
         else:
             return 0.0
 
+    def calc_coil(self, m_dot: Union[int, float, np.ndarray],
+                  inlet_temperature: Union[int, float, np.ndarray],
+                  water_temp: Union[int, float, np.ndarray],
+                  mean_temperature: Union[int, float, np.ndarray],
+                  q_coil: Union[int, float, np.ndarray],
+                  context: SWHEContext = None):
+        """
+        Compute one pass of the coil heat transfer, given the current mean brine temperature and heat rate
+        :param m_dot: mass flow rate, [kg/s]
+        :param inlet_temperature: brine inlet temperature, [C]
+        :param water_temp: surface water temperature, [C]
+        :param mean_temperature: mean brine temperature, [C]
+        :param q_coil: coil heat transfer rate, [W]
+        :param context: compiled geometry, defaults to the SWHE context
+        :return: tuple of updated outlet temperature, [C], mean brine temperature, [C], and coil heat transfer rate, [W]
+        """
+
+        if context is None:
+            context = self.get_context()
+        brine_state = self.brine.state(mean_temperature)
+        water_state = self.water.state(mean_temperature)
+
+        # fouling and conduction resistances are precomputed
+        r_inside_conv = self.calc_inside_conv_resistance(m_dot, mean_temperature, brine_state, context)
+        r_outside_conv = self.calc_outside_conv_resistance(q_coil, mean_temperature, water_temp, water_state, context)
+        r_total = context.r_fixed + r_inside_conv + r_outside_conv
+
+        ua = 1 / r_total
+
+        cp_brine = brine_state.specific_heat
+        ntu = ua / (m_dot * cp_brine)
+
+        eff = 1 - np.exp(-ntu)
+
+        q_max = m_dot * cp_brine * (inlet_temperature - water_temp)
+
+        q_coil = eff * q_max
+
+        mean_temperature = water_temp + m_dot * cp_brine * inlet_temperature * (
+                1 - np.exp(-ntu)) / ua + m_dot * cp_brine * water_temp * (-1 + np.exp(-ntu)) / ua
+
+        outlet_temperature = inlet_temperature - q_coil / (m_dot * cp_brine)
+
+        return outlet_temperature, mean_temperature, q_coil
+
+    def calc_coil_details(self, m_dot: Union[int, float], water_temp: Union[int, float],
+                          mean_temperature: Union[int, float], q_coil: Union[int, float]):
+        """
+        Compute the coil heat transfer quantities at a mean brine temperature and heat rate
+        :param m_dot: mass flow rate, [kg/s]
+        :param water_temp: surface water temperature, [C]
+        :param mean_temperature: mean brine temperature, [C]
+        :param q_coil: coil heat transfer rate, [W]
+        :return: tuple of UA, [W/K], NTU, [-], effectiveness, [-], and dict of resistances, [K/W]
+        """
+
+        brine_state = self.brine.state(mean_temperature)
+        water_state = self.water.state(mean_temperature)
+        context = self.get_context()
+
+        resistances = {
+            "inside-fouling": context.r_inside_foul,
+            "outside-fouling": context.r_outside_foul,
+            "inside-convection": self.calc_inside_conv_resistance(m_dot, mean_temperature, brine_state),
+            "outside-convection": self.calc_outside_conv_resistance(q_coil, mean_temperature, water_temp,
+                                                                    water_state),
+            "conduction": context.r_cond,
+        }
+
+        ua = 1 / sum(resistances.values())
+        ntu = ua / (m_dot * brine_state.specific_heat)
+        return ua, ntu, 1 - np.exp(-ntu), resistances
+
+    def solve_fixed_point(self, m_dot: Union[int, float],
+                          inlet_temperature: Union[int, float],
+                          water_temp: Union[int, float],
+                          outlet_temperature: Union[int, float],
+                          mean_temperature: Union[int, float],
+                          q_coil: Union[int, float],
+                          max_iter: int,
+                          deadline: float = None):
+        """
+        Solve the coil by successive substitution
+        The mean brine temperature and heat rate updates are under-relaxed by the damping factor.
+        :param m_dot: mass flow rate, [kg/s]
+        :param inlet_temperature: brine inlet temperature, [C]
+        :param water_temp: surface water temperature, [C]
+        :param outlet_temperature: initial outlet temperature, [C]
+        :param mean_temperature: initial mean brine temperature, [C]
+        :param q_coil: initial coil heat transfer rate, [W]
+        :param max_iter: maximum number of iterations
+        :param deadline: perf_counter time after which the solve stops unconverged, optional
+        :return: tuple of outlet temperature, [C], mean brine temperature, [C], coil heat transfer rate, [W],
+                 iterations, converged flag, and residual, [C]
+        """
+
+        damping = self.damping
+        residual = inf
+        for iteration in range(1, max_iter + 1):
+            outlet_temperature_iter = outlet_temperature
+            outlet_temperature, mean_new, q_new = self.calc_coil(m_dot, inlet_temperature, water_temp,
+                                                                 mean_temperature, q_coil)
+            if damping == 1.0:
+                mean_temperature, q_coil = mean_new, q_new
+            else:
+                mean_temperature += damping * (mean_new - mean_temperature)
+                q_coil += damping * (q_new - q_coil)
+
+            residual = abs(outlet_temperature - outlet_temperature_iter)
+            if residual <= self.tol:
+                return outlet_temperature, mean_temperature, q_coil, iteration, True, residual
+            if deadline is not None and perf_counter() > deadline:
+                return outlet_temperature, mean_temperature, q_coil, iteration, False, residual
+
+        return outlet_temperature, mean_temperature, q_coil, max_iter, False, residual
+
+    def solve_secant(self, m_dot: Union[int, float],
+                     inlet_temperature: Union[int, float],
+                     water_temp: Union[int, float],
+                     outlet_temperature: Union[int, float],
+                     mean_temperature: Union[int, float],
+                     q_coil: Union[int, float],
+                     max_iter: int,
+                     deadline: float = None):
+        """
+        Solve the coil with secant steps on the coupled update of the outlet temperature, mean brine
+        temperature and heat rate (Anderson acceleration with a history of one step)
+        The step is fitted to the outlet and mean brine temperature residuals of the last two passes and
+        applied to all three, so the heat rate stays consistent with the temperatures. Steps that leave the
+        range between the inlet and surface water temperatures fall back to damped successive substitution,
+        and if the outlet temperature residual grows, the solve continues with solve_fixed_point.
+        :param m_dot: mass flow rate, [kg/s]
+        :param inlet_temperature: brine inlet temperature, [C]
+        :param water_temp: surface water temperature, [C]
+        :param outlet_temperature: initial outlet temperature, [C]
+        :param mean_temperature: initial mean brine temperature, [C]
+        :param q_coil: initial coil heat transfer rate, [W]
+        :param max_iter: maximum number of iterations
+        :param deadline: perf_counter time after which the solve stops unconverged, optional
+        :return: tuple of outlet temperature, [C], mean brine temperature, [C], coil heat transfer rate, [W],
+                 iterations, converged flag, and residual, [C]
+        """
+
+        t_low = min(inlet_temperature, water_temp)
+        t_high = max(inlet_temperature, water_temp)
+        damping = self.damping
+
+        # current state and the state and residuals of the previous pass
+        x_out, x_mean, x_q = outlet_temperature, mean_temperature, q_coil
+        previous = None
+        residual = inf
+        for iteration in range(1, max_iter + 1):
+            g_out, g_mean, g_q = self.calc_coil(m_dot, inlet_temperature, water_temp, x_mean, x_q)
+            f_out, f_mean, f_q = g_out - x_out, g_mean - x_mean, g_q - x_q
+
+            residual = abs(f_out)
+            if residual <= self.tol:
+                return g_out, g_mean, g_q, iteration, True, residual
+            if deadline is not None and perf_counter() > deadline:
+                return g_out, g_mean, g_q, iteration, False, residual
+            if previous is not None and residual > abs(previous[3]):
+                # diverging, continue by successive substitution from the latest pass
+                break
+
+            # damped successive substitution
+            new_out, new_mean, new_q = x_out + damping * f_out, x_mean + damping * f_mean, x_q + damping * f_q
+
+            if previous is not None:
+                p_out, p_mean, p_q, pf_out, pf_mean, pf_q = previous
+                df_out, df_mean, df_q = f_out - pf_out, f_mean - pf_mean, f_q - pf_q
+                denominator = df_out ** 2 + df_mean ** 2
+                if denominator > 0:
+                    gamma = (df_out * f_out + df_mean * f_mean) / denominator
+                    secant_mean = new_mean - gamma * (x_mean - p_mean + damping * df_mean)
+                    if t_low <= secant_mean <= t_high:
+                        new_out -= gamma * (x_out - p_out + damping * df_out)
+                        new_q -= gamma * (x_q - p_q + damping * df_q)
+                        new_mean = secant_mean
+
+            previous = (x_out, x_mean, x_q, f_out, f_mean, f_q)
+            x_out, x_mean, x_q = new_out, new_mean, new_q
+        else:
+            return g_out, g_mean, g_q, max_iter, False, residual
+
+        outlet_temperature, mean_temperature, q_coil, fp_iterations, converged, fp_residual = self.solve_fixed_point(
+            m_dot, inlet_temperature, water_temp, g_out, g_mean, g_q, max_iter - iteration, deadline)
+        self.last_solve["solver"] = "fixed-point"
+        return (outlet_temperature, mean_temperature, q_coil, iteration + fp_iterations, converged,
+                fp_residual if fp_iterations else residual)
+
+    def reset(self):
+        """
+        Clear the warm start state
+        :return: None
+        """
+
+        self.warm_state = None
+
     def simulate(self, m_dot: Union[int, float],
                  inlet_temperature: Union[int, float],
-                 water_temp: Union[int, float]):
+                 water_temp: Union[int, float],
+                 full_output: bool = False):
+        """
+        Simulate the coil outlet temperature
+        Solver telemetry is stored in last_solve. With warm_start enabled, the solve starts
+        from the outlet temperature, mean brine temperature and coil heat rate of the last
+        converged call. The solve stops unconverged after max_iter iterations or max_time seconds.
+        :param m_dot: mass flow rate, [kg/s]
+        :param inlet_temperature: brine inlet temperature, [C]
+        :param water_temp: surface water temperature, [C]
+        :param full_output: return a SWHEResult instead of the outlet temperature
+        :return: outlet temperature, [C], or SWHEResult
+        """
 
         # initialize
-        outlet_temperature = inlet_temperature
-        outlet_temperature_iter = 0
-        mean_temperature = inlet_temperature
-        if inlet_temperature > water_temp:
-            q_coil = 1000
+        if self.warm_start and self.warm_state is not None:
+            outlet_temperature, mean_temperature, q_coil = self.warm_state
+        else:
+            outlet_temperature = inlet_temperature
+            mean_temperature = inlet_temperature
+            if inlet_temperature > water_temp:
+                q_coil = 1000
+            else:
+                q_coil = -1000
+
+        property_calls = self.brine.property_calls + self.water.property_calls
+        self.last_solve = {"solver": self.solver}
+        if self.solver == "secant":
+            solve = self.solve_secant
+        elif self.solver == "fixed-point":
+            solve = self.solve_fixed_point
         else:
-            q_coil = -1000
+            raise ValueError(f"Unsupported SWHE solver: {self.solver}")
 
-        while abs(outlet_temperature - outlet_temperature_iter) > 0.01:
-            outlet_temperature_iter = outlet_temperature
+        deadline = None if self.max_time is None else perf_counter() + self.max_time
+        outlet_temperature, mean_temperature, q_coil, iterations, converged, residual = solve(
+            m_dot, inlet_temperature, water_temp, outlet_temperature, mean_temperature, q_coil, self.max_iter, deadline)
 
-            r_inside_foul = self.calc_inside_fouling_resistance(self.include_inside_fouling)
-            r_outside_foul = self.calc_outside_fouling_resistance(self.include_outside_fouling)
-            r_inside_conv = self.calc_inside_conv_resistance(m_dot, mean_temperature)
-            r_outside_conv = self.calc_outside_conv_resistance(q_coil, mean_temperature, water_temp)
-            r_cond = self.pipe.calc_cond_resistance()
-            r_total = r_inside_foul + r_outside_foul + r_inside_conv + r_outside_conv + r_cond
+        if self.warm_start:
+            self.warm_state = (outlet_temperature, mean_temperature, q_coil) if converged else None
 
-            ua = 1 / r_total
+        self.last_solve["iterations"] = iterations
+        self.last_solve["converged"] = converged
+        self.last_solve["residual"] = residual
+        self.last_solve["property-calls"] = self.brine.property_calls + self.water.property_calls - property_calls
 
-            cp_brine = self.brine.specific_heat(mean_temperature)
-            ntu = ua / (m_dot * cp_brine)
+        if full_output:
+            ua, ntu, effectiveness, resistances = self.calc_coil_details(m_dot, water_temp, mean_temperature, q_coil)
+            return SWHEResult(outlet_temperature, iterations, residual, converged, mean_temperature, q_coil, ua, ntu,
+                              effectiveness, resistances)
+        return outlet_temperature
+
+    def simulate_batch(self, m_dot: Union[int, float, np.ndarray],
+                       inlet_temperature: Union[int, float, np.ndarray],
+                       water_temp: Union[int, float, np.ndarray],
+                       tol: float = None,
+                       max_iter: int = None,
+                       pipes: PipeArray = None):
+        """
+        Simulate many operating points at once
+        Each point follows the same fixed-point iteration as simulate, and points drop
+        out of the iteration as they converge. Points still iterating after max_iter
+        iterations or max_time seconds keep their latest outlet temperature.
+        With pipes given, each point is evaluated with its own pipe geometry instead of the
+        SWHE pipe. The pipes are broadcast against the inputs along the last axis, so scalar
+        inputs give one outlet temperature per pipe, and inputs of shape (n, 1) give (n, pipes).
+        :param m_dot: mass flow rate, [kg/s]
+        :param inlet_temperature: brine inlet temperature, [C]
+        :param water_temp: surface water temperature, [C]
+        :param tol: outlet temperature convergence tolerance, defaults to tol, [C]
+        :param max_iter: maximum number of iterations, defaults to max_iter
+        :param pipes: pipe geometries to evaluate, optional
+        :return: outlet temperatures, broadcast shape of the inputs (and pipes), [C]
+        """
 
-            eff = 1 - exp(-ntu)
+        if tol is None:
+            tol = self.tol
+        if max_iter is None:
+            max_iter = self.max_iter
 
-            q_max = m_dot * cp_brine * (inlet_temperature - water_temp)
+        inputs = [np.asarray(m_dot, dtype=float), np.asarray(inlet_temperature, dtype=float),
+                  np.asarray(water_temp, dtype=float)]
+        if pipes is not None:
+            inputs.append(np.arange(pipes.size))
+        inputs = np.broadcast_arrays(*inputs)
+        shape = inputs[0].shape
+        m_dot, inlet_temperature, water_temp = [x.ravel() for x in inputs[:3]]
 
-            q_coil = eff * q_max
+        # per-point geometry, selected for the active points on each pass
+        context = None
+        if pipes is not None:
+            context = SWHEContext(self, pipe=pipes.take(inputs[3].ravel()))
 
-            mean_temperature = water_temp + m_dot * cp_brine * inlet_temperature * (
-                    1 - exp(-ntu)) / ua + m_dot * cp_brine * water_temp * (-1 + exp(-ntu)) / ua
+        # initialize
+        outlet_temperature = inlet_temperature.copy()
+        mean_temperature = inlet_temperature.copy()
+        q_coil = np.where(inlet_temperature > water_temp, 1000.0, -1000.0)
+        active = np.ones(m_dot.size, dtype=bool)
+        damping = self.damping
+        deadline = None if self.max_time is None else perf_counter() + self.max_time
+
+        for _ in range(max_iter):
+            idx = np.flatnonzero(active)
+            if idx.size == 0:
+                break
+
+            outlet_new, mean_new, q_new = self.calc_coil(m_dot[idx], inlet_temperature[idx], water_temp[idx],
+                                                         mean_temperature[idx], q_coil[idx],
+                                                         None if context is None else context.take(idx))
+            if damping == 1.0:
+                mean_temperature[idx] = mean_new
+                q_coil[idx] = q_new
+            else:
+                mean_temperature[idx] += damping * (mean_new - mean_temperature[idx])
+                q_coil[idx] += damping * (q_new - q_coil[idx])
+            active[idx] = np.abs(outlet_new - outlet_temperature[idx]) > tol
+            outlet_temperature[idx] = outlet_new
+            if deadline is not None and perf_counter() > deadline:
+                break
+
+        return outlet_temperature.reshape(shape)
+
+    def simulate_segmented(self, m_dot: Union[int, float, np.ndarray],
+                           inlet_temperature: Union[int, float, np.ndarray],
+                           water_temp: Union[int, float, np.ndarray],
+                           num_segments: int = 10,
+                           full_output: bool = False):
+        """
+        Simulate the coil outlet temperature with the pipe split into segments along its length
+        Each segment has its own mean brine temperature, properties, resistances and heat rate. On each
+        iteration, all segments are evaluated together, and the brine temperature is marched through them
+        with the exact exponential decay of each segment. Iterates until the outlet temperature changes by
+        less than tol, using the damping, max_iter and max_time settings; solver telemetry is stored in
+        last_solve. One segment gives the same result as the fixed-point solve of simulate.
+        :param m_dot: mass flow rate, [kg/s]
+        :param inlet_temperature: brine inlet temperature, [C]
+        :param water_temp: surface water temperature, [C]
+        :param num_segments: number of equal length segments
+        :param full_output: return a SegmentedResult instead of the outlet temperature
+        :return: outlet temperature, broadcast shape of the inputs, [C], or SegmentedResult
+        """
 
-            outlet_temperature = inlet_temperature - q_coil / (m_dot * cp_brine)
+        if num_segments < 1:
+            raise ValueError(f"Number of segments must be at least 1: {num_segments}")
+
+        pipe = self.pipe
+        segment = Pipe({
+            "outer-dia": pipe.outer_dia,
+            "inner-dia": pipe.inner_dia,
+            "length": pipe.length / num_segments,
+            "density": pipe.density,
+            "conductivity": pipe.conductivity,
+        })
+        context = SWHEContext(self, pipe=segment)
+
+        m_dot, inlet_temperature, water_temp = np.broadcast_arrays(np.asarray(m_dot, dtype=float),
+                                                                   np.asarray(inlet_temperature, dtype=float),
+                                                                   np.asarray(water_temp, dtype=float))
+        shape = m_dot.shape + (num_segments,)
+
+        # trailing segment dimension
+        m_dot = m_dot[..., None]
+        t_in = inlet_temperature[..., None]
+        t_w = water_temp[..., None]
 
+        # initialize
+        mean_temperature = np.broadcast_to(t_in, shape).copy()
+        q_segments = np.broadcast_to(np.where(t_in > t_w, 1000.0, -1000.0) / num_segments, shape).copy()
+        outlet_temperature = inlet_temperature.copy()
+        damping = self.damping
+        deadline = None if self.max_time is None else perf_counter() + self.max_time
+        residual = inf
+        converged = False
+        iteration = 0
+
+        while iteration < self.max_iter:
+            iteration += 1
+            brine_state = self.brine.state(mean_temperature)
+            water_state = self.water.state(mean_temperature)
+
+            # fouling and conduction resistances are precomputed for the segment length
+            r_inside_conv = self.calc_inside_conv_resistance(m_dot, mean_temperature, brine_state, context)
+            r_outside_conv = self.calc_outside_conv_resistance(q_segments, mean_temperature, t_w, water_state,
+                                                               context)
+            ua = 1 / (context.r_fixed + r_inside_conv + r_outside_conv)
+            cp_brine = brine_state.specific_heat
+            ntu = ua / (m_dot * cp_brine)
+
+            # the brine temperature difference to the water decays through each segment
+            decay = np.exp(-ntu)
+            temperatures = np.concatenate((np.broadcast_to(t_in, shape[:-1] + (1,)),
+                                           t_w + (t_in - t_w) * np.cumprod(decay, axis=-1)), axis=-1)
+            segment_inlet = temperatures[..., :-1]
+
+            mean_new = t_w + (segment_inlet - t_w) * (1 - decay) / ntu
+            q_new = m_dot * cp_brine * (segment_inlet - temperatures[..., 1:])
+            if damping == 1.0:
+                mean_temperature, q_segments = mean_new, q_new
+            else:
+                mean_temperature += damping * (mean_new - mean_temperature)
+                q_segments += damping * (q_new - q_segments)
+
+            outlet_new = temperatures[..., -1]
+            residual = float(np.max(np.abs(outlet_new - outlet_temperature)))
+            outlet_temperature = outlet_new
+            if residual <= self.tol:
+                converged = True
+                break
+            if deadline is not None and perf_counter() > deadline:
+                break
+
+        self.last_solve = {"solver": "segmented", "iterations": iteration, "converged": converged,
+                           "residual": residual}
+
+        if full_output:
+            return SegmentedResult(outlet_temperature, iteration, residual, converged, temperatures,
+                                   mean_temperature, q_segments, ua, np.sum(q_segments, axis=-1))
         return outlet_temperature
+
+    def size_pipe_lengths(self, m_dot: Union[int, float], inlet_temperature: Union[int, float],
+                          water_temp: Union[int, float], t_appr_targets: Union[list, np.ndarray],
+                          length_low: float = 10.0, length_high: float = 1000.0, length_tol: float = 0.01):
+        """
+        Find the pipe lengths that give a sequence of approach temperature targets
+        The approach temperature is the difference between the outlet and surface water temperatures.
+        Each length is found with a bracketed root finder, warm-started from the previous target.
+        The pipe length and the warm start settings and state are restored when done.
+        :param m_dot: mass flow rate, [kg/s]
+        :param inlet_temperature: brine inlet temperature, [C]
+        :param water_temp: surface water temperature, [C]
+        :param t_appr_targets: approach temperature targets, [C]
+        :param length_low: initial lower bound of pipe length, [m]
+        :param length_high: initial upper bound of pipe length, [m]
+        :param length_tol: pipe length convergence tolerance, [m]
+        :return: pipe lengths, [m]
+        """
+
+        length_orig = self.pipe.length
+        warm_start_orig = (self.warm_start, self.warm_state)
+        self.warm_start = True
+
+        def calc_approach(length):
+            self.pipe.update_pipe(length)
+            return abs(self.simulate(m_dot, inlet_temperature, water_temp) - water_temp)
+
+        try:
+            lengths = find_monotonic_roots(calc_approach, [abs(t) for t in t_appr_targets], length_low, length_high,
+                                           length_tol)
+        finally:
+            self.pipe.update_pipe(length_orig)
+            self.warm_start, self.warm_state = warm_start_orig
+
+        return np.array(lengths)
+
+    def compile_surrogate(self, m_dot_range: tuple, inlet_temp_range: tuple, water_temp_range: tuple,
+                          num_points: tuple = (25, 25, 15)):
+        """
+        Build a gridded surrogate of the outlet temperature for fast lookups
+        The surrogate is only valid while this SWHE is unchanged.
+        :param m_dot_range: minimum and maximum mass flow rate, [kg/s]
+        :param inlet_temp_range: minimum and maximum brine inlet temperature, [C]
+        :param water_temp_range: minimum and maximum surface water temperature, [C]
+        :param num_points: number of grid points along each axis
+        :return: SWHESurrogate
+        """
+
+        return SWHESurrogate(self, m_dot_range, inlet_temp_range, water_temp_range, num_points)
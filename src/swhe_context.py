@@ -0,0 +1,108 @@
+import numpy as np
+
+# outside convection correlation coefficients for heating (brine warmer than the surface water) and cooling:
+# nusselt = a + b * ra_star ** c * (dy / outer_dia) ** d * (dx / outer_dia) ** e
+OUTSIDE_NUSSELT_HEATING = (5.0, 0.0317, 0.333, 0.344, 0.301)
+OUTSIDE_NUSSELT_COOLING = (5.75, 0.00971, 0.333, 0.929, 0.0)
+
+GRAVITY = 9.81
+
+
+class SWHEContext(object):
+    __slots__ = ("pipe", "pipe_revision", "include_fouling", "geometry", "inner_dia", "outer_dia", "area_cr_inner",
+                 "turbulent_nusselt_factor", "rayleigh_factor", "outside_nusselt_heating", "outside_nusselt_cooling",
+                 "length", "area_surf_inner", "area_surf_outer", "r_inside_foul", "r_outside_foul", "r_cond",
+                 "r_fixed")
+
+    def __init__(self, swhe, previous: "SWHEContext" = None, pipe=None):
+        """
+        Immutable constants of the SWHE heat transfer calculations
+
+        Terms that only depend on the diameters and spacings are computed once. When a previous
+        context with the same geometry is given, they are copied from it and only the terms that
+        depend on the pipe length, conductivity and fouling flags are recomputed.
+
+        :param swhe: SWHE to compile
+        :param previous: previous context of the SWHE, optional
+        :param pipe: Pipe or PipeArray to compile against instead of the SWHE pipe, optional.
+                     With a PipeArray, the geometry terms are arrays with one entry per pipe.
+        """
+
+        if pipe is None:
+            pipe = swhe.pipe
+        include_fouling = (swhe.include_inside_fouling, swhe.include_outside_fouling)
+        geometry = (pipe.inner_dia, pipe.outer_dia, swhe.coil_dia, swhe.dx, swhe.dy)
+        init = object.__setattr__
+
+        if previous is not None and np.ndim(pipe.inner_dia) == 0 and previous.geometry == geometry:
+            for name in ("inner_dia", "outer_dia", "area_cr_inner", "turbulent_nusselt_factor", "rayleigh_factor",
+                         "outside_nusselt_heating", "outside_nusselt_cooling"):
+                init(self, name, getattr(previous, name))
+        else:
+            init(self, "inner_dia", pipe.inner_dia)
+            init(self, "outer_dia", pipe.outer_dia)
+            init(self, "area_cr_inner", pipe.area_cr_inner)
+            init(self, "turbulent_nusselt_factor", 0.023 * (pipe.inner_dia / swhe.coil_dia) ** 0.1)
+            init(self, "rayleigh_factor", GRAVITY * pipe.outer_dia ** 4)
+
+            # (a, b * geometry factor, c) of the outside convection correlation
+            for name, (a, b, c, d, e) in (("outside_nusselt_heating", OUTSIDE_NUSSELT_HEATING),
+                                          ("outside_nusselt_cooling", OUTSIDE_NUSSELT_COOLING)):
+                init(self, name, (a, b * (swhe.dy / pipe.outer_dia) ** d * (swhe.dx / pipe.outer_dia) ** e, c))
+
+        area_surf_inner = pipe.area_surf_inner
+        area_surf_outer = pipe.area_surf_outer
+        r_inside_foul = swhe.calc_inside_fouling_resistance(include_fouling[0], pipe)
+        r_outside_foul = swhe.calc_outside_fouling_resistance(include_fouling[1], pipe)
+        r_cond = pipe.calc_cond_resistance()
+
+        init(self, "pipe", pipe)
+        init(self, "pipe_revision", pipe.revision)
+        init(self, "include_fouling", include_fouling)
+        init(self, "geometry", geometry)
+        init(self, "length", pipe.length)
+        init(self, "area_surf_inner", area_surf_inner)
+        init(self, "area_surf_outer", area_surf_outer)
+        init(self, "r_inside_foul", r_inside_foul)
+        init(self, "r_outside_foul", r_outside_foul)
+        init(self, "r_cond", r_cond)
+        init(self, "r_fixed", r_inside_foul + r_outside_foul + r_cond)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("SWHEContext is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("SWHEContext is immutable")
+
+    def is_valid(self, swhe):
+        """
+        Check whether the context still matches a SWHE
+        The context is stale when the SWHE has a different pipe object, the pipe revision changed
+        (on every Pipe.update_pipe call), or the diameters, spacings or fouling flags changed.
+        :param swhe: SWHE the context was compiled from
+        :return: True if valid
+        """
+
+        pipe = swhe.pipe
+        if self.pipe is not pipe or self.pipe_revision != pipe.revision:
+            return False
+        include_fouling = (swhe.include_inside_fouling, swhe.include_outside_fouling)
+        geometry = (pipe.inner_dia, pipe.outer_dia, swhe.coil_dia, swhe.dx, swhe.dy)
+        return self.include_fouling == include_fouling and self.geometry == geometry
+
+    def take(self, indices: np.ndarray):
+        """
+        Select the entries of a context compiled against a PipeArray
+        :param indices: integer indices or boolean mask
+        :return: new SWHEContext
+        """
+
+        context = object.__new__(SWHEContext)
+        for name in self.__slots__:
+            value = getattr(self, name)
+            if isinstance(value, np.ndarray):
+                value = value[indices]
+            elif name.startswith("outside_nusselt"):
+                value = tuple(v[indices] if isinstance(v, np.ndarray) else v for v in value)
+            object.__setattr__(context, name, value)
+        return context
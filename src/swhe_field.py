@@ -0,0 +1,106 @@
+from typing import NamedTuple, Union
+
+import numpy as np
+
+from src.pipe import Pipe, PipeArray
+from src.property_cache import PropertyCache
+from src.swhe import SWHE
+
+
+class FieldResult(NamedTuple):
+    """
+    Result of a SWHE field solve
+    Leading dimensions follow the broadcast shape of the inputs.
+    """
+
+    value: np.ndarray  # mixed outlet temperature, [C]
+    branch_m_dot: np.ndarray  # mass flow rate of each branch, [kg/s]
+    branch_outlet_temperature: np.ndarray  # outlet temperature of each branch, [C]
+    q_coils: np.ndarray  # heat transfer rate of each coil, in the order of SWHEField.coils, [W]
+    q_total: np.ndarray  # total heat transfer rate of the field, [W]
+
+
+class SWHEField(object):
+    def __init__(self, data: dict, cache: PropertyCache = None):
+        """
+        Field of SWHE coils, with parallel branches of coils in series
+
+        All coils share the fluid, coil diameter and spacings of the base coil config, and may override its pipe.
+        The coils at the same series position of every branch are solved together in one batched SWHE solve.
+        The total flow is split between the branches by fixed fractions, equal by default; branch pressure drops
+        are not balanced. Branch outlets are mixed by mass flow rate.
+
+        :param data: dict with "swhe", the base coil config without the fluid, "fluid", and "branches", either
+                     the number of identical branches, with "series" coils each (default 1), or a list of
+                     branches, each a list of dicts of pipe values overriding the base pipe, e.g. {"length": 150}.
+                     Optionally "flow-fractions", the fraction of the total flow through each branch.
+        :param cache: shared fluid property cache, optional
+        """
+
+        self.swhe = SWHE({**data["swhe"], "fluid": data["fluid"]}, cache)
+
+        branches = data["branches"]
+        if isinstance(branches, int):
+            branches = [[{}] * data.get("series", 1)] * branches
+        if not branches or any(not b for b in branches):
+            raise ValueError("SWHE fields need at least one branch, and at least one coil per branch")
+
+        # coils in branch-major order
+        base_pipe = data["swhe"]["pipe"]
+        self.coils = [(b, k) for b, branch in enumerate(branches) for k in range(len(branch))]
+        self.pipes = PipeArray.from_pipes([Pipe({**base_pipe, **branches[b][k]}) for b, k in self.coils])
+        self.num_branches = len(branches)
+        self.num_series = max(len(b) for b in branches)
+
+        fractions = np.asarray(data.get("flow-fractions", np.ones(self.num_branches)), dtype=float)
+        if fractions.shape != (self.num_branches,) or np.any(fractions <= 0):
+            raise ValueError(f"Expected {self.num_branches} positive flow fractions")
+        self.flow_fractions = fractions / fractions.sum()
+
+        # coil and branch indices and pipes of each series position
+        coil_branch = np.array([b for b, _ in self.coils])
+        coil_position = np.array([k for _, k in self.coils])
+        self.positions = []
+        for k in range(self.num_series):
+            coil_idx = np.flatnonzero(coil_position == k)
+            self.positions.append((coil_idx, coil_branch[coil_idx], self.pipes.take(coil_idx)))
+
+    def simulate(self, m_dot: Union[int, float, np.ndarray],
+                 inlet_temperature: Union[int, float, np.ndarray],
+                 water_temp: Union[int, float, np.ndarray],
+                 full_output: bool = False):
+        """
+        Simulate the field outlet temperature
+        :param m_dot: total mass flow rate through the field, [kg/s]
+        :param inlet_temperature: brine inlet temperature, [C]
+        :param water_temp: surface water temperature, [C]
+        :param full_output: return a FieldResult instead of the outlet temperature
+        :return: mixed outlet temperature, broadcast shape of the inputs, [C], or FieldResult
+        """
+
+        m_dot, inlet_temperature, water_temp = np.broadcast_arrays(np.asarray(m_dot, dtype=float),
+                                                                   np.asarray(inlet_temperature, dtype=float),
+                                                                   np.asarray(water_temp, dtype=float))
+        shape = m_dot.shape
+
+        # trailing dimension of one entry per branch
+        branch_m_dot = m_dot[..., None] * self.flow_fractions
+        branch_temperature = np.broadcast_to(inlet_temperature[..., None], branch_m_dot.shape).copy()
+        water_temp = water_temp[..., None]
+        q_coils = np.zeros(shape + (len(self.coils),))
+
+        for coil_idx, branch_idx, pipes in self.positions:
+            m_dot_k = branch_m_dot[..., branch_idx]
+            inlet_k = branch_temperature[..., branch_idx]
+            outlet_k = self.swhe.simulate_batch(m_dot_k, inlet_k, water_temp, pipes=pipes)
+
+            # coil heat rate from the brine temperature change
+            cp = self.swhe.brine.specific_heat(0.5 * (inlet_k + outlet_k))
+            q_coils[..., coil_idx] = m_dot_k * cp * (inlet_k - outlet_k)
+            branch_temperature[..., branch_idx] = outlet_k
+
+        outlet_temperature = np.sum(branch_m_dot * branch_temperature, axis=-1) / m_dot
+        if not full_output:
+            return outlet_temperature
+
+        return FieldResult(outlet_temperature, branch_m_dot, branch_temperature, q_coils, np.sum(q_coils, axis=-1))
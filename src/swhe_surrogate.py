@@ -0,0 +1,146 @@
+from math import floor
+from typing import Union
+
+import numpy as np
+
+
+class SWHESurrogate(object):
+    def __init__(self, swhe, m_dot_range: tuple, inlet_temp_range: tuple, water_temp_range: tuple,
+                 num_points: tuple = (25, 25, 15), tol: float = 1e-4):
+        """
+        Trilinear response surface of the SWHE outlet temperature over a regular grid
+        of mass flow rate, inlet temperature, and surface water temperature
+        Points outside of the grid are passed to the full model.
+        :param swhe: SWHE object, which must not be modified after the surrogate is built
+        :param m_dot_range: minimum and maximum mass flow rate, [kg/s]
+        :param inlet_temp_range: minimum and maximum brine inlet temperature, [C]
+        :param water_temp_range: minimum and maximum surface water temperature, [C]
+        :param num_points: number of grid points along each axis
+        :param tol: outlet temperature convergence tolerance of the full model used to build the grid, [C]
+        """
+
+        self.swhe = swhe
+        self.max_error = None
+
+        ranges = (m_dot_range, inlet_temp_range, water_temp_range)
+        for (low, high), n in zip(ranges, num_points):
+            if not high > low or n < 2:
+                raise ValueError("Surrogate ranges must be increasing with at least 2 points per axis")
+
+        self.axes = [np.linspace(low, high, n) for (low, high), n in zip(ranges, num_points)]
+        self.lows = [float(a[0]) for a in self.axes]
+        self.highs = [float(a[-1]) for a in self.axes]
+        self.steps = [float(a[1] - a[0]) for a in self.axes]
+        self.shape = tuple(num_points)
+
+        grid = np.meshgrid(*self.axes, indexing="ij")
+        self.values = swhe.simulate_batch(*grid, tol=tol)
+        if not np.all(np.isfinite(self.values)):
+            raise ValueError("Full model returned invalid outlet temperatures inside the surrogate ranges")
+        self._values = self.values.ravel().tolist()
+
+    def in_range(self, m_dot: float, inlet_temperature: float, water_temp: float):
+        """
+        Check whether a point is inside of the grid
+        :param m_dot: mass flow rate, [kg/s]
+        :param inlet_temperature: brine inlet temperature, [C]
+        :param water_temp: surface water temperature, [C]
+        :return: True if inside of the grid
+        """
+
+        lows, highs = self.lows, self.highs
+        if not lows[0] <= m_dot <= highs[0]:
+            return False
+        return lows[1] <= inlet_temperature <= highs[1] and lows[2] <= water_temp <= highs[2]
+
+    def simulate(self, m_dot: Union[int, float], inlet_temperature: Union[int, float],
+                 water_temp: Union[int, float]):
+        """
+        Interpolate the outlet temperature, falling back to the full model outside of the grid
+        :param m_dot: mass flow rate, [kg/s]
+        :param inlet_temperature: brine inlet temperature, [C]
+        :param water_temp: surface water temperature, [C]
+        :return: outlet temperature, [C]
+        """
+
+        if not self.in_range(m_dot, inlet_temperature, water_temp):
+            return self.swhe.simulate(m_dot, inlet_temperature, water_temp)
+
+        _, n_y, n_z = self.shape
+        v = self._values
+
+        x = (m_dot - self.lows[0]) / self.steps[0]
+        i = min(int(floor(x)), self.shape[0] - 2)
+        fx = x - i
+        y = (inlet_temperature - self.lows[1]) / self.steps[1]
+        j = min(int(floor(y)), n_y - 2)
+        fy = y - j
+        z = (water_temp - self.lows[2]) / self.steps[2]
+        k = min(int(floor(z)), n_z - 2)
+        fz = z - k
+
+        idx = (i * n_y + j) * n_z + k
+        c00 = v[idx] * (1 - fz) + v[idx + 1] * fz
+        c01 = v[idx + n_z] * (1 - fz) + v[idx + n_z + 1] * fz
+        idx += n_y * n_z
+        c10 = v[idx] * (1 - fz) + v[idx + 1] * fz
+        c11 = v[idx + n_z] * (1 - fz) + v[idx + n_z + 1] * fz
+        c0 = c00 * (1 - fy) + c01 * fy
+        c1 = c10 * (1 - fy) + c11 * fy
+        return c0 * (1 - fx) + c1 * fx
+
+    def simulate_batch(self, m_dot: Union[int, float, np.ndarray],
+                       inlet_temperature: Union[int, float, np.ndarray],
+                       water_temp: Union[int, float, np.ndarray]):
+        """
+        Interpolate the outlet temperatures of many points, falling back to the full model outside of the grid
+        :param m_dot: mass flow rate, [kg/s]
+        :param inlet_temperature: brine inlet temperature, [C]
+        :param water_temp: surface water temperature, [C]
+        :return: outlet temperatures, broadcast shape of the inputs, [C]
+        """
+
+        points = np.broadcast_arrays(np.asarray(m_dot, dtype=float), np.asarray(inlet_temperature, dtype=float),
+                                     np.asarray(water_temp, dtype=float))
+        shape = points[0].shape
+        points = [p.ravel() for p in points]
+
+        inside = np.ones(points[0].size, dtype=bool)
+        idx = []
+        frac = []
+        for p, low, high, step, n in zip(points, self.lows, self.highs, self.steps, self.shape):
+            inside &= (p >= low) & (p <= high)
+            x = (p - low) / step
+            i = np.clip(np.floor(x).astype(int), 0, n - 2)
+            idx.append(i)
+            frac.append(np.clip(x - i, 0.0, 1.0))
+
+        result = np.zeros(points[0].size)
+        for corner in range(8):
+            weight = np.ones(points[0].size)
+            corner_idx = []
+            for axis in range(3):
+                offset = (corner >> (2 - axis)) & 1
+                weight *= frac[axis] if offset else 1 - frac[axis]
+                corner_idx.append(idx[axis] + offset)
+            result += weight * self.values[tuple(corner_idx)]
+
+        if not np.all(inside):
+            outside = ~inside
+            result[outside] = self.swhe.simulate_batch(points[0][outside], points[1][outside], points[2][outside])
+
+        return result.reshape(shape)
+
+    def validate(self, num_samples: int = 200, seed: int = 0):
+        """
+        Compare the surrogate against the full model at random points inside of the grid
+        :param num_samples: number of validation points
+        :param seed: random number generator seed
+        :return: maximum absolute outlet temperature error, [C], which is also stored in max_error
+        """
+
+        rng = np.random.default_rng(seed)
+        points = [rng.uniform(low, high, num_samples) for low, high in zip(self.lows, self.highs)]
+        exact = self.swhe.simulate_batch(*points, tol=1e-4)
+        self.max_error = float(np.max(np.abs(self.simulate_batch(*points) - exact)))
+        return self.max_error
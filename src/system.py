@@ -1,32 +1,235 @@
-from typing import Union
+from math import inf
+from time import perf_counter
+from typing import NamedTuple, Union
 
-from src.heat_pump import HeatPumpConstCOP
-from src.swhe import SWHE
+import numpy as np
+
+from src.heat_pump import get_heat_pump
+from src.pipe import PipeArray
+from src.property_cache import PropertyCache
+from src.swhe import SWHE, SWHEResult
+from src.utilities import find_monotonic_roots
+
+
+class SystemResult(NamedTuple):
+    """
+    Result of a system solve
+    """
+
+    value: float  # approach temperature, [C]
+    iterations: int
+    residual: float  # change in approach temperature over the last iteration, [C]
+    converged: bool
+    hp_outlet_temperature: float  # heat pump source side outlet temperature, [C]
+    swhe: SWHEResult  # result of the last SWHE solve
 
 
 class System(object):
-    def __init__(self, data: dict):
-        self.hp = HeatPumpConstCOP({**data["hp"], "fluid": data["fluid"]})
-        self.swhe = SWHE({**data["swhe"], "fluid": data["fluid"]})
+    def __init__(self, data: dict, cache: PropertyCache = None):
+        self.hp = get_heat_pump({**data["hp"], "fluid": data["fluid"]}, cache)
+        self.swhe = SWHE({**data["swhe"], "fluid": data["fluid"]}, cache)
+
+        # carry the last converged approach temperature forward as the initial guess for the next call
+        self._warm_start = False
+        self.warm_state = None
+
+        # solver settings: tolerance on the approach temperature, [C], iteration budget,
+        # under-relaxation factor of the SWHE outlet temperature, 0-1, and wall time budget per solve, [s]
+        self.tol = 0.01
+        self.max_iter = 100
+        self.damping = 1.0
+        self.max_time = None
+        self.last_solve = {}
+
+    @property
+    def warm_start(self):
+        return self._warm_start
+
+    @warm_start.setter
+    def warm_start(self, value: bool):
+        """
+        Enable or disable the time-series warm start mode for the system and its SWHE
+        :param value: warm start flag
+        :return: None
+        """
+
+        self._warm_start = value
+        self.swhe.warm_start = value
+        if not value:
+            self.reset()
 
-    def simulate(self, q_zone: Union[int, float], m_dot: Union[int, float], temperature_sw: Union[int, float]):
+    def reset(self):
+        """
+        Clear the warm start state of the system and its SWHE
+        :return: None
+        """
+
+        self.warm_state = None
+        self.swhe.reset()
+
+    def simulate(self, q_zone: Union[int, float], m_dot: Union[int, float], temperature_sw: Union[int, float],
+                 full_output: bool = False):
         """
         Simulate system containing a heat pump and surface water heat exchanger
+        The solve stops unconverged after max_iter iterations or max_time seconds.
         :param q_zone: zone load, [W]
         :param m_dot: mass flow rate through swhe, [kg/s]
-        :param temperature_sw:
-        :return:
+        :param temperature_sw: surface water temperature, [C]
+        :param full_output: return a SystemResult instead of the approach temperature
+        :return: approach temperature, [C], or SystemResult
         """
 
         t_appr = 0
-        t_appr_old = 5
         t_out_swhe = temperature_sw
-        tol = 0.01
+        if self.warm_start and self.warm_state is not None:
+            t_appr = self.warm_state
+            t_out_swhe = temperature_sw + t_appr
+
+        deadline = None if self.max_time is None else perf_counter() + self.max_time
+        damping = self.damping
+        t_out_hp = None
+        swhe_result = None
+        residual = inf
+        converged = False
+        iterations = 0
 
-        while abs(t_appr - t_appr_old) > tol:
-            t_appr_old = t_appr
+        while iterations < self.max_iter:
+            iterations += 1
             t_out_hp = self.hp.simulate(q_zone, m_dot, t_out_swhe)
-            t_out_swhe = self.swhe.simulate(m_dot, t_out_hp, temperature_sw)
-            t_appr = t_out_swhe - temperature_sw
+            t_out_new = self.swhe.simulate(m_dot, t_out_hp, temperature_sw, full_output)
+            if full_output:
+                swhe_result = t_out_new
+                t_out_new = swhe_result.value
+
+            if damping == 1.0:
+                t_out_swhe = t_out_new
+            else:
+                t_out_swhe += damping * (t_out_new - t_out_swhe)
 
+            t_appr_new = t_out_swhe - temperature_sw
+            residual = abs(t_appr_new - t_appr)
+            t_appr = t_appr_new
+            if residual <= self.tol:
+                converged = True
+                break
+            if deadline is not None and perf_counter() > deadline:
+                break
+
+        if self.warm_start:
+            self.warm_state = t_appr if converged else None
+
+        self.last_solve = {"iterations": iterations, "converged": converged, "residual": residual}
+        if full_output:
+            return SystemResult(t_appr, iterations, residual, converged, t_out_hp, swhe_result)
         return t_appr
+
+    def simulate_batch(self, q_zone: Union[int, float, np.ndarray], m_dot: Union[int, float, np.ndarray],
+                       temperature_sw: Union[int, float, np.ndarray], tol: float = None, max_iter: int = None,
+                       pipes: PipeArray = None):
+        """
+        Simulate the system for many operating points at once, e.g. a whole load profile
+        Each point follows the same iteration as simulate, and points drop out of the
+        iteration as their approach temperatures converge. Points still iterating after
+        max_iter iterations or max_time seconds keep their latest approach temperature.
+        The coil solves use the tol and max_iter settings of the SWHE, as in simulate.
+        With pipes given, e.g. a pipe catalog, every point is evaluated for every pipe;
+        the pipes are broadcast against the inputs along the last axis, see SWHE.simulate_batch.
+        :param q_zone: zone loads, [W]
+        :param m_dot: mass flow rates through swhe, [kg/s]
+        :param temperature_sw: surface water temperatures, [C]
+        :param tol: approach temperature convergence tolerance, defaults to tol, [C]
+        :param max_iter: maximum number of iterations, defaults to max_iter
+        :param pipes: swhe pipe geometries to evaluate, optional
+        :return: approach temperatures, broadcast shape of the inputs (and pipes), [C]
+        """
+
+        if tol is None:
+            tol = self.tol
+        if max_iter is None:
+            max_iter = self.max_iter
+
+        inputs = [np.asarray(q_zone, dtype=float), np.asarray(m_dot, dtype=float),
+                  np.asarray(temperature_sw, dtype=float)]
+        if pipes is not None:
+            inputs.append(np.arange(pipes.size))
+        inputs = np.broadcast_arrays(*inputs)
+        shape = inputs[0].shape
+        q_zone, m_dot, temperature_sw = [x.ravel() for x in inputs[:3]]
+        pipe_index = inputs[3].ravel() if pipes is not None else None
+
+        t_appr = np.zeros(q_zone.size)
+        t_out_swhe = temperature_sw.copy()
+        active = np.ones(q_zone.size, dtype=bool)
+        damping = self.damping
+        deadline = None if self.max_time is None else perf_counter() + self.max_time
+
+        for _ in range(max_iter):
+            idx = np.flatnonzero(active)
+            if idx.size == 0:
+                break
+
+            t_out_hp = self.hp.simulate(q_zone[idx], m_dot[idx], t_out_swhe[idx])
+            t_out_new = self.swhe.simulate_batch(m_dot[idx], t_out_hp, temperature_sw[idx],
+                                                 pipes=None if pipes is None else pipes.take(pipe_index[idx]))
+            if damping == 1.0:
+                t_out_swhe[idx] = t_out_new
+            else:
+                t_out_swhe[idx] += damping * (t_out_new - t_out_swhe[idx])
+            t_appr_new = t_out_swhe[idx] - temperature_sw[idx]
+            active[idx] = np.abs(t_appr_new - t_appr[idx]) > tol
+            t_appr[idx] = t_appr_new
+            if deadline is not None and perf_counter() > deadline:
+                break
+
+        return t_appr.reshape(shape)
+
+    def size_pipe_lengths(self, q_zone: Union[int, float], m_dot: Union[int, float],
+                          temperature_sw: Union[int, float], t_appr_targets: Union[list, np.ndarray],
+                          length_low: float = 10.0, length_high: float = 1000.0, length_tol: float = 0.01):
+        """
+        Find the pipe lengths that give a sequence of approach temperature targets
+        The magnitude of the approach temperature decreases monotonically with pipe length, so each
+        length is found with a bracketed root finder, warm-started from the previous target.
+        The pipe length and the warm start settings and states are restored when done.
+        :param q_zone: zone load, [W]
+        :param m_dot: mass flow rate through swhe, [kg/s]
+        :param temperature_sw: surface water temperature, [C]
+        :param t_appr_targets: approach temperature targets, [C]
+        :param length_low: initial lower bound of pipe length, [m]
+        :param length_high: initial upper bound of pipe length, [m]
+        :param length_tol: pipe length convergence tolerance, [m]
+        :return: pipe lengths, [m]
+        """
+
+        pipe = self.swhe.pipe
+        length_orig = pipe.length
+        warm_start_orig = (self.warm_start, self.warm_state, self.swhe.warm_start, self.swhe.warm_state)
+        self.warm_start = True
+
+        def calc_approach(length):
+            pipe.update_pipe(length)
+            return abs(self.simulate(q_zone, m_dot, temperature_sw))
+
+        try:
+            lengths = find_monotonic_roots(calc_approach, [abs(t) for t in t_appr_targets], length_low, length_high,
+                                           length_tol)
+        finally:
+            pipe.update_pipe(length_orig)
+            self.warm_start = warm_start_orig[0]
+            self.warm_state, self.swhe.warm_start, self.swhe.warm_state = warm_start_orig[1:]
+
+        return np.array(lengths)
+
+    def size_pipe_length(self, q_zone: Union[int, float], m_dot: Union[int, float],
+                         temperature_sw: Union[int, float], t_appr_target: Union[int, float], **kwargs):
+        """
+        Find the pipe length that gives an approach temperature target
+        :param q_zone: zone load, [W]
+        :param m_dot: mass flow rate through swhe, [kg/s]
+        :param temperature_sw: surface water temperature, [C]
+        :param t_appr_target: approach temperature target, [C]
+        :param kwargs: bracket and tolerance arguments of size_pipe_lengths
+        :return: pipe length, [m]
+        """
+
+        return float(self.size_pipe_lengths(q_zone, m_dot, temperature_sw, [t_appr_target], **kwargs)[0])
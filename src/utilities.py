@@ -1,11 +1,17 @@
+from bisect import bisect_right
+from itertools import product
 from math import exp
+from typing import Union
 
+import numpy as np
 
-def smoothing_function(x: float, x_min: float, x_max: float, y_min: float, y_max: float) -> float:
+
+def smoothing_function(x: Union[float, np.ndarray], x_min: float, x_max: float, y_min: float,
+                       y_max: float) -> Union[float, np.ndarray]:
     """
     Uses a sigmoid function to smooth based on the argument bounds
     https://en.wikipedia.org/wiki/Sigmoid_function
-    :param x: independent variable
+    :param x: independent variable, scalar or array
     :param x_min: minimum value of x
     :param x_max: maximum value of x
     :param y_min: minimum value of y
@@ -13,6 +19,9 @@ def smoothing_function(x: float, x_min: float, x_max: float, y_min: float, y_max
     :return: smoothed float between y_min and y_max
     """
 
+    if np.ndim(x) > 0:
+        return smoothing_function_array(np.asarray(x, dtype=float), x_min, x_max, y_min, y_max)
+
     if x < x_min:
         return y_min
     elif x > x_max:
@@ -36,3 +45,234 @@ def smoothing_function(x: float, x_min: float, x_max: float, y_min: float, y_max
     y_sig = a / (1 + exp(-x_sig)) - b
 
     return (y_max - y_min) * y_sig + y_min
+
+
+def smoothing_function_array(x: np.ndarray, x_min: float, x_max: float, y_min: float, y_max: float) -> np.ndarray:
+    """
+    Array form of the smoothing function
+    :param x: independent variable
+    :param x_min: minimum value of x
+    :param x_max: maximum value of x
+    :param y_min: minimum value of y
+    :param y_max: maximum value of y
+    :return: smoothed array between y_min and y_max
+    """
+
+    x_normalized = np.clip((x - x_min) / (x_max - x_min), 0.0, 1.0)
+    x_sig = 8.0 * x_normalized + -4.0
+    a = 1.0373140383507
+    b = 0.0186560820737
+    y_sig = a / (1 + np.exp(-x_sig)) - b
+    y = (y_max - y_min) * y_sig + y_min
+
+    # match the scalar function, which returns the bounds exactly outside of [x_min, x_max]
+    y = np.where(x < x_min, y_min, y)
+    return np.where(x > x_max, y_max, y)
+
+
+def find_root_bracketed(f, x_low: float, x_high: float, f_low: float = None, f_high: float = None,
+                        x_tol: float = 1e-3, f_tol: float = 0.0, max_iter: int = 100) -> float:
+    """
+    Find a root of a function within a bracket using the Illinois variant of regula falsi
+    https://en.wikipedia.org/wiki/Regula_falsi#The_Illinois_algorithm
+    :param f: function of one variable
+    :param x_low: lower bracket bound
+    :param x_high: upper bracket bound
+    :param f_low: function value at x_low, optional
+    :param f_high: function value at x_high, optional
+    :param x_tol: step size convergence tolerance
+    :param f_tol: function value convergence tolerance
+    :param max_iter: maximum number of iterations
+    :return: root
+    """
+
+    if f_low is None:
+        f_low = f(x_low)
+    if f_high is None:
+        f_high = f(x_high)
+
+    if f_low == 0:
+        return x_low
+    if f_high == 0:
+        return x_high
+    if f_low * f_high > 0:
+        raise ValueError(f"Root is not bracketed by [{x_low}, {x_high}]")
+
+    x = x_low
+    side = 0
+    for _ in range(max_iter):
+        x_prev = x
+        x = (x_low * f_high - x_high * f_low) / (f_high - f_low)
+        f_x = f(x)
+        if abs(f_x) <= f_tol or abs(x - x_prev) <= x_tol:
+            return x
+
+        if f_x * f_high > 0:
+            x_high, f_high = x, f_x
+            if side == -1:
+                f_low /= 2
+            side = -1
+        else:
+            x_low, f_low = x, f_x
+            if side == 1:
+                f_high /= 2
+            side = 1
+
+    return x
+
+
+def find_monotonic_roots(f, targets, x_low: float, x_high: float, x_tol: float = 1e-3,
+                         max_expand: int = 20) -> list:
+    """
+    Solve f(x) = target for a sequence of targets, where f decreases monotonically with x
+    Each root narrows the bracket for the next target, so sorted targets need fewer evaluations.
+    The initial bracket is expanded if it does not contain the root.
+    :param f: monotonically decreasing function of one variable
+    :param targets: sequence of target function values
+    :param x_low: lower bracket bound, must be positive
+    :param x_high: upper bracket bound
+    :param x_tol: step size convergence tolerance
+    :param max_expand: maximum number of times the bracket is halved or doubled
+    :return: list of roots, in the order of the targets
+    """
+
+    roots = []
+    prev = None
+    for target in targets:
+        low, high = x_low, x_high
+        if prev is not None:
+            x_prev, target_prev = prev
+            if target > target_prev:
+                high = x_prev
+            elif target < target_prev:
+                low = x_prev
+
+        def g(x):
+            return f(x) - target
+
+        g_low = g(low)
+        for _ in range(max_expand):
+            if g_low >= 0:
+                break
+            low /= 2
+            g_low = g(low)
+        else:
+            raise ValueError(f"Target {target} not reached above x = {low}")
+
+        g_high = g(high)
+        for _ in range(max_expand):
+            if g_high <= 0:
+                break
+            high *= 2
+            g_high = g(high)
+        else:
+            raise ValueError(f"Target {target} not reached below x = {high}")
+
+        root = find_root_bracketed(g, low, high, g_low, g_high, x_tol)
+        roots.append(root)
+        prev = (root, target)
+
+    return roots
+
+
+class GridInterpolator(object):
+    def __init__(self, axes: list, values: Union[list, np.ndarray]):
+        """
+        Multilinear interpolation over a rectilinear grid of any dimension
+
+        Coordinates outside of an axis are clamped to its end points, so the table values are held
+        constant beyond the grid. Axes with a single point are allowed and ignore their coordinate.
+
+        :param axes: strictly increasing grid coordinates of each dimension
+        :param values: grid values, shape (len(axes[0]), len(axes[1]), ...)
+        """
+
+        self.axes = [np.asarray(a, dtype=float) for a in axes]
+        self.values = np.asarray(values, dtype=float)
+
+        shape = tuple(a.size for a in self.axes)
+        if self.values.shape != shape:
+            raise ValueError(f"Grid values of shape {self.values.shape} do not match the axes shape {shape}")
+        for a in self.axes:
+            if a.ndim != 1 or a.size == 0 or np.any(np.diff(a) <= 0):
+                raise ValueError("Grid axes must be non-empty and strictly increasing")
+
+        # flat index step to the next grid point of each dimension, 0 for single point axes
+        strides = np.cumprod((1,) + shape[:0:-1])[::-1]
+        self._steps = [int(s) if n > 1 else 0 for s, n in zip(strides, shape)]
+        self._strides = [int(s) for s in strides]
+        self._corners = list(product((0, 1), repeat=len(shape)))
+        self._corner_offsets = [sum(b * s for b, s in zip(c, self._steps)) for c in self._corners]
+
+        # plain Python copies for the scalar path
+        self._axes = [a.tolist() for a in self.axes]
+        self._values = self.values.ravel().tolist()
+        self._flat_values = self.values.ravel()
+
+    def __call__(self, *coords):
+        """
+        Interpolate the grid
+        :param coords: coordinates of each dimension, scalars or arrays that broadcast together
+        :return: interpolated value, float or array of the broadcast shape
+        """
+
+        if len(coords) != len(self.axes):
+            raise ValueError(f"Expected {len(self.axes)} coordinates, got {len(coords)}")
+
+        if all(isinstance(c, (int, float)) or np.ndim(c) == 0 for c in coords):
+            return self._interp_scalar(coords)
+
+        coords = np.broadcast_arrays(*[np.asarray(c, dtype=float) for c in coords])
+        shape = coords[0].shape
+
+        base = np.zeros(coords[0].size, dtype=np.intp)
+        fracs = []
+        for axis, stride, x in zip(self.axes, self._strides, coords):
+            x = x.ravel()
+            if axis.size == 1:
+                fracs.append(np.zeros(x.size))
+                continue
+            lo = np.clip(np.searchsorted(axis, x, side="right") - 1, 0, axis.size - 2)
+            fracs.append(np.clip((x - axis[lo]) / (axis[lo + 1] - axis[lo]), 0.0, 1.0))
+            base += lo * stride
+
+        result = np.zeros(base.size)
+        for corner in self._corners:
+            weight = 1.0
+            offset = 0
+            for bit, frac, step in zip(corner, fracs, self._steps):
+                if bit:
+                    weight = weight * frac
+                    offset += step
+                else:
+                    weight = weight * (1.0 - frac)
+            result += weight * self._flat_values[base + offset]
+
+        return result.reshape(shape)
+
+    def _interp_scalar(self, coords):
+        """
+        Interpolate the grid at one point, without array overhead
+        :param coords: scalar coordinates of each dimension
+        :return: interpolated value
+        """
+
+        base = 0
+        fracs = []
+        for axis, stride, x in zip(self._axes, self._strides, coords):
+            n = len(axis)
+            if n == 1:
+                fracs.append(0.0)
+                continue
+            lo = min(max(bisect_right(axis, x) - 1, 0), n - 2)
+            frac = (x - axis[lo]) / (axis[lo + 1] - axis[lo])
+            fracs.append(min(max(frac, 0.0), 1.0))
+            base += lo * stride
+
+        # corner weights, in the order of the corner offsets with the first dimension varying slowest
+        weights = [1.0]
+        for frac in fracs:
+            weights = [w * f for w in weights for f in (1.0 - frac, frac)]
+
+        values = self._values
+        return sum(w * values[base + o] for w, o in zip(weights, self._corner_offsets))
@@ -0,0 +1,100 @@
+import unittest
+
+import numpy as np
+
+from src.bin_method import bin_profile, binning_error, simulate_binned
+from src.pipe import PipeArray
+from src.system import System
+
+
+class TestBinMethod(unittest.TestCase):
+
+    def setUp(self) -> None:
+        data = {
+            "hp": {
+                "cop": 3.0
+            },
+            "swhe": {
+                "pipe": {
+                    "outer-dia": 0.02667,
+                    "inner-dia": 0.0215392,
+                    "length": 100,
+                    "density": 950,
+                    "conductivity": 0.4
+                },
+                "diameter": 1.2,
+                "horizontal-spacing": 0.05,
+                "vertical-spacing": 0.05,
+            },
+            "fluid": {
+                "fluid-name": "PG",
+                "concentration": 20
+            }
+        }
+
+        self.data = data
+        self.system = System(data)
+
+        hours = np.arange(240)
+        self.q_zone = 1500 * np.sin(2 * np.pi * hours / 24) + 200
+        self.temperature_sw = 15 - 2 * np.cos(2 * np.pi * hours / 240)
+
+    def test_bin_profile(self):
+        bins = bin_profile(self.q_zone, 0.5, self.temperature_sw, (10, 1, 4))
+        self.assertEqual(bins.weights.sum(), self.q_zone.size)
+        self.assertEqual(bins.index.size, self.q_zone.size)
+        self.assertAlmostEqual(np.sum(bins.weights * bins.q_zone), self.q_zone.sum(), delta=1e-6)
+        np.testing.assert_allclose(bins.m_dot, 0.5)
+
+        # heating and cooling timesteps are never mixed
+        for idx in range(bins.weights.size):
+            signs = np.unique(self.q_zone[bins.index == idx] > 0)
+            self.assertEqual(signs.size, 1)
+
+        # repeated inputs collapse to one bin each
+        bins = bin_profile([-1000.0, 1000.0, -1000.0, 1000.0], 0.5, 15, (10, 1, 1))
+        self.assertEqual(bins.weights.tolist(), [2, 2])
+        self.assertEqual(bins.q_zone.tolist(), [-1000.0, 1000.0])
+
+        with self.assertRaises(ValueError):
+            bin_profile(self.q_zone, 0.5, self.temperature_sw, (10, 1))
+        with self.assertRaises(ValueError):
+            bin_profile(self.q_zone, 0.5, self.temperature_sw, (10, 1, [20, 10]))
+
+    def test_simulate_binned(self):
+        q_zone = np.array([-1000.0, 1000.0, -1000.0, 1000.0])
+        res = simulate_binned(self.system, q_zone, 0.5, 15, timestep=1800.0)
+        self.assertEqual(res.bin_t_appr.size, 2)
+        np.testing.assert_allclose(res.t_appr, self.system.simulate_batch(q_zone, 0.5, 15), atol=1e-10)
+        self.assertAlmostEqual(res.totals["heating"], 2 * 1000 * 1800, delta=1e-6)
+        self.assertAlmostEqual(res.totals["cooling"], 2 * 1000 * 1800, delta=1e-6)
+        self.assertAlmostEqual(res.totals["electric"], 4 * 1000 / 3.0 * 1800, delta=1e-6)
+        self.assertAlmostEqual(res.totals["t-appr-mean"], np.mean(res.t_appr), delta=1e-10)
+
+    def test_binning_error(self):
+        res = simulate_binned(self.system, self.q_zone, 0.5, self.temperature_sw, (20, 1, 5))
+        self.assertLess(res.bin_t_appr.size, self.q_zone.size)
+
+        report = binning_error(self.system, self.q_zone, 0.5, self.temperature_sw, res)
+        self.assertEqual(report["timesteps"], self.q_zone.size)
+        self.assertEqual(report["sampled"], self.q_zone.size)
+        self.assertGreater(report["compression"], 1.0)
+        self.assertEqual(report["input-spread"]["m-dot"], 0.0)
+        self.assertLess(report["t-appr-max-error"], 0.5)
+        self.assertLess(report["t-appr-mean-error"], 0.05)
+
+        report = binning_error(self.system, self.q_zone, 0.5, self.temperature_sw, res, sample_size=20)
+        self.assertEqual(report["sampled"], 20)
+
+    def test_simulate_binned_pipes(self):
+        pipes = PipeArray({**self.data["swhe"]["pipe"], "length": [100, 200]})
+        q_zone = np.array([-1000.0, 1000.0, -1000.0])
+        res = simulate_binned(self.system, q_zone, 0.5, 15, pipes=pipes)
+        self.assertEqual(res.t_appr.shape, (3, 2))
+        self.assertEqual(res.totals["t-appr-max"].shape, (2,))
+        np.testing.assert_allclose(res.t_appr[:, 0], self.system.simulate_batch(q_zone, 0.5, 15), atol=1e-10)
+
+        # longer pipes give smaller approach temperatures
+        self.assertLess(res.totals["t-appr-max"][1], res.totals["t-appr-max"][0])
+        with self.assertRaises(ValueError):
+            binning_error(self.system, q_zone, 0.5, 15, res)
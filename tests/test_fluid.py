@@ -1,4 +1,9 @@
+import subprocess
+import sys
 import unittest
+from pathlib import Path
+
+import numpy as np
 
 from src.fluid import Fluid
 
@@ -22,3 +27,110 @@ class TestPipe(unittest.TestCase):
         self.assertAlmostEqual(f.specific_heat(20), 3976.7, delta=0.1)
         self.assertAlmostEqual(f.viscosity(20), 2.0300e-3, delta=1e-6)
         self.assertAlmostEqual(f.prandtl(20), 16.40, delta=1e-2)
+
+    def test_tabulated(self):
+        f = Fluid({"fluid-name": "pg", "concentration": 20})
+        f_tab = Fluid({"fluid-name": "pg", "concentration": 20, "backend": "tabulated"})
+        for t in [2.5, 13.37, 20, 38.9]:
+            self.assertAlmostEqual(f_tab.density(t) / f.density(t), 1.0, delta=1e-5)
+            self.assertAlmostEqual(f_tab.viscosity(t) / f.viscosity(t), 1.0, delta=1e-5)
+            self.assertAlmostEqual(f_tab.prandtl(t) / f.prandtl(t), 1.0, delta=1e-5)
+
+        f_tab_2 = Fluid({"fluid-name": "pg", "concentration": 20, "backend": "tabulated"})
+        self.assertIs(f_tab.engine.get_table("D"), f_tab_2.engine.get_table("D"))
+
+        # invalid states outside of the table are inf
+        f_water = Fluid({"fluid-name": "water", "backend": "tabulated"})
+        values = f_water.density(np.array([-1.0, 5.0]))
+        self.assertEqual(values[0], np.inf)
+        self.assertAlmostEqual(values[1], f_water.density(5.0), delta=1e-9)
+
+    def test_bad_backend(self):
+        with self.assertRaises(ValueError):
+            Fluid({"fluid-name": "water", "backend": "unknown"})
+
+    def test_arrays(self):
+        for backend in ["props-si", "tabulated"]:
+            f = Fluid({"fluid-name": "water", "backend": backend})
+            t = np.array([5.0, 12.5, 20.0, 35.0])
+            for name in ["conductivity", "density", "specific_heat", "viscosity", "viscosity_kinematic",
+                         "prandtl", "beta", "alpha"]:
+                values = getattr(f, name)(t)
+                self.assertEqual(values.shape, t.shape)
+                for idx, temp in enumerate(t):
+                    self.assertAlmostEqual(values[idx] / getattr(f, name)(temp), 1.0, delta=1e-9)
+
+            self.assertEqual(f.density(t.reshape(2, 2)).shape, (2, 2))
+            self.assertEqual(f.density([10, 20]).shape, (2,))
+
+    def test_state(self):
+        f = Fluid({"fluid-name": "water"})
+        state = f.state(20)
+        self.assertAlmostEqual(state.conductivity, f.conductivity(20), delta=1e-12)
+        self.assertAlmostEqual(state.density, f.density(20), delta=1e-12)
+        self.assertAlmostEqual(state.specific_heat, f.specific_heat(20), delta=1e-12)
+        self.assertAlmostEqual(state.viscosity, f.viscosity(20), delta=1e-12)
+        self.assertAlmostEqual(state.prandtl, f.prandtl(20), delta=1e-12)
+        self.assertAlmostEqual(state.beta, f.beta(20), delta=1e-12)
+        self.assertAlmostEqual(state.viscosity_kinematic, f.viscosity_kinematic(20), delta=1e-12)
+        self.assertAlmostEqual(state.alpha, f.alpha(20), delta=1e-12)
+
+        f = Fluid({"fluid-name": "pg", "concentration": 20})
+        state = f.state(np.array([10.0, 20.0]))
+        self.assertIsNone(state.beta)
+        self.assertAlmostEqual(state.prandtl[1], 16.40, delta=1e-2)
+        self.assertAlmostEqual(state.density[0], f.density(10), delta=1e-12)
+
+    def test_abstract_state(self):
+        for data in [{"fluid-name": "water"}, {"fluid-name": "pg", "concentration": 20},
+                     {"fluid-name": "eg", "concentration": 30}, {"fluid-name": "ea", "concentration": 10}]:
+            f = Fluid(data)
+            f_as = Fluid({**data, "backend": "abstract-state"})
+            for t in [5.0, 20.0, 20.0, 33.3]:
+                self.assertEqual(f_as.density(t), f.density(t))
+                self.assertEqual(f_as.viscosity(t), f.viscosity(t))
+                self.assertEqual(f_as.prandtl(t), f.prandtl(t))
+                self.assertEqual(f_as.state(t), f.state(t))
+
+            t = np.array([-50.0, 10.0, 20.0])
+            np.testing.assert_array_equal(f_as.conductivity(t), f.conductivity(t))
+            np.testing.assert_array_equal(f_as.state(t).specific_heat, f.state(t).specific_heat)
+            with self.assertRaises(ValueError):
+                f_as.density(-50.0)
+
+    def test_correlation(self):
+        for data in [{"fluid-name": "water"}, {"fluid-name": "pg", "concentration": 20},
+                     {"fluid-name": "eg", "concentration": 30}, {"fluid-name": "ea", "concentration": 10}]:
+            f = Fluid(data)
+            f_c = Fluid({**data, "backend": "correlation"})
+            for t in [0.5, 5.0, 20.0, 39.5]:
+                self.assertAlmostEqual(f_c.conductivity(t) / f.conductivity(t), 1, delta=1e-4)
+                self.assertAlmostEqual(f_c.density(t) / f.density(t), 1, delta=1e-6)
+                self.assertAlmostEqual(f_c.specific_heat(t) / f.specific_heat(t), 1, delta=1e-5)
+                self.assertAlmostEqual(f_c.viscosity(t) / f.viscosity(t), 1, delta=1e-5)
+                self.assertAlmostEqual(f_c.state(t).prandtl / f.prandtl(t), 1, delta=1e-4)
+
+            t = np.array([-60.0, 10.0, 20.0])
+            np.testing.assert_allclose(f_c.density(t)[1:], f.density(t)[1:], rtol=1e-6)
+            self.assertEqual(f_c.density(t)[0], np.inf)
+            with self.assertRaises(ValueError):
+                f_c.density(101.0)
+
+        # valid down to the freezing point of the mixture
+        f = Fluid({"fluid-name": "pg", "concentration": 20})
+        f_c = Fluid({"fluid-name": "pg", "concentration": 20, "backend": "correlation"})
+        self.assertAlmostEqual(f_c.viscosity(-7.0) / f.viscosity(-7.0), 1, delta=1e-10)
+        self.assertAlmostEqual(f_c.density(90.0) / f.density(90.0), 1, delta=1e-10)
+        with self.assertRaises(ValueError):
+            f_c.density(-7.5)
+
+        f_c = Fluid({"fluid-name": "water", "backend": "correlation"})
+        self.assertAlmostEqual(f_c.beta(20.0), Fluid({"fluid-name": "water"}).beta(20.0), delta=1e-8)
+        self.assertIsNone(Fluid({"fluid-name": "pg", "concentration": 20, "backend": "correlation"}).state(20.0).beta)
+
+    def test_correlation_without_coolprop(self):
+        code = ("import sys; from src.fluid import Fluid; "
+                "f = Fluid({'fluid-name': 'pg', 'concentration': 20, 'backend': 'correlation'}); "
+                "f.state(20.0); f.density(20.0); "
+                "assert 'CoolProp' not in sys.modules")
+        subprocess.run([sys.executable, "-c", code], check=True, cwd=Path(__file__).parents[1])
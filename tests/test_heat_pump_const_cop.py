@@ -1,5 +1,7 @@
 import unittest
 
+import numpy as np
+
 from src.heat_pump import HeatPumpConstCOP
 
 
@@ -21,3 +23,9 @@ class TestSWHE(unittest.TestCase):
 
     def test_simulate_cooling(self):
         self.assertAlmostEqual(self.hp.simulate(-1000, 0.5, 10), 10.67, delta=0.01)
+
+    def test_simulate_array(self):
+        t_out = self.hp.simulate(np.array([1000, -1000, 0]), 0.5, 10)
+        self.assertAlmostEqual(t_out[0], 9.66, delta=0.01)
+        self.assertAlmostEqual(t_out[1], 10.67, delta=0.01)
+        self.assertAlmostEqual(t_out[2], 10.0, delta=1e-10)
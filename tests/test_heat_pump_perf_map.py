@@ -0,0 +1,82 @@
+import csv
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from src.heat_pump import HeatPumpConstCOP, HeatPumpPerfMap, get_heat_pump, read_performance_map
+
+
+class TestHeatPumpPerfMap(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.fluid = {
+            "fluid-name": "PG",
+            "concentration": 20
+        }
+        ewt = [0.0, 10.0, 20.0, 30.0]
+        load = [500.0, 2000.0]
+        flow = [0.25, 1.0]
+
+        # heating COP rises and cooling COP falls with entering temperature
+        self.perf_map = {
+            "entering-temperature": ewt,
+            "load": load,
+            "flow": flow,
+            "heating-cop": [[[3.0 + 0.05 * t + 0.1 * f for f in flow] for _ in load] for t in ewt],
+            "cooling-cop": [[[6.0 - 0.1 * t + 0.1 * f for f in flow] for _ in load] for t in ewt],
+        }
+        self.hp = HeatPumpPerfMap({"performance-map": self.perf_map, "fluid": self.fluid})
+
+    def test_calc_cop(self):
+        self.assertAlmostEqual(self.hp.calc_cop(1000, 0.5, 15), 3.0 + 0.05 * 15 + 0.1 * 0.5, delta=1e-12)
+        self.assertAlmostEqual(self.hp.calc_cop(-1000, 0.5, 15), 6.0 - 0.1 * 15 + 0.1 * 0.5, delta=1e-12)
+
+        # held constant beyond the table
+        self.assertAlmostEqual(self.hp.calc_cop(1000, 0.5, 40), self.hp.calc_cop(1000, 0.5, 30), delta=1e-12)
+
+        cop = self.hp.calc_cop(np.array([1000, -1000, 5000]), 0.5, np.array([5, 15, 25]))
+        for idx, (q, t) in enumerate([(1000, 5), (-1000, 15), (5000, 25)]):
+            self.assertAlmostEqual(cop[idx], self.hp.calc_cop(q, 0.5, t), delta=1e-12)
+
+    def test_simulate(self):
+        hp_const = HeatPumpConstCOP({"cop": 3.0, "fluid": self.fluid})
+        perf_map = {**self.perf_map, "heating-cop": np.full((4, 2, 2), 3.0), "cooling-cop": np.full((4, 2, 2), 3.0)}
+        hp = HeatPumpPerfMap({"performance-map": perf_map, "fluid": self.fluid})
+        self.assertAlmostEqual(hp.simulate(1000, 0.5, 10), hp_const.simulate(1000, 0.5, 10), delta=1e-12)
+        self.assertAlmostEqual(hp.simulate(-1000, 0.5, 10), hp_const.simulate(-1000, 0.5, 10), delta=1e-12)
+
+    def test_simulate_array(self):
+        q_zone = np.array([1000, -1000, 0])
+        t_out = self.hp.simulate(q_zone, 0.5, 10)
+        for idx, q in enumerate(q_zone):
+            self.assertAlmostEqual(t_out[idx], self.hp.simulate(q, 0.5, 10), delta=1e-12)
+        self.assertAlmostEqual(t_out[2], 10.0, delta=1e-10)
+
+    def test_read_performance_map(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "perf_map.csv"
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["load", "entering-temperature", "heating-cop", "cooling-cop"])
+                for load in [2000, 500]:
+                    for ewt in [20, 0, 10]:
+                        writer.writerow([load, ewt, 3.0 + 0.05 * ewt, 6.0 - 0.1 * ewt])
+
+            perf_map = read_performance_map(path)
+            self.assertEqual(perf_map["entering-temperature"], [0.0, 10.0, 20.0])
+            self.assertEqual(perf_map["load"], [500.0, 2000.0])
+            self.assertNotIn("flow", perf_map)
+
+            hp = get_heat_pump({"performance-map": str(path), "fluid": self.fluid})
+            self.assertIsInstance(hp, HeatPumpPerfMap)
+            self.assertAlmostEqual(hp.calc_cop(1000, 0.5, 15), 3.75, delta=1e-12)
+
+            with open(path, "a", newline="") as f:
+                csv.writer(f).writerow([1000, 0, 3.0, 6.0])
+            with self.assertRaises(ValueError):
+                read_performance_map(path)
+
+    def test_get_heat_pump(self):
+        self.assertIsInstance(get_heat_pump({"cop": 3.0, "fluid": self.fluid}), HeatPumpConstCOP)
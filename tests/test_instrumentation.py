@@ -0,0 +1,90 @@
+import json
+import unittest
+
+from src.fluid import Fluid
+from src.instrumentation import Instrumentation
+from src.swhe import SWHE
+from src.system import System
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.data = {
+            "hp": {
+                "cop": 3.0
+            },
+            "swhe": {
+                "pipe": {
+                    "outer-dia": 0.02667,
+                    "inner-dia": 0.0215392,
+                    "length": 100,
+                    "density": 950,
+                    "conductivity": 0.4
+                },
+                "diameter": 1.2,
+                "horizontal-spacing": 0.05,
+                "vertical-spacing": 0.05,
+            },
+            "fluid": {
+                "fluid-name": "PG",
+                "concentration": 20
+            }
+        }
+
+    def test_records(self):
+        system = System(self.data)
+        with Instrumentation() as inst:
+            t_appr = system.simulate(1000, 0.5, 15)
+            system.simulate(-1000, 0.5, 15)
+
+        self.assertEqual(t_appr, System(self.data).simulate(1000, 0.5, 15))
+        d = inst.to_dict()
+        self.assertEqual(d["calls"]["System.simulate"]["count"], 2)
+        self.assertEqual(sum(d["iterations"]["System.simulate"].values()), 2)
+
+        num_swhe = d["calls"]["SWHE.simulate"]["count"]
+        self.assertEqual(d["calls"]["HeatPumpConstCOP.simulate"]["count"], num_swhe)
+        self.assertEqual(sum(int(k) * v for k, v in d["iterations"]["System.simulate"].items()), num_swhe)
+
+        num_coil = d["calls"]["SWHE.calc_coil"]["count"]
+        self.assertEqual(sum(int(k) * v for k, v in d["iterations"]["SWHE.simulate"].items()), num_coil)
+        self.assertEqual(d["calls"]["SWHE.calc_inside_conv_resistance"]["count"], num_coil)
+        self.assertEqual(d["calls"]["Fluid.state"]["count"], 2 * num_coil)
+        self.assertIn("Fluid.eval_property[C]", d["calls"])
+        self.assertGreater(d["calls"]["System.simulate"]["seconds"], d["calls"]["SWHE.calc_coil"]["seconds"])
+
+        self.assertEqual(json.loads(inst.to_json()), d)
+
+    def test_compile(self):
+        system = System(self.data)
+        with Instrumentation() as inst:
+            system.simulate(1000, 0.5, 15)
+            system.swhe.include_inside_fouling = True
+            system.simulate(1000, 0.5, 15)
+            system.swhe.pipe.update_pipe(200)
+            system.simulate(1000, 0.5, 15)
+
+        d = inst.to_dict()
+        num_compile = d["calls"]["SWHE.compile"]["count"]
+        self.assertEqual(num_compile, 2)
+        # once per compile, and once in Pipe.update_pipe
+        self.assertEqual(d["calls"]["Pipe.calc_cond_resistance"]["count"], num_compile + 1)
+        self.assertEqual(d["calls"]["SWHE.calc_inside_fouling_resistance"]["count"], num_compile)
+        self.assertEqual(d["calls"]["SWHE.calc_outside_fouling_resistance"]["count"], num_compile)
+
+    def test_disabled(self):
+        simulate = SWHE.simulate
+        density = Fluid.density
+        with Instrumentation():
+            self.assertIsNot(SWHE.simulate, simulate)
+            with self.assertRaises(RuntimeError):
+                with Instrumentation():
+                    pass
+        self.assertIs(SWHE.simulate, simulate)
+        self.assertIs(Fluid.density, density)
+
+        with self.assertRaises(ValueError):
+            with Instrumentation():
+                Fluid({"fluid-name": "water"}).density(-50.0)
+        self.assertIs(Fluid.density, density)
@@ -1,6 +1,8 @@
 import unittest
 
-from src.pipe import Pipe
+import numpy as np
+
+from src.pipe import Pipe, PipeArray
 
 
 class TestPipe(unittest.TestCase):
@@ -38,3 +40,43 @@ class TestPipe(unittest.TestCase):
 
     def test_cond_resistance(self):
         self.assertAlmostEqual(self.pipe.calc_cond_resistance(), 8.5014e-4, delta=1e-4)
+
+
+class TestPipeArray(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.data = {
+            "outer-dia": [0.02667, 0.0334, 0.0422],
+            "inner-dia": [0.0215392, 0.0269744, 0.0340868],
+            "length": 100,
+            "density": 950,
+            "conductivity": 0.4
+        }
+        self.pipes = PipeArray(self.data)
+
+    def test_bad_init(self):
+        with self.assertRaises(ValueError):
+            PipeArray({**self.data, "inner-dia": [0.0215392, 0.04, 0.0340868]})
+
+    def test_matches_pipe(self):
+        self.assertEqual(len(self.pipes), 3)
+        for idx in range(3):
+            pipe = Pipe({**self.data, "outer-dia": self.data["outer-dia"][idx],
+                         "inner-dia": self.data["inner-dia"][idx]})
+            self.assertAlmostEqual(self.pipes.area_cr_inner[idx], pipe.area_cr_inner, delta=1e-15)
+            self.assertAlmostEqual(self.pipes.area_surf_outer[idx], pipe.area_surf_outer, delta=1e-12)
+            self.assertAlmostEqual(self.pipes.resist_cond[idx], pipe.resist_cond, delta=1e-15)
+
+    def test_update_pipe(self):
+        revision = self.pipes.revision
+        r_cond = self.pipes.resist_cond.copy()
+        self.pipes.update_pipe([50, 100, 200])
+        self.assertGreater(self.pipes.revision, revision)
+        np.testing.assert_allclose(self.pipes.resist_cond, r_cond * [2, 1, 0.5], rtol=1e-12)
+
+    def test_from_pipes_take(self):
+        pipes = PipeArray.from_pipes([Pipe({**self.data, "outer-dia": o, "inner-dia": i})
+                                      for o, i in zip(self.data["outer-dia"], self.data["inner-dia"])])
+        np.testing.assert_array_equal(pipes.resist_cond, self.pipes.resist_cond)
+        subset = self.pipes.take([2, 0])
+        np.testing.assert_array_equal(subset.outer_dia, [0.0422, 0.02667])
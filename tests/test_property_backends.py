@@ -0,0 +1,59 @@
+import unittest
+
+import numpy as np
+
+from src.fluid import Fluid
+from src.property_backends import BACKENDS, PropertyBackend, get_backend, register_backend, split_fluid_str
+
+
+class ConstantBackend(PropertyBackend):
+    values = {"CONDUCTIVITY": 0.6, "D": 1000.0, "C": 4200.0, "VISCOSITY": 1e-3, "PRANDTL": 7.0,
+              "ISOBARIC_EXPANSION_COEFFICIENT": 2e-4}
+
+    def eval_property(self, key, temperature):
+        if isinstance(temperature, np.ndarray):
+            return np.full(temperature.shape, self.values[key])
+        return self.values[key]
+
+
+class TestPropertyBackends(unittest.TestCase):
+
+    def tearDown(self) -> None:
+        BACKENDS.pop("constant", None)
+
+    def test_split_fluid_str(self):
+        self.assertEqual(split_fluid_str("WATER"), ("HEOS", "WATER", None))
+        self.assertEqual(split_fluid_str("INCOMP::MPG[0.200]"), ("INCOMP", "MPG", 0.2))
+        self.assertEqual(split_fluid_str("INCOMP::MEG"), ("INCOMP", "MEG", None))
+
+    def test_builtin_backends(self):
+        t = np.array([[5.0, 10.0], [20.0, 30.0]])
+        f = Fluid({"fluid-name": "eg", "concentration": 30})
+        for name in ["abstract-state", "tabulated", "correlation"]:
+            f_b = Fluid({"fluid-name": "eg", "concentration": 30, "backend": name})
+            self.assertIsInstance(f_b.engine, BACKENDS[name])
+            self.assertAlmostEqual(f_b.density(15.0) / f.density(15.0), 1, delta=1e-5)
+            np.testing.assert_allclose(f_b.viscosity(t), f.viscosity(t), rtol=1e-5)
+            np.testing.assert_allclose(f_b.state(t).prandtl, f.state(t).prandtl, rtol=1e-5)
+
+    def test_invalid_states(self):
+        for name in ["props-si", "abstract-state", "tabulated"]:
+            f = Fluid({"fluid-name": "water", "backend": name})
+            self.assertEqual(f.state(np.array([-1.0])).density[0], np.inf)
+            np.testing.assert_array_equal(f.viscosity(np.array([-1.0, -2.0])), np.inf)
+            self.assertEqual(f.density(np.array([-1.0, 5.0]))[0], np.inf)
+            with self.assertRaises(ValueError):
+                f.density(-1.0)
+
+    def test_register_backend(self):
+        register_backend("Constant", ConstantBackend)
+        f = Fluid({"fluid-name": "water", "backend": "constant"})
+        self.assertEqual(f.density(20.0), 1000.0)
+        self.assertEqual(f.state(20.0).beta, 2e-4)
+        np.testing.assert_array_equal(f.state(np.array([[1.0, 2.0]])).prandtl, [[7.0, 7.0]])
+        self.assertAlmostEqual(f.alpha(20.0), 0.6 / (1000.0 * 4200.0))
+
+        with self.assertRaises(TypeError):
+            register_backend("bad", object)
+        with self.assertRaises(ValueError):
+            get_backend("missing", "WATER")
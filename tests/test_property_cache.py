@@ -0,0 +1,59 @@
+import unittest
+
+from src.fluid import Fluid
+from src.property_cache import PropertyCache
+
+
+class TestPropertyCache(unittest.TestCase):
+
+    def test_hits_misses(self):
+        cache = PropertyCache(max_size=10, resolution=1e-4)
+        calls = []
+
+        def func(t):
+            calls.append(t)
+            return 2 * t
+
+        self.assertAlmostEqual(cache.get("D", 20.00001, "WATER", func), 40.0, delta=1e-10)
+        self.assertAlmostEqual(cache.get("D", 19.99999, "WATER", func), 40.0, delta=1e-10)
+        cache.get("D", 20.0, "INCOMP::MPG[0.200]", func)
+        cache.get("C", 20.0, "WATER", func)
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 3)
+
+    def test_eviction(self):
+        cache = PropertyCache(max_size=2)
+        cache.get("D", 1, "WATER", float)
+        cache.get("D", 2, "WATER", float)
+        cache.get("D", 1, "WATER", float)
+        cache.get("D", 3, "WATER", float)
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.assertEqual(cache.stats()["size"], 2)
+
+        # 2 was least recently used, so it was evicted
+        cache.get("D", 1, "WATER", float)
+        self.assertEqual(cache.stats()["hits"], 2)
+        cache.get("D", 2, "WATER", float)
+        self.assertEqual(cache.stats()["misses"], 4)
+
+        cache.clear()
+        self.assertEqual(cache.stats()["size"], 0)
+
+    def test_bad_size(self):
+        with self.assertRaises(ValueError):
+            PropertyCache(max_size=0)
+
+    def test_shared_fluids(self):
+        cache = PropertyCache()
+        f_1 = Fluid({"fluid-name": "pg", "concentration": 20}, cache)
+        f_2 = Fluid({"fluid-name": "pg", "concentration": 20}, cache)
+        self.assertAlmostEqual(f_1.density(20), 1014.7, delta=0.1)
+        self.assertAlmostEqual(f_2.density(20), 1014.7, delta=0.1)
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+        # fluids on different backends are cached separately
+        f_3 = Fluid({"fluid-name": "pg", "concentration": 20, "backend": "correlation"}, cache)
+        self.assertEqual(f_3.density(20), f_3.eval_property("D", 20.0))
+        self.assertEqual(cache.stats()["misses"], 2)
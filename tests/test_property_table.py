@@ -0,0 +1,51 @@
+import unittest
+
+import numpy as np
+
+from src.property_table import PropertyTable
+
+
+class TestPropertyTable(unittest.TestCase):
+
+    def setUp(self) -> None:
+        def func(t):
+            t = np.asarray(t, dtype=float)
+            return np.where(t >= 0, np.exp(t / 20.0), np.inf)
+
+        self.func = func
+        self.table = PropertyTable(func, t_min=-5, t_max=40, tolerance=1e-6)
+
+    def test_range(self):
+        self.assertAlmostEqual(self.table.t_min, 0.0, delta=1.0)
+        self.assertEqual(self.table.t_max, 40.0)
+
+    def test_error_bound(self):
+        self.assertLessEqual(self.table.max_error, 1e-6)
+        t = np.linspace(self.table.t_min, self.table.t_max, 1001)
+        err = np.abs(self.table(t) - self.func(t)) / self.func(t)
+        self.assertLessEqual(np.max(err), 1e-6)
+
+    def test_scalar(self):
+        self.assertAlmostEqual(self.table(12.34), np.exp(12.34 / 20.0), delta=1e-5)
+
+    def test_fallback(self):
+        self.assertAlmostEqual(self.table(50), np.exp(2.5), delta=1e-10)
+        with self.assertRaises(ValueError):
+            self.table(-10)
+
+    def test_fallback_array(self):
+        result = self.table(np.array([-10.0, 10.0, 50.0]))
+        self.assertEqual(result[0], np.inf)
+        np.testing.assert_allclose(result[1:], np.exp([0.5, 2.5]), rtol=1e-6)
+
+        def func(t):
+            # raises when no state is valid, like CoolProp
+            t = np.asarray(t, dtype=float)
+            if np.all(t < 0):
+                raise ValueError("No outputs were able to be calculated")
+            return self.func(t)
+
+        table = PropertyTable(func, t_min=-5, t_max=40, tolerance=1e-6)
+        result = table(np.array([-10.0, -1.0, 5.0]))
+        self.assertTrue(np.all(np.isinf(result[:2])))
+        self.assertAlmostEqual(result[2], np.exp(0.25), delta=1e-5)
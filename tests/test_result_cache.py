@@ -0,0 +1,96 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+import src.result_cache
+from src.result_cache import ResultCache
+
+
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache = ResultCache(self.tmp_dir.name)
+        self.config = {"hp": {"cop": 3.0}, "swhe": {"pipe": {"length": 100}}}
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_make_key(self):
+        inputs = {"q_zone": np.array([-1000.0, 1000.0]), "m_dot": 0.5}
+        key = self.cache.make_key("system", self.config, inputs)
+        self.assertEqual(key, self.cache.make_key("system", {"swhe": {"pipe": {"length": 100}}, "hp": {"cop": 3.0}},
+                                                  {"m_dot": 0.5, "q_zone": [-1000, 1000]}))
+        self.assertNotEqual(key, self.cache.make_key("swhe", self.config, inputs))
+        self.assertNotEqual(key, self.cache.make_key("system", {**self.config, "hp": {"cop": 3.5}}, inputs))
+        self.assertNotEqual(key, self.cache.make_key("system", self.config, {**inputs, "m_dot": 0.25}))
+        self.assertNotEqual(key, self.cache.make_key("system", self.config,
+                                                     {**inputs, "q_zone": np.array([[-1000.0], [1000.0]])}))
+        with mock.patch.object(src.result_cache, "VERSION", "0.0"):
+            self.assertNotEqual(key, self.cache.make_key("system", self.config, inputs))
+
+    def test_make_key_files(self):
+        path = os.path.join(self.tmp_dir.name, "map.csv")
+        with open(path, "w") as f:
+            f.write("entering-temperature,load,heating-cop,cooling-cop\n0,1000,3.0,5.0\n")
+        config = {"hp": {"performance-map": path}}
+        key = self.cache.make_key("system", config)
+        self.assertEqual(key, self.cache.make_key("system", {"hp": {"performance-map": Path(path)}}))
+        self.assertNotEqual(key, self.cache.make_key("system", {"hp": {"cop": path}}))
+
+        with open(path, "a") as f:
+            f.write("10,1000,3.5,4.5\n")
+        self.assertNotEqual(key, self.cache.make_key("system", config))
+        self.assertEqual(self.cache.make_key("sweep", {"axes": {"hp.performance-map": [path]}}),
+                         self.cache.make_key("sweep", {"axes": {"hp.performance-map": [Path(path)]}}))
+
+    def test_get_or_compute(self):
+        calls = []
+
+        def func():
+            calls.append(1)
+            return np.arange(6.0).reshape(2, 3)
+
+        key = self.cache.make_key("system", self.config)
+        self.assertIsNone(self.cache.get(key))
+        first = self.cache.get_or_compute(key, func)
+        second = self.cache.get_or_compute(key, func)
+        np.testing.assert_array_equal(first, second)
+        self.assertEqual(second.shape, (2, 3))
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(self.cache.stats()["hits"], 1)
+
+        # survives across instances
+        self.assertIsNotNone(ResultCache(self.tmp_dir.name).get(key))
+
+        # corrupt files are misses
+        with open(os.path.join(self.tmp_dir.name, f"{key}.npz"), "wb") as f:
+            f.write(b"not a zip file")
+        self.assertIsNone(self.cache.get(key))
+
+    def test_eviction(self):
+        value = np.random.RandomState(0).rand(1000)
+        self.cache.put("a", value)
+        size = self.cache.stats()["size"]
+
+        cache = ResultCache(self.tmp_dir.name, max_size=int(2.5 * size))
+        cache.put("b", value)
+        os.utime(os.path.join(self.tmp_dir.name, "a.npz"), (1, 1))
+        os.utime(os.path.join(self.tmp_dir.name, "b.npz"), (2, 2))
+
+        # a was least recently used, so it is evicted
+        cache.put("c", value)
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.assertIsNone(cache.get("a"))
+        self.assertIsNotNone(cache.get("b"))
+
+        cache.clear()
+        self.assertEqual(cache.stats()["files"], 0)
+
+    def test_bad_size(self):
+        with self.assertRaises(ValueError):
+            ResultCache(self.tmp_dir.name, max_size=0)
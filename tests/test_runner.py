@@ -0,0 +1,74 @@
+import csv
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.runner import read_profile, run_profile, simulate_profile
+from src.system import System
+
+
+class TestRunner(unittest.TestCase):
+
+    def setUp(self) -> None:
+        data = {
+            "hp": {
+                "cop": 3.0
+            },
+            "swhe": {
+                "pipe": {
+                    "outer-dia": 0.02667,
+                    "inner-dia": 0.0215392,
+                    "length": 100,
+                    "density": 950,
+                    "conductivity": 0.4
+                },
+                "diameter": 1.2,
+                "horizontal-spacing": 0.05,
+                "vertical-spacing": 0.05,
+            },
+            "fluid": {
+                "fluid-name": "PG",
+                "concentration": 20
+            }
+        }
+
+        self.system = System(data)
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.input_path = Path(self.tmp_dir.name) / "profile.csv"
+        with open(self.input_path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["time", "q-zone", "m-dot", "temperature-sw"])
+            for hour in range(5):
+                writer.writerow([hour, -1000.0 if hour % 2 else 1000.0, 0.5, 15])
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_read_profile(self):
+        rows = list(read_profile(self.input_path))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[1]["time"], "1")
+        self.assertEqual(rows[1]["q-zone"], -1000.0)
+
+        with self.assertRaises(ValueError):
+            list(read_profile(self.input_path, columns=("load", "m-dot", "temperature-sw")))
+
+    def test_simulate_profile(self):
+        batched = list(simulate_profile(self.system, read_profile(self.input_path), batch_size=2))
+        single = list(simulate_profile(self.system, read_profile(self.input_path), batch_size=1))
+        self.assertEqual(len(batched), 5)
+        self.assertAlmostEqual(batched[0]["t-appr"], -1.27, delta=0.01)
+        self.assertAlmostEqual(batched[1]["t-appr"], 2.00, delta=0.01)
+        for row_a, row_b in zip(batched, single):
+            self.assertAlmostEqual(row_a["t-appr"], row_b["t-appr"], delta=1e-10)
+
+    def test_run_profile(self):
+        output_path = Path(self.tmp_dir.name) / "results.csv"
+        stats = run_profile(self.system, self.input_path, output_path, batch_size=3)
+        self.assertEqual(stats["rows"], 5)
+        self.assertGreater(stats["rows-per-second"], 0)
+
+        with open(output_path, newline="") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(len(rows), 5)
+        self.assertAlmostEqual(float(rows[3]["t-appr"]), 2.00, delta=0.01)
@@ -0,0 +1,131 @@
+import csv
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from src.result_cache import ResultCache
+from src.sweep import calc_chunk_size, set_config_value, simulate, sweep
+from src.system import System
+
+
+class TestSweep(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.data = {
+            "hp": {
+                "cop": 3.0
+            },
+            "swhe": {
+                "pipe": {
+                    "outer-dia": 0.02667,
+                    "inner-dia": 0.0215392,
+                    "length": 100,
+                    "density": 950,
+                    "conductivity": 0.4
+                },
+                "diameter": 1.2,
+                "horizontal-spacing": 0.05,
+                "vertical-spacing": 0.05,
+            },
+            "fluid": {
+                "fluid-name": "PG",
+                "concentration": 20
+            }
+        }
+
+    def test_set_config_value(self):
+        set_config_value(self.data, "swhe.pipe.length", 200)
+        self.assertEqual(self.data["swhe"]["pipe"]["length"], 200)
+        with self.assertRaises(KeyError):
+            set_config_value(self.data, "swhe.pipe.lenght", 200)
+
+    def test_calc_chunk_size(self):
+        self.assertEqual(calc_chunk_size(1000, 1, processes=1), 1024)
+        self.assertEqual(calc_chunk_size(1000, 1, processes=4), 63)
+        self.assertEqual(calc_chunk_size(1000, 2, processes=4), 125)
+        self.assertEqual(calc_chunk_size(20, 1, processes=4), 16)
+        self.assertEqual(calc_chunk_size(5000, 100, processes=4), 1024)
+        self.assertEqual(calc_chunk_size(1000, 1, processes=4, chunk_size=10), 10)
+        self.assertGreater(calc_chunk_size(1000, 1, processes=None), 0)
+
+    def test_sweep(self):
+        axes = {
+            "q_zone": [-1000.0, 1000.0],
+            "hp.cop": [3.0, 4.0],
+            "swhe.pipe.length": [100, 150, 200],
+        }
+        res = sweep(self.data, axes, inputs={"m_dot": 0.5, "temperature_sw": 15}, processes=1, chunk_size=1)
+        self.assertEqual(res.shape, (2, 2, 3))
+        self.assertAlmostEqual(res[0, 0, 0], 2.00, delta=0.01)
+        self.assertAlmostEqual(res[1, 0, 0], -1.27, delta=0.01)
+
+        self.data["hp"]["cop"] = 4.0
+        self.data["swhe"]["pipe"]["length"] = 150
+        self.assertAlmostEqual(res[0, 1, 1], System(self.data).simulate(-1000.0, 0.5, 15), delta=1e-10)
+
+        res_pool = sweep(self.data, axes, inputs={"m_dot": 0.5, "temperature_sw": 15}, processes=2)
+        self.assertAlmostEqual(abs(res_pool - res).max(), 0.0, delta=1e-10)
+
+    def test_sweep_swhe(self):
+        swhe_data = {**self.data["swhe"], "fluid": self.data["fluid"]}
+        res = sweep(swhe_data, {"m_dot": [1.0], "inlet_temperature": [20, 10]}, inputs={"water_temp": 15},
+                    model="swhe", processes=1)
+        self.assertEqual(res.shape, (1, 2))
+        self.assertAlmostEqual(res[0, 0], 19.26, delta=0.01)
+        self.assertAlmostEqual(res[0, 1], 10.55, delta=0.01)
+
+    def test_sweep_cache(self):
+        axes = {"q_zone": [-1000.0, 1000.0], "hp.cop": [3.0, 4.0]}
+        inputs = {"m_dot": 0.5, "temperature_sw": 15}
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = ResultCache(tmp_dir)
+            res = sweep(self.data, axes, inputs=inputs, processes=1, cache=cache)
+            with mock.patch("src.sweep.run_task") as run_task:
+                res_cached = sweep(self.data, axes, inputs=inputs, processes=1, cache=cache)
+                run_task.assert_not_called()
+            self.assertAlmostEqual(abs(res_cached - res).max(), 0.0, delta=1e-12)
+            self.assertEqual(cache.stats()["hits"], 1)
+
+            # reordered axes give transposed results, so they miss the cache
+            reordered = {"hp.cop": axes["hp.cop"], "q_zone": axes["q_zone"]}
+            res_reordered = sweep(self.data, reordered, inputs=inputs, processes=1, cache=cache)
+            self.assertEqual(cache.stats()["hits"], 1)
+            self.assertAlmostEqual(abs(res_reordered - res.T).max(), 0.0, delta=1e-12)
+
+            t_appr = simulate(self.data, {"q_zone": [-1000.0, 1000.0], **inputs}, cache=cache)
+            with mock.patch("src.sweep.get_model") as get_model:
+                t_appr_cached = simulate(self.data, {"q_zone": [-1000.0, 1000.0], **inputs}, cache=cache)
+                get_model.assert_not_called()
+            self.assertAlmostEqual(abs(t_appr_cached - t_appr).max(), 0.0, delta=1e-12)
+            self.assertAlmostEqual(t_appr[0], res[0, 0], delta=1e-10)
+
+    def test_simulate_perf_map_path(self):
+        def write_map(path, heating_cop):
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["entering-temperature", "load", "heating-cop", "cooling-cop"])
+                for ewt in [0, 20]:
+                    for load in [500, 2000]:
+                        writer.writerow([ewt, load, heating_cop, 5.0])
+
+        inputs = {"q_zone": 1000.0, "m_dot": 0.5, "temperature_sw": 15}
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "perf_map.csv"
+            write_map(path, 3.0)
+            config = {**self.data, "hp": {"performance-map": path}}
+            t_appr = simulate(config, inputs)
+
+            # the model is rebuilt, and the cached result invalidated, when the map changes
+            cache = ResultCache(tmp_dir)
+            self.assertEqual(simulate(config, inputs, cache=cache), t_appr)
+            write_map(path, 2.0)
+            t_appr_edited = simulate(config, inputs)
+            self.assertNotEqual(t_appr_edited, t_appr)
+            self.assertEqual(simulate(config, inputs, cache=cache), t_appr_edited)
+
+    def test_bad_sweep(self):
+        with self.assertRaises(ValueError):
+            sweep(self.data, {"q_zone": [1000.0]}, inputs={"m_dot": 0.5}, processes=1)
+        with self.assertRaises(ValueError):
+            sweep(self.data, {"q_zone": [1000.0]}, model="hp", processes=1)
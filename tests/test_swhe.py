@@ -1,12 +1,16 @@
 import unittest
+from unittest import mock
 
+import numpy as np
+
+from src.pipe import Pipe, PipeArray
 from src.swhe import SWHE
 
 
 class TestSWHE(unittest.TestCase):
 
     def setUp(self) -> None:
-        data = {
+        self.data = data = {
             "pipe": {
                 "outer-dia": 0.02667,
                 "inner-dia": 0.0215392,
@@ -54,3 +58,224 @@ class TestSWHE(unittest.TestCase):
 
         outlet_temp = self.swhe.simulate(1, 10, 15)
         self.assertAlmostEqual(outlet_temp, 10.55, delta=0.01)
+
+    def test_calc_inside_conv_resistance_array(self):
+        m_dot = np.array([0.01, 0.1, 0.14, 1])
+        r = self.swhe.calc_inside_conv_resistance(m_dot, 20)
+        for idx, m in enumerate(m_dot):
+            self.assertAlmostEqual(r[idx], self.swhe.calc_inside_conv_resistance(m, 20), delta=1e-12)
+
+    def test_simulate_batch(self):
+        outlet_temps = self.swhe.simulate_batch([1, 1, 0.1], [20, 10, 30], 15)
+        self.assertEqual(outlet_temps.shape, (3,))
+        self.assertAlmostEqual(outlet_temps[0], 19.26, delta=0.01)
+        self.assertAlmostEqual(outlet_temps[1], 10.55, delta=0.01)
+        self.assertAlmostEqual(outlet_temps[2], self.swhe.simulate(0.1, 30, 15), delta=1e-10)
+
+        outlet_temps = self.swhe.simulate_batch(np.array([[0.5], [1.0]]), np.array([5, 25]), 15)
+        self.assertEqual(outlet_temps.shape, (2, 2))
+        self.assertAlmostEqual(outlet_temps[1, 1], self.swhe.simulate(1.0, 25, 15), delta=1e-10)
+
+    def test_simulate_batch_pipes(self):
+        pipes = PipeArray({
+            "outer-dia": [0.02667, 0.0334, 0.02667],
+            "inner-dia": [0.0215392, 0.0269744, 0.0215392],
+            "length": [100, 100, 300],
+            "density": 950,
+            "conductivity": 0.4
+        })
+        outlet_temps = self.swhe.simulate_batch(np.array([[0.5], [1.0]]), 25, 15, pipes=pipes)
+        self.assertEqual(outlet_temps.shape, (2, 3))
+        for idx in range(pipes.size):
+            self.swhe.pipe.outer_dia = pipes.outer_dia[idx]
+            self.swhe.pipe.inner_dia = pipes.inner_dia[idx]
+            self.swhe.pipe.update_pipe(pipes.length[idx])
+            for row, m_dot in enumerate([0.5, 1.0]):
+                self.assertAlmostEqual(outlet_temps[row, idx], self.swhe.simulate(m_dot, 25, 15), delta=1e-10)
+
+    def test_simulate_segmented(self):
+        self.swhe.tol = 1e-8
+        self.assertAlmostEqual(self.swhe.simulate_segmented(0.3, 35, 10, 1), self.swhe.simulate(0.3, 35, 10),
+                               delta=1e-6)
+
+        # refining the segments converges
+        outlet = [self.swhe.simulate_segmented(0.3, 35, 10, n) for n in (5, 20, 80)]
+        self.assertTrue(self.swhe.last_solve["converged"])
+        self.assertLess(abs(outlet[2] - outlet[1]), abs(outlet[1] - outlet[0]))
+
+        res = self.swhe.simulate_segmented(np.array([[0.3], [1.0]]), [35, 2], 10, 20, full_output=True)
+        self.assertEqual(res.value.shape, (2, 2))
+        self.assertEqual(res.temperatures.shape, (2, 2, 21))
+        self.assertAlmostEqual(res.value[0, 0], outlet[1], delta=1e-6)
+        self.assertAlmostEqual(res.value[1, 1], self.swhe.simulate_segmented(1.0, 2, 10, 20), delta=1e-6)
+
+        # brine temperatures approach the water temperature monotonically
+        self.assertTrue(np.all(np.diff(res.temperatures[0, 0]) < 0))
+        self.assertTrue(np.all(np.diff(res.temperatures[0, 1]) > 0))
+        np.testing.assert_allclose(res.q_coil, np.sum(res.q_segments, axis=-1))
+
+        with self.assertRaises(ValueError):
+            self.swhe.simulate_segmented(0.3, 35, 10, 0)
+
+    def test_simulate_secant(self):
+        self.swhe.solver = "secant"
+        self.swhe.tol = 1e-6
+        outlet_temp = self.swhe.simulate(1, 20, 15)
+        self.assertAlmostEqual(outlet_temp, 19.26, delta=0.01)
+        self.assertTrue(self.swhe.last_solve["converged"])
+        self.assertGreater(self.swhe.last_solve["property-calls"], 0)
+
+        self.swhe.solver = "fixed-point"
+        self.assertAlmostEqual(self.swhe.simulate(1, 20, 15), outlet_temp, delta=1e-5)
+
+    def test_simulate_secant_iterations(self):
+        self.swhe.tol = 1e-6
+        for damping in (1.0, 0.5):
+            self.swhe.damping = damping
+            iterations = {}
+            for solver in ("fixed-point", "secant"):
+                self.swhe.solver = solver
+                iterations[solver] = 0
+                for args in ((1, 20, 15), (0.3, 35, 10), (0.5, 2, 10), (2, 30, 25)):
+                    self.swhe.simulate(*args)
+                    self.assertTrue(self.swhe.last_solve["converged"])
+                    iterations[solver] += self.swhe.last_solve["iterations"]
+            self.assertLess(iterations["secant"], iterations["fixed-point"])
+
+    def test_simulate_secant_divergence(self):
+        self.swhe.solver = "secant"
+        self.swhe.tol = 1e-6
+        outlet_temp = self.swhe.simulate(1, 20, 15)
+        self.assertEqual(self.swhe.last_solve["solver"], "secant")
+
+        # a pass with a growing residual hands off to successive substitution
+        calc_coil = self.swhe.calc_coil
+        calls = []
+
+        def perturbed_calc_coil(*args):
+            calls.append(args)
+            outlet, mean, q = calc_coil(*args)
+            return (outlet + 5.0 if len(calls) == 3 else outlet), mean, q
+
+        with mock.patch.object(self.swhe, "calc_coil", side_effect=perturbed_calc_coil):
+            self.assertAlmostEqual(self.swhe.simulate(1, 20, 15), outlet_temp, delta=1e-5)
+        self.assertEqual(self.swhe.last_solve["solver"], "fixed-point")
+        self.assertTrue(self.swhe.last_solve["converged"])
+        self.assertEqual(self.swhe.last_solve["iterations"], len(calls))
+
+    def test_simulate_telemetry(self):
+        self.swhe.max_iter = 1
+        self.swhe.simulate(1, 20, 15)
+        self.assertEqual(self.swhe.last_solve["iterations"], 1)
+        self.assertFalse(self.swhe.last_solve["converged"])
+        self.assertEqual(self.swhe.last_solve["solver"], "fixed-point")
+
+        self.swhe.solver = "newton"
+        with self.assertRaises(ValueError):
+            self.swhe.simulate(1, 20, 15)
+
+    def test_simulate_full_output(self):
+        result = self.swhe.simulate(1, 20, 15, full_output=True)
+        self.assertEqual(result.value, self.swhe.simulate(1, 20, 15))
+        self.assertTrue(result.converged)
+        self.assertLessEqual(result.residual, self.swhe.tol)
+        self.assertEqual(result.iterations, self.swhe.last_solve["iterations"])
+        self.assertAlmostEqual(1 / result.ua, sum(result.resistances.values()), delta=1e-12)
+        self.assertAlmostEqual(result.effectiveness, 1 - np.exp(-result.ntu), delta=1e-12)
+        self.assertGreater(result.q_coil, 0)
+        self.assertEqual(result.resistances["inside-fouling"], 0.0)
+
+    def test_simulate_budgets(self):
+        outlet_temp = self.swhe.simulate(1, 20, 15)
+        iterations = self.swhe.last_solve["iterations"]
+
+        self.swhe.damping = 0.5
+        self.assertAlmostEqual(self.swhe.simulate(1, 20, 15), outlet_temp, delta=0.05)
+        self.assertGreater(self.swhe.last_solve["iterations"], iterations)
+        np.testing.assert_allclose(self.swhe.simulate_batch(1, 20, 15), outlet_temp, atol=0.05)
+
+        self.swhe.damping = 1.0
+        self.swhe.max_time = 0.0
+        result = self.swhe.simulate(1, 20, 15, full_output=True)
+        self.assertEqual(result.iterations, 1)
+        self.assertFalse(result.converged)
+        self.assertGreater(result.residual, self.swhe.tol)
+
+        self.swhe.solver = "secant"
+        self.assertFalse(self.swhe.simulate(1, 20, 15, full_output=True).converged)
+
+    def test_simulate_warm_start(self):
+        self.swhe.simulate(1, 20, 15)
+        cold_iterations = self.swhe.last_solve["iterations"]
+
+        self.swhe.warm_start = True
+        self.assertAlmostEqual(self.swhe.simulate(1, 20, 15), 19.26, delta=0.01)
+        self.assertAlmostEqual(self.swhe.simulate(1, 20, 15), 19.26, delta=0.01)
+        self.assertLess(self.swhe.last_solve["iterations"], cold_iterations)
+
+        self.swhe.reset()
+        self.assertIsNone(self.swhe.warm_state)
+        self.swhe.simulate(1, 20, 15)
+        self.assertEqual(self.swhe.last_solve["iterations"], cold_iterations)
+
+    def test_context(self):
+        context = self.swhe.context
+        with self.assertRaises(AttributeError):
+            context.r_cond = 0.0
+        with self.assertRaises(AttributeError):
+            context.other = 0.0
+        self.assertIs(self.swhe.get_context(), context)
+        self.assertAlmostEqual(context.r_cond, self.swhe.pipe.calc_cond_resistance(), delta=1e-15)
+
+        outlet_temp = self.swhe.simulate(1, 20, 15)
+        self.swhe.pipe.update_pipe(200)
+        context_200 = self.swhe.get_context()
+        self.assertIsNot(context_200, context)
+        self.assertEqual(context_200.length, 200)
+        self.assertIs(context_200.outside_nusselt_heating, context.outside_nusselt_heating)
+        self.assertLess(self.swhe.simulate(1, 20, 15), outlet_temp)
+
+        self.swhe.pipe.update_pipe(100)
+        self.assertEqual(self.swhe.simulate(1, 20, 15), outlet_temp)
+
+        self.swhe.include_inside_fouling = True
+        self.assertAlmostEqual(self.swhe.get_context().r_inside_foul,
+                               self.swhe.calc_inside_fouling_resistance(True), delta=1e-15)
+        self.assertGreater(self.swhe.simulate(1, 20, 15), outlet_temp)
+
+    def test_context_pipe_swap(self):
+        outlet_temp = self.swhe.simulate(1, 20, 15)
+        context = self.swhe.get_context()
+
+        self.swhe.pipe = Pipe({**self.data["pipe"], "length": 300})
+        self.assertEqual(self.swhe.pipe.revision, context.pipe_revision)
+        self.assertFalse(context.is_valid(self.swhe))
+        self.assertEqual(self.swhe.get_context().length, 300)
+
+        swhe_300 = SWHE({**self.data, "pipe": {**self.data["pipe"], "length": 300}})
+        self.assertEqual(self.swhe.simulate(1, 20, 15), swhe_300.simulate(1, 20, 15))
+        self.assertLess(self.swhe.simulate(1, 20, 15), outlet_temp)
+
+        # direct geometry changes
+        for name, value in (("coil_dia", 2.0), ("dx", 0.1), ("dy", 0.1)):
+            context = self.swhe.get_context()
+            setattr(self.swhe, name, value)
+            self.assertFalse(context.is_valid(self.swhe))
+            self.assertTrue(self.swhe.get_context().is_valid(self.swhe))
+
+    def test_size_pipe_length(self):
+        lengths = self.swhe.size_pipe_lengths(1, 20, 15, [4.0, 3.0])
+        self.assertEqual(self.swhe.pipe.length, 100)
+        self.assertFalse(self.swhe.warm_start)
+        self.assertGreater(lengths[1], lengths[0])
+        self.swhe.pipe.update_pipe(lengths[1])
+        self.assertAlmostEqual(self.swhe.simulate(1, 20, 15), 18.0, delta=0.02)
+
+        # an enabled warm start keeps its state
+        self.swhe.pipe.update_pipe(100)
+        self.swhe.warm_start = True
+        self.swhe.simulate(1, 20, 15)
+        warm_state = self.swhe.warm_state
+        self.swhe.size_pipe_lengths(1, 20, 15, [4.0, 3.0])
+        self.assertTrue(self.swhe.warm_start)
+        self.assertEqual(self.swhe.warm_state, warm_state)
@@ -0,0 +1,69 @@
+import unittest
+
+import numpy as np
+
+from src.swhe import SWHE
+from src.swhe_field import SWHEField
+
+
+class TestSWHEField(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.coil = {
+            "pipe": {
+                "outer-dia": 0.02667,
+                "inner-dia": 0.0215392,
+                "length": 100,
+                "density": 950,
+                "conductivity": 0.4
+            },
+            "diameter": 1.2,
+            "horizontal-spacing": 0.05,
+            "vertical-spacing": 0.05,
+        }
+        self.fluid = {
+            "fluid-name": "PG",
+            "concentration": 20
+        }
+        self.swhe = SWHE({**self.coil, "fluid": self.fluid})
+
+    def test_parallel(self):
+        field = SWHEField({"swhe": self.coil, "fluid": self.fluid, "branches": 20})
+        self.assertEqual(len(field.coils), 20)
+        res = field.simulate(10.0, 25, 15, full_output=True)
+        self.assertAlmostEqual(res.value, self.swhe.simulate(0.5, 25, 15), delta=1e-10)
+        np.testing.assert_allclose(res.branch_m_dot, 0.5)
+        np.testing.assert_allclose(res.q_coils, res.q_coils[0])
+
+        # the coil heat rates add up to the brine temperature change of the field
+        cp = self.swhe.brine.specific_heat(0.5 * (25 + res.value))
+        self.assertAlmostEqual(res.q_total, 10.0 * cp * (25 - res.value), delta=1e-6)
+
+    def test_series(self):
+        field = SWHEField({"swhe": self.coil, "fluid": self.fluid, "branches": 2, "series": 2})
+        outlet_1 = self.swhe.simulate(0.5, 25, 15)
+        self.assertAlmostEqual(field.simulate(1.0, 25, 15), self.swhe.simulate(0.5, outlet_1, 15), delta=1e-10)
+
+    def test_mixed_branches(self):
+        data = {
+            "swhe": self.coil,
+            "fluid": self.fluid,
+            "branches": [[{}], [{"length": 200}, {}]],
+            "flow-fractions": [1, 3],
+        }
+        field = SWHEField(data)
+        res = field.simulate(np.array([1.0, 2.0]), 25, 15, full_output=True)
+        self.assertEqual(res.value.shape, (2,))
+        self.assertEqual(res.q_coils.shape, (2, 3))
+
+        swhe_long = SWHE({**self.coil, "pipe": {**self.coil["pipe"], "length": 200}, "fluid": self.fluid})
+        for idx, m_dot in enumerate([1.0, 2.0]):
+            outlet_a = self.swhe.simulate(0.25 * m_dot, 25, 15)
+            outlet_b = self.swhe.simulate(0.75 * m_dot, swhe_long.simulate(0.75 * m_dot, 25, 15), 15)
+            self.assertAlmostEqual(res.value[idx], 0.25 * outlet_a + 0.75 * outlet_b, delta=1e-10)
+
+    def test_bad_init(self):
+        with self.assertRaises(ValueError):
+            SWHEField({"swhe": self.coil, "fluid": self.fluid, "branches": 2, "flow-fractions": [1, 1, 1]})
+        with self.assertRaises(ValueError):
+            SWHEField({"swhe": self.coil, "fluid": self.fluid, "branches": [[{}], []]})
@@ -0,0 +1,57 @@
+import unittest
+
+import numpy as np
+
+from src.swhe import SWHE
+
+
+class TestSWHESurrogate(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        data = {
+            "pipe": {
+                "outer-dia": 0.02667,
+                "inner-dia": 0.0215392,
+                "length": 100,
+                "density": 950,
+                "conductivity": 0.4
+            },
+            "fluid": {
+                "fluid-name": "PG",
+                "concentration": 20,
+                "backend": "tabulated"
+            },
+            "diameter": 1.2,
+            "horizontal-spacing": 0.05,
+            "vertical-spacing": 0.05,
+        }
+        cls.swhe = SWHE(data)
+        cls.surrogate = cls.swhe.compile_surrogate((0.5, 1.5), (8, 24), (10, 20), num_points=(11, 17, 11))
+
+    def test_simulate(self):
+        self.assertAlmostEqual(self.surrogate.simulate(1, 20, 15), 19.26, delta=0.01)
+        self.assertAlmostEqual(self.surrogate.simulate(1, 10, 15), 10.55, delta=0.01)
+
+        # grid points reproduce the full model
+        self.assertAlmostEqual(self.surrogate.simulate(0.5, 8, 10), self.surrogate.values[0, 0, 0], delta=1e-10)
+
+    def test_fallback(self):
+        self.assertFalse(self.surrogate.in_range(0.1, 20, 15))
+        self.assertAlmostEqual(self.surrogate.simulate(0.1, 20, 15), self.swhe.simulate(0.1, 20, 15), delta=1e-10)
+
+    def test_simulate_batch(self):
+        m_dot = np.array([1.0, 0.73, 0.1])
+        inlet_temp = np.array([20.0, 11.1, 20.0])
+        outlet_temp = self.surrogate.simulate_batch(m_dot, inlet_temp, 15)
+        for idx in range(m_dot.size):
+            self.assertAlmostEqual(outlet_temp[idx], self.surrogate.simulate(m_dot[idx], inlet_temp[idx], 15),
+                                   delta=1e-6)
+
+    def test_validate(self):
+        self.assertLess(self.surrogate.validate(num_samples=50), 0.05)
+        self.assertIsNotNone(self.surrogate.max_error)
+
+    def test_bad_range(self):
+        with self.assertRaises(ValueError):
+            self.swhe.compile_surrogate((1.0, 0.5), (8, 24), (10, 20))
@@ -1,5 +1,9 @@
 import unittest
 
+import numpy as np
+
+from src.pipe import PipeArray
+from src.property_cache import PropertyCache
 from src.system import System
 
 
@@ -28,8 +32,119 @@ class TestPipe(unittest.TestCase):
             }
         }
 
+        self.data = data
         self.system = System(data)
 
     def test_simulate(self):
         self.assertAlmostEqual(self.system.simulate(-1000.0, 0.5, 15), 2.00, delta=0.01)
         self.assertAlmostEqual(self.system.simulate(1000.0, 0.5, 15), -1.27, delta=0.01)
+
+    def test_simulate_cache(self):
+        cache = PropertyCache()
+        system = System(self.data, cache)
+        self.assertIs(system.hp.fluid.cache, system.swhe.water.cache)
+        self.assertAlmostEqual(system.simulate(-1000.0, 0.5, 15), 2.00, delta=0.01)
+        misses = cache.stats()["misses"]
+        self.assertAlmostEqual(system.simulate(-1000.0, 0.5, 15), 2.00, delta=0.01)
+        self.assertEqual(cache.stats()["misses"], misses)
+        self.assertGreater(cache.stats()["hits"], 0)
+
+    def test_simulate_batch(self):
+        q_zone = np.array([-1000.0, 1000.0, -3000.0, 2500.0])
+        m_dot = np.array([0.5, 0.5, 0.25, 1.0])
+        t_appr = self.system.simulate_batch(q_zone, m_dot, 15)
+        self.assertAlmostEqual(t_appr[0], 2.00, delta=0.01)
+        self.assertAlmostEqual(t_appr[1], -1.27, delta=0.01)
+        for idx in range(q_zone.size):
+            self.assertAlmostEqual(t_appr[idx], self.system.simulate(q_zone[idx], m_dot[idx], 15), delta=1e-10)
+
+        # the coil solves use the SWHE tolerance in both paths
+        self.system.tol = 1e-5
+        t_appr = self.system.simulate_batch(q_zone, m_dot, 15)
+        for idx in range(q_zone.size):
+            self.assertAlmostEqual(t_appr[idx], self.system.simulate(q_zone[idx], m_dot[idx], 15), delta=1e-10)
+
+    def test_simulate_batch_pipes(self):
+        pipes = PipeArray({**self.data["swhe"]["pipe"], "length": [50, 100, 200]})
+        t_appr = self.system.simulate_batch(np.array([[-1000.0], [1000.0]]), 0.5, 15, pipes=pipes)
+        self.assertEqual(t_appr.shape, (2, 3))
+        self.assertAlmostEqual(t_appr[0, 1], 2.00, delta=0.01)
+        self.assertAlmostEqual(t_appr[1, 1], -1.27, delta=0.01)
+        for idx, length in enumerate(pipes.length):
+            self.system.swhe.pipe.update_pipe(length)
+            self.assertAlmostEqual(t_appr[0, idx], self.system.simulate(-1000.0, 0.5, 15), delta=1e-10)
+            self.assertAlmostEqual(t_appr[1, idx], self.system.simulate(1000.0, 0.5, 15), delta=1e-10)
+
+    def test_simulate_performance_map(self):
+        perf_map = {
+            "entering-temperature": [0.0, 30.0],
+            "load": [0.0, 5000.0],
+            "heating-cop": [[3.0, 3.0], [3.0, 3.0]],
+            "cooling-cop": [[3.0, 3.0], [3.0, 3.0]],
+        }
+        system = System({**self.data, "hp": {"performance-map": perf_map}})
+        self.assertAlmostEqual(system.simulate(-1000.0, 0.5, 15), self.system.simulate(-1000.0, 0.5, 15),
+                               delta=1e-10)
+        q_zone = np.array([-1000.0, 1000.0])
+        np.testing.assert_allclose(system.simulate_batch(q_zone, 0.5, 15), self.system.simulate_batch(q_zone, 0.5, 15),
+                                   atol=1e-10)
+
+    def test_simulate_full_output(self):
+        result = self.system.simulate(-1000.0, 0.5, 15, full_output=True)
+        self.assertEqual(result.value, self.system.simulate(-1000.0, 0.5, 15))
+        self.assertTrue(result.converged)
+        self.assertEqual(result.iterations, self.system.last_solve["iterations"])
+        self.assertLessEqual(result.residual, self.system.tol)
+        self.assertLess(result.swhe.value, result.hp_outlet_temperature)
+        self.assertGreater(result.swhe.ua, 0)
+
+    def test_simulate_budgets(self):
+        self.system.damping = 0.7
+        self.assertAlmostEqual(self.system.simulate(-1000.0, 0.5, 15), 2.00, delta=0.02)
+        np.testing.assert_allclose(self.system.simulate_batch(-1000.0, 0.5, 15), 2.00, atol=0.02)
+
+        self.system.damping = 1.0
+        self.system.warm_start = True
+        self.system.max_iter = 2
+        result = self.system.simulate(-1000.0, 0.5, 15, full_output=True)
+        self.assertEqual(result.iterations, 2)
+        self.assertFalse(result.converged)
+        self.assertIsNone(self.system.warm_state)
+
+        self.system.max_iter = 100
+        self.system.max_time = 0.0
+        self.assertEqual(self.system.simulate(-1000.0, 0.5, 15, full_output=True).iterations, 1)
+
+    def test_simulate_warm_start(self):
+        self.system.warm_start = True
+        self.assertTrue(self.system.swhe.warm_start)
+        for q_zone in [-1000.0, -1050.0, -1100.0, -1000.0]:
+            self.assertAlmostEqual(self.system.simulate(q_zone, 0.5, 15), System(self.data).simulate(q_zone, 0.5, 15),
+                                   delta=0.05)
+        self.assertIsNotNone(self.system.warm_state)
+
+        self.system.reset()
+        self.assertIsNone(self.system.warm_state)
+        self.assertIsNone(self.system.swhe.warm_state)
+        self.assertAlmostEqual(self.system.simulate(-1000.0, 0.5, 15), 2.00, delta=0.01)
+
+    def test_size_pipe_length(self):
+        length = self.system.size_pipe_length(-1000.0, 0.5, 15, 2.00)
+        self.assertAlmostEqual(length, 100, delta=5)
+        self.assertEqual(self.system.swhe.pipe.length, 100)
+        self.assertFalse(self.system.warm_start)
+
+        lengths = self.system.size_pipe_lengths(-1000.0, 0.5, 15, [1.5, 2.0, 3.0])
+        self.assertGreater(lengths[0], lengths[1])
+        self.assertGreater(lengths[1], lengths[2])
+        self.system.swhe.pipe.update_pipe(lengths[2])
+        self.assertAlmostEqual(self.system.simulate(-1000.0, 0.5, 15), 3.0, delta=0.05)
+
+        # an enabled warm start keeps its state
+        self.system.swhe.pipe.update_pipe(100)
+        self.system.warm_start = True
+        self.system.simulate(-1000.0, 0.5, 15)
+        warm_states = (self.system.warm_state, self.system.swhe.warm_state)
+        self.system.size_pipe_lengths(-1000.0, 0.5, 15, [1.5, 2.0])
+        self.assertTrue(self.system.warm_start)
+        self.assertEqual((self.system.warm_state, self.system.swhe.warm_state), warm_states)
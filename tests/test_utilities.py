@@ -1,6 +1,8 @@
 import unittest
 
-from src.utilities import smoothing_function
+import numpy as np
+
+from src.utilities import GridInterpolator, find_monotonic_roots, find_root_bracketed, smoothing_function
 
 
 class TestUtilities(unittest.TestCase):
@@ -16,3 +18,49 @@ class TestUtilities(unittest.TestCase):
         self.assertAlmostEqual(smoothing_function(0.5, x_min, x_max, y_min, y_max), 0.5, delta=1e-4)
         self.assertAlmostEqual(smoothing_function(1.0, x_min, x_max, y_min, y_max), 1.0, delta=1e-4)
         self.assertAlmostEqual(smoothing_function(10.0, x_min, x_max, y_min, y_max), 1.0, delta=1e-4)
+
+    def test_smoothing_function_array(self):
+        x = np.array([-10, 0.0, 0.25, 0.5, 1.0, 10.0])
+        y = smoothing_function(x, 0, 1, 0, 1)
+        for idx, val in enumerate(x):
+            self.assertAlmostEqual(y[idx], smoothing_function(val, 0, 1, 0, 1), delta=1e-12)
+
+    def test_find_root_bracketed(self):
+        self.assertAlmostEqual(find_root_bracketed(lambda x: x ** 2 - 2, 0, 2, x_tol=1e-10), 2 ** 0.5, delta=1e-8)
+        self.assertAlmostEqual(find_root_bracketed(lambda x: np.exp(-x) - 0.5, 0, 10, x_tol=1e-10), np.log(2),
+                               delta=1e-8)
+        self.assertEqual(find_root_bracketed(lambda x: x, 0, 1), 0)
+        with self.assertRaises(ValueError):
+            find_root_bracketed(lambda x: x ** 2 + 1, -1, 1)
+
+    def test_find_monotonic_roots(self):
+        roots = find_monotonic_roots(lambda x: 1 / x, [0.5, 0.25, 2.0, 0.01], 1, 2, x_tol=1e-10)
+        for root, target in zip(roots, [0.5, 0.25, 2.0, 0.01]):
+            self.assertAlmostEqual(root, 1 / target, delta=1e-6)
+        with self.assertRaises(ValueError):
+            find_monotonic_roots(lambda x: 1 / x, [-1], 1, 2, max_expand=3)
+
+    def test_grid_interpolator(self):
+        axes = [np.array([0.0, 1.0, 3.0]), np.array([10.0, 20.0]), np.array([0.1, 0.5, 1.0, 2.0])]
+        grid = np.meshgrid(*axes, indexing="ij")
+        interp = GridInterpolator(axes, 2 * grid[0] - 0.5 * grid[1] + 3 * grid[2] + 1)
+
+        # multilinear interpolation is exact for linear functions
+        self.assertAlmostEqual(interp(2.0, 12.0, 0.7), 2 * 2.0 - 0.5 * 12.0 + 3 * 0.7 + 1, delta=1e-12)
+        x = np.linspace(0, 3, 7)
+        flow = np.array([[0.2], [1.5]])
+        np.testing.assert_allclose(interp(x, 15.0, flow), 2 * x - 0.5 * 15.0 + 3 * flow + 1, atol=1e-12)
+        for x_i in x:
+            self.assertAlmostEqual(interp(x_i, 15.0, 0.2), interp(np.array([x_i]), 15.0, 0.2)[0], delta=1e-12)
+
+        # clamped outside of the grid
+        self.assertAlmostEqual(interp(-5.0, 100.0, 5.0), interp(0.0, 20.0, 2.0), delta=1e-12)
+
+        # single point axes ignore their coordinate
+        interp = GridInterpolator([[0.0, 1.0], [5.0]], [[1.0], [3.0]])
+        self.assertAlmostEqual(interp(0.5, 100.0), 2.0, delta=1e-12)
+
+        with self.assertRaises(ValueError):
+            GridInterpolator([[0.0, 1.0]], [1.0, 2.0, 3.0])
+        with self.assertRaises(ValueError):
+            GridInterpolator([[1.0, 0.0]], [1.0, 2.0])
@@ -18,9 +18,7 @@ def plot():
     hp = HeatPumpConstCOP(d)
 
     x = np.arange(-3000, 3000, 100)
-    y_a = [hp.simulate(m, 0.1, 15) for m in x]
-    y_b = [hp.simulate(m, 0.25, 15) for m in x]
-    y_c = [hp.simulate(m, 1.0, 15) for m in x]
+    y_a, y_b, y_c = hp.simulate(x, np.array([[0.1], [0.25], [1.0]]), 15)
     fig, ax = plt.subplots()
     ax.plot([-3000, 3000], [15, 15], label=r"$T_{in,src}$")
     ax.plot(x, y_a, label=r"$T_{out,src}$ $\dot{m}=0.10$ [kg/s]")
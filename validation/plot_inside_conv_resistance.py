@@ -26,7 +26,7 @@ def plot():
     swhe = SWHE(data)
 
     x = np.arange(0.01, 0.5, 0.001)
-    y = [swhe.calc_inside_conv_resistance(m, 20) for m in x]
+    y = swhe.calc_inside_conv_resistance(x, 20)
 
     fig, ax = plt.subplots()
     ax.plot(x, y)
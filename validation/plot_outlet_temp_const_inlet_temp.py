@@ -26,7 +26,7 @@ def plot():
     swhe = SWHE(data)
 
     x = np.arange(0.01, 1, 0.01)
-    y = [swhe.simulate(m, 25, 20) for m in x]
+    y = swhe.simulate_batch(x, 25, 20)
 
     fig, ax = plt.subplots()
     ax.plot([0, 1], [25, 25], label=r"$T_{in}$")
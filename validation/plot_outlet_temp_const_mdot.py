@@ -26,9 +26,7 @@ def plot():
     swhe = SWHE(data)
 
     x = np.arange(1, 40, 0.1)
-    y_010 = [swhe.simulate(0.10, m, 20) for m in x]
-    y_050 = [swhe.simulate(0.50, m, 20) for m in x]
-    y_100 = [swhe.simulate(1.00, m, 20) for m in x]
+    y_010, y_050, y_100 = swhe.simulate_batch(np.array([[0.10], [0.50], [1.00]]), x, 20)
 
     fig, ax = plt.subplots()
     ax.plot(x, x, label=r"$T_{in}$")
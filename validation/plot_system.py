@@ -3,7 +3,8 @@ from pathlib import Path
 import matplotlib.pyplot as plt
 import numpy as np
 
-from src.system import System
+from src.result_cache import ResultCache
+from src.sweep import simulate
 
 
 def plot():
@@ -29,12 +30,9 @@ def plot():
         }
     }
 
-    system = System(data)
-
     x = np.arange(-3000, 3000, 200)
-    y_a = [system.simulate(m, 0.1, 15) for m in x]
-    y_b = [system.simulate(m, 0.25, 15) for m in x]
-    y_c = [system.simulate(m, 1.0, 15) for m in x]
+    inputs = {"q_zone": x, "m_dot": np.array([[0.1], [0.25], [1.0]]), "temperature_sw": 15}
+    y_a, y_b, y_c = simulate(data, inputs, cache=ResultCache())
     fig, ax = plt.subplots()
     ax.plot(x, y_a, label=r"$T_{appr}$ $\dot{m}=0.10$ [kg/s]")
     ax.plot(x, y_b, label=r"$T_{appr}$ $\dot{m}=0.25$ [kg/s]", linestyle="--")